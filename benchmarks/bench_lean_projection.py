@@ -0,0 +1,247 @@
+"""Сравнение способов выгрузки игроков сезона и карточки команды.
+
+Данные - сезон из 25 команд по 25 игроков. Сравниваются варианты:
+    orm        - загрузка ORM-объектов через selectinload/joinedload и
+                 model_validate(..., from_attributes=True) вложенных схем
+                 (как было раньше)
+    construct  - выборка только нужных колонок кортежами, схемы создаются
+                 model_construct без валидации
+    validated  - выборка колонок кортежами, вложенные схемы создаются по одной
+                 обычными конструкторами с валидацией
+    lean       - выборка колонок кортежами, схема ответа валидируется одним
+                 вызовом model_validate по словарям (текущая реализация
+                 репозиториев)
+
+model_construct заполняет поля в python и на больших списках медленнее
+валидации в pydantic-core, поэтому репозитории его не используют.
+
+Запросы выполняются на sqlite в памяти, чтобы время работы сети и БД
+не заслоняло время создания объектов.
+
+Запуск: python benchmarks/bench_lean_projection.py [--calls N]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from models.db.base import Base
+from models.db.leagues import Country, League, Season
+from models.db.persons import Manager, Person, Player
+from models.db.teams import SeasonTeam, Team
+from models.pydantic.leagues import CountrySchema, SeasonSchema, SeasonWithPlayersSchema
+from models.pydantic.persons import BasePersonSchema, BasePlayerSchema, PlayerDetailsSchema
+from models.pydantic.teams import BaseTeamSchema, TeamRelSchema
+from repositories import leagues, teams
+
+TEAMS = 25
+PLAYERS_PER_TEAM = 25
+
+
+def make_engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    players = TEAMS * PLAYERS_PER_TEAM
+    with Session(engine) as session:
+        session.add(Country(id=1, name="country1"))
+        session.add(League(id=1, name="league1", country_id=1))
+        session.add(Season(id=1, name="season1", league_id=1, is_current_season=True))
+        session.flush()
+        session.execute(insert(Team), [
+            dict(id=t, name=f"team{t}", country_id=1, founded="1900") for t in range(1, TEAMS + 1)
+        ])
+        session.execute(insert(SeasonTeam), [
+            dict(season_id=1, team_id=t, position=t) for t in range(1, TEAMS + 1)
+        ])
+        session.execute(insert(Person), [
+            dict(id=p, name=f"person{p}", full_name=f"full person{p}",
+                 birth_date=datetime(1990, 1, 1), country_id=1)
+            for p in range(1, players + TEAMS + 1)
+        ])
+        session.execute(insert(Player), [
+            dict(id=p, person_id=p, team_id=(p - 1) // PLAYERS_PER_TEAM + 1, team_number=p % 99 + 1)
+            for p in range(1, players + 1)
+        ])
+        session.execute(insert(Manager), [
+            dict(id=t, person_id=players + t, team_id=t) for t in range(1, TEAMS + 1)
+        ])
+        session.commit()
+    return engine
+
+
+_ORM_SEASON_QUERY = select(
+    Season
+).options(
+    selectinload(Season.teams).selectinload(Team.players).joinedload(Player.person).joinedload(Person.country)
+).filter(
+    Season.league_id == 1,
+    Season.id == 1
+)
+
+
+_ORM_TEAM_QUERY = select(
+    Team
+).options(
+    joinedload(Team.country),
+    selectinload(Team.seasons),
+    joinedload(Team.manager).joinedload(Manager.person),
+    selectinload(Team.players).joinedload(Player.person)
+).filter(
+    Team.id == 1
+)
+
+
+def orm_players(session: Session) -> SeasonWithPlayersSchema:
+    season = session.execute(_ORM_SEASON_QUERY).scalars().one()
+    players = []
+    for team in season.teams:
+        for player in team.players:
+            players.append(PlayerDetailsSchema(
+                id=player.id,
+                name=player.person.name,
+                full_name=player.person.full_name,
+                birth_date=player.person.birth_date,
+                team_number=player.team_number,
+                country=CountrySchema.model_validate(player.person.country, from_attributes=True),
+                team=BaseTeamSchema.model_validate(team, from_attributes=True)
+            ))
+    return SeasonWithPlayersSchema(id=season.id, name=season.name, players=players)
+
+
+def orm_team(session: Session) -> TeamRelSchema:
+    team = session.execute(_ORM_TEAM_QUERY).scalars().one()
+    return TeamRelSchema(
+        id=team.id,
+        name=team.name,
+        founded=team.founded,
+        manager=BasePersonSchema(id=team.manager.id, name=team.manager.person.name),
+        country=CountrySchema(id=team.country.id, name=team.country.name),
+        seasons=[SeasonSchema.model_validate(s, from_attributes=True) for s in team.seasons],
+        players=[BasePlayerSchema(id=p.id, name=p.person.name, team_number=p.team_number) for p in team.players]
+    )
+
+
+def player_rows(session: Session) -> tuple:
+    season = session.execute(leagues._SEASON_NAME_QUERY, {"league_id": 1, "season_id": 1}).one()
+    return season, session.execute(leagues._SEASON_PLAYERS_QUERY, {"season_id": 1}).all()
+
+
+def team_rows(session: Session) -> tuple:
+    params = {"team_id": 1}
+    return (
+        session.execute(teams._ONE_TEAM_QUERY, params).one(),
+        session.execute(teams._TEAM_SEASONS_QUERY, params).all(),
+        session.execute(teams._TEAM_PLAYERS_QUERY, params).all()
+    )
+
+
+def construct_players(session: Session) -> SeasonWithPlayersSchema:
+    (season_id, season_name), rows = player_rows(session)
+    return SeasonWithPlayersSchema.model_construct(id=season_id, name=season_name, players=[
+        PlayerDetailsSchema.model_construct(
+            id=player_id, name=name, full_name=full_name, birth_date=birth_date, team_number=team_number,
+            country=CountrySchema.model_construct(id=country_id, name=country_name),
+            team=BaseTeamSchema.model_construct(id=team_id, name=team_name)
+        )
+        for (player_id, name, full_name, birth_date, team_number,
+             country_id, country_name, team_id, team_name) in rows
+    ])
+
+
+def construct_team(session: Session) -> TeamRelSchema:
+    team, seasons, players = team_rows(session)
+    team_id, name, founded, country_id, country_name, manager_id, manager_name = team
+    return TeamRelSchema.model_construct(
+        id=team_id,
+        name=name,
+        founded=founded,
+        manager=BasePersonSchema.model_construct(id=manager_id, name=manager_name),
+        country=CountrySchema.model_construct(id=country_id, name=country_name),
+        current_seasons=[SeasonSchema.model_construct(id=s_id, name=s_name) for s_id, s_name in seasons],
+        players=[
+            BasePlayerSchema.model_construct(id=p_id, name=p_name, team_number=number)
+            for p_id, p_name, number in players
+        ]
+    )
+
+
+def validated_players(session: Session) -> SeasonWithPlayersSchema:
+    (season_id, season_name), rows = player_rows(session)
+    return SeasonWithPlayersSchema(id=season_id, name=season_name, players=[
+        PlayerDetailsSchema(
+            id=player_id, name=name, full_name=full_name, birth_date=birth_date, team_number=team_number,
+            country=CountrySchema(id=country_id, name=country_name),
+            team=BaseTeamSchema(id=team_id, name=team_name)
+        )
+        for (player_id, name, full_name, birth_date, team_number,
+             country_id, country_name, team_id, team_name) in rows
+    ])
+
+
+def validated_team(session: Session) -> TeamRelSchema:
+    team, seasons, players = team_rows(session)
+    team_id, name, founded, country_id, country_name, manager_id, manager_name = team
+    return TeamRelSchema(
+        id=team_id,
+        name=name,
+        founded=founded,
+        manager=BasePersonSchema(id=manager_id, name=manager_name),
+        country=CountrySchema(id=country_id, name=country_name),
+        seasons=[SeasonSchema(id=s_id, name=s_name) for s_id, s_name in seasons],
+        players=[BasePlayerSchema(id=p_id, name=p_name, team_number=number) for p_id, p_name, number in players]
+    )
+
+
+def lean_players(session: Session) -> SeasonWithPlayersSchema:
+    return leagues.to_season_with_players_schema(*player_rows(session))
+
+
+def lean_team(session: Session) -> TeamRelSchema:
+    return teams.to_one_team_schema(*team_rows(session))
+
+
+VARIANTS = {
+    "orm": (orm_players, orm_team),
+    "construct": (construct_players, construct_team),
+    "validated": (validated_players, validated_team),
+    "lean": (lean_players, lean_team),
+}
+
+
+def run(engine, func, calls: int) -> float:
+    """Среднее время одного вызова в миллисекундах, каждый вызов - в новой сессии"""
+    started = time.perf_counter()
+    for _ in range(calls):
+        with Session(engine) as session:
+            func(session)
+    return (time.perf_counter() - started) / calls * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = make_engine()
+    with Session(engine) as session:
+        for index, name in enumerate(("players", "team")):
+            expected = VARIANTS["orm"][index](session).model_dump()
+            for variant in ("construct", "validated", "lean"):
+                assert VARIANTS[variant][index](session).model_dump() == expected, (variant, name)
+
+    print(f"{TEAMS} команд по {PLAYERS_PER_TEAM} игроков, {args.calls} вызовов, мс на вызов")
+    for index, name in enumerate(("get_players_in_season", "get_one_team")):
+        print(f"{name}:")
+        for variant, funcs in VARIANTS.items():
+            run(engine, funcs[index], 10)
+            print(f"{variant:>12}: {run(engine, funcs[index], args.calls):8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""Сравнение способов полного пересчета таблиц сезонов.
+
+Данные - синтетический архив: N сезонов по 20 команд, каждая пара команд
+играет дважды (380 матчей в сезоне). Сравниваются вычисления таблиц:
+    per-team    - показатели каждой команды считаются отдельным проходом по
+                  матчам сезона, места - сортировкой строк (как при пересчете
+                  по одной команде)
+    per-game    - один проход по матчам с result_deltas для каждого матча
+    vectorised  - compute_standings, все сезоны за один векторный проход
+и запись строк таблиц в sqlite в памяти:
+    per-row     - отдельный UPDATE для каждой строки таблицы
+    upsert      - один INSERT ... ON CONFLICT DO UPDATE для всех строк
+
+Запуск: python benchmarks/bench_standings.py [--seasons N] [--repeat N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models.db.base import Base
+from models.db.leagues import Country, League, Season
+from models.db.persons import Person  # noqa: F401 - нужен для связей моделей
+from models.db.teams import SeasonTeam, Team
+from repositories.standings import STANDINGS_FIELDS, compute_standings, result_deltas
+
+TEAMS_PER_SEASON = 20
+
+
+def make_results(seasons: int) -> list[tuple[int, int, int, int, int]]:
+    """Результаты матчей (season_id, home_team_id, guest_team_id, home_scored, guest_scored)"""
+    rng = random.Random(0)
+    results = []
+    for season_id in range(1, seasons + 1):
+        teams = range(1, TEAMS_PER_SEASON + 1)
+        for home in teams:
+            for guest in teams:
+                if home != guest:
+                    results.append((season_id, home, guest, rng.randint(0, 4), rng.randint(0, 3)))
+    return results
+
+
+def per_team(results) -> list[dict]:
+    seasons = {}
+    for result in results:
+        seasons.setdefault(result[0], []).append(result)
+
+    rows = []
+    for season_id, games in seasons.items():
+        season_rows = []
+        for team_id in range(1, TEAMS_PER_SEASON + 1):
+            total = Counter()
+            for _, home, guest, home_scored, guest_scored in games:
+                if team_id in (home, guest):
+                    home_delta, guest_delta = result_deltas(home_scored, guest_scored)
+                    total.update(home_delta if team_id == home else guest_delta)
+            season_rows.append(dict(season_id=season_id, team_id=team_id,
+                                    **{field: total[field] for field in STANDINGS_FIELDS}))
+        season_rows.sort(key=lambda x: (-x["points"], x["conceded_goals"] - x["scored_goals"],
+                                        -x["scored_goals"], x["team_id"]))
+        for position, row in enumerate(season_rows, start=1):
+            row["position"] = position
+        rows.extend(season_rows)
+    return rows
+
+
+def per_game(results) -> list[dict]:
+    totals = {}
+    for season_id, home, guest, home_scored, guest_scored in results:
+        home_delta, guest_delta = result_deltas(home_scored, guest_scored)
+        totals.setdefault((season_id, home), Counter()).update(home_delta)
+        totals.setdefault((season_id, guest), Counter()).update(guest_delta)
+
+    rows = sorted(
+        (dict(season_id=season_id, team_id=team_id, **{field: total[field] for field in STANDINGS_FIELDS})
+         for (season_id, team_id), total in totals.items()),
+        key=lambda x: (x["season_id"], -x["points"], x["conceded_goals"] - x["scored_goals"],
+                       -x["scored_goals"], x["team_id"])
+    )
+    position, season_id = 0, None
+    for row in rows:
+        position = position + 1 if row["season_id"] == season_id else 1
+        season_id = row["season_id"]
+        row["position"] = position
+    return rows
+
+
+def vectorised(results) -> list[dict]:
+    standings = compute_standings([], results, ("goal_difference", "scored"))
+    columns = ("season_id", "team_id", "position") + STANDINGS_FIELDS
+    return [dict(zip(columns, values)) for values in zip(*(standings[x].tolist() for x in columns))]
+
+
+def make_engine(seasons: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Country(id=1, name="country1"))
+        session.add(League(id=1, name="league1", country_id=1))
+        session.execute(insert(Season), [
+            dict(id=s, name=f"season{s}", league_id=1, is_current_season=False) for s in range(1, seasons + 1)
+        ])
+        session.execute(insert(Team), [
+            dict(id=t, name=f"team{t}", country_id=1, founded="1900") for t in range(1, TEAMS_PER_SEASON + 1)
+        ])
+        session.execute(insert(SeasonTeam), [
+            dict(season_id=s, team_id=t, position=t)
+            for s in range(1, seasons + 1) for t in range(1, TEAMS_PER_SEASON + 1)
+        ])
+        session.commit()
+    return engine
+
+
+def write_per_row(engine, rows) -> None:
+    with Session(engine) as session:
+        for row in rows:
+            session.execute(
+                update(SeasonTeam).where(
+                    SeasonTeam.season_id == row["season_id"],
+                    SeasonTeam.team_id == row["team_id"]
+                ).values(**{field: row[field] for field in ("position",) + STANDINGS_FIELDS})
+            )
+        session.commit()
+
+
+def write_upsert(engine, rows) -> None:
+    statement = sqlite_insert(SeasonTeam)
+    statement = statement.on_conflict_do_update(
+        index_elements=[SeasonTeam.season_id, SeasonTeam.team_id],
+        set_={field: statement.excluded[field] for field in ("position",) + STANDINGS_FIELDS}
+    )
+    with Session(engine) as session:
+        session.execute(statement, rows)
+        session.commit()
+
+
+def measure(func, *args, repeat: int) -> float:
+    """Лучшее время вызова в миллисекундах"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = make_results(args.seasons)
+    expected = sorted((x["season_id"], x["position"], x["team_id"], x["points"]) for x in per_team(results))
+    for func in (per_game, vectorised):
+        assert sorted((x["season_id"], x["position"], x["team_id"], x["points"]) for x in func(results)) == expected
+
+    print(f"{args.seasons} сезонов, {len(results)} матчей, мс (лучшее из {args.repeat})")
+    print("вычисление таблиц:")
+    for name, func in (("per-team", per_team), ("per-game", per_game), ("vectorised", vectorised)):
+        print(f"{name:>12}: {measure(func, results, repeat=args.repeat):9.1f}")
+
+    rows = vectorised(results)
+    engine = make_engine(args.seasons)
+    print("запись строк таблиц:")
+    for name, func in (("per-row", write_per_row), ("upsert", write_upsert)):
+        print(f"{name:>12}: {measure(func, engine, rows, repeat=args.repeat):9.1f}")
+
+
+if __name__ == '__main__':
+    main()
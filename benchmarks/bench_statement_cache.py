@@ -0,0 +1,153 @@
+"""Сравнение затрат на подготовку SQL-запросов репозиториев.
+
+Сравниваются три варианта выполнения запросов get_one_league и get_season:
+    fresh      - запрос собирается заново при каждом вызове (как было раньше),
+                 скомпилированный SQL берется из кэша движка
+    cached     - запрос объявлен один раз на уровне модуля с bindparam
+    no-cache   - запрос собирается заново, кэш компиляции движка отключен,
+                 то есть SQL компилируется при каждом вызове
+
+Запросы выполняются на sqlite в памяти, чтобы время работы сети и БД
+не заслоняло время подготовки запроса.
+
+Запуск: python benchmarks/bench_statement_cache.py [--calls N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sqlalchemy import and_, create_engine, select
+from sqlalchemy.orm import Session
+
+from models.db.base import Base
+from models.db.leagues import Country, League, Season
+from models.db.teams import SeasonTeam, Team
+from repositories import leagues
+
+
+def fresh_one_league(league_id: int):
+    return select(
+        League.id,
+        League.name,
+        League.country_id,
+        Country.name
+    ).join(
+        Country, Country.id == League.country_id
+    ).filter(
+        League.id == league_id
+    ), {}
+
+
+def fresh_season(league_id: int, season_id: int):
+    return select(
+        Season.id,
+        Season.name,
+        League.id,
+        League.name,
+        Country.id,
+        Country.name
+    ).join(
+        League, League.id == Season.league_id
+    ).join(
+        Country, Country.id == League.country_id
+    ).filter(
+        and_(
+            Season.league_id == league_id,
+            Season.id == season_id
+        )
+    ), {}
+
+
+def fresh_season_teams(season_id: int):
+    return select(
+        Team.id,
+        Team.name,
+        SeasonTeam.position,
+        SeasonTeam.games,
+        SeasonTeam.wins,
+        SeasonTeam.draws,
+        SeasonTeam.loses,
+        SeasonTeam.scored_goals,
+        SeasonTeam.conceded_goals,
+        SeasonTeam.points
+    ).join(
+        Team, Team.id == SeasonTeam.team_id
+    ).filter(
+        SeasonTeam.season_id == season_id
+    ).order_by(
+        SeasonTeam.position
+    ), {}
+
+
+def cached_one_league(league_id: int):
+    return leagues._ONE_LEAGUE_QUERY, {"league_id": league_id}
+
+
+def cached_season(league_id: int, season_id: int):
+    return leagues._SEASON_QUERY, {"league_id": league_id, "season_id": season_id}
+
+
+def cached_season_teams(season_id: int):
+    return leagues._SEASON_TEAMS_QUERY, {"season_id": season_id}
+
+
+VARIANTS = {
+    "fresh": (fresh_one_league, fresh_season, fresh_season_teams),
+    "cached": (cached_one_league, cached_season, cached_season_teams),
+}
+
+
+def make_engine(query_cache_size: int):
+    engine = create_engine("sqlite://", query_cache_size=query_cache_size)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Country(id=1, name="country1"))
+        session.add(League(id=1, name="league1", country_id=1))
+        session.add(Season(id=1, name="season1", league_id=1, is_current_season=True))
+        for team_id in range(1, 21):
+            session.add(Team(id=team_id, name=f"team{team_id}", country_id=1, founded="1900"))
+            session.add(SeasonTeam(season_id=1, team_id=team_id, position=team_id))
+        session.commit()
+    return engine
+
+
+def run(engine, builders, calls: int) -> float:
+    """Среднее время одного 'запроса к API' (get_one_league + get_season) в микросекундах"""
+    one_league, season, season_teams = builders
+    with Session(engine) as session:
+        started = time.perf_counter()
+        for _ in range(calls):
+            for query, params in (one_league(1), season(1, 1), season_teams(1)):
+                session.execute(query, params).all()
+        elapsed = time.perf_counter() - started
+    return elapsed / calls * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    cached_engine, uncached_engine = make_engine(500), make_engine(0)
+    for engine in (cached_engine, uncached_engine):
+        run(engine, VARIANTS["fresh"], 100)
+        run(engine, VARIANTS["cached"], 100)
+
+    results = {
+        "fresh": run(cached_engine, VARIANTS["fresh"], args.calls),
+        "cached": run(cached_engine, VARIANTS["cached"], args.calls),
+        "no-cache": run(uncached_engine, VARIANTS["fresh"], args.calls),
+    }
+
+    print(f"{args.calls} вызовов, мкс на вызов get_one_league + get_season")
+    for name, value in results.items():
+        print(f"{name:>10}: {value:8.1f}")
+    print(f"экономия cached относительно fresh: {results['fresh'] - results['cached']:.1f} мкс "
+          f"({(1 - results['cached'] / results['fresh']) * 100:.0f}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+from typing import Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from export_formats import MEDIA_TYPES
+from models.pydantic.internal import ExportDataset, ExportFormat
+from services import exports as service
+
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+
+@router.get("/{dataset}", response_class=StreamingResponse)
+async def export_dataset(
+        dataset: ExportDataset,
+        season_id: Optional[int] = None,
+        export_format: ExportFormat = Query(default=ExportFormat.ndjson, alias="format")
+) -> StreamingResponse:
+    """Получить потоковую выгрузку матчей, таблиц, статистики игроков или событий матчей.
+
+    Без season_id выгружается весь архив. Данные читаются из БД курсором
+    по мере отправки, поэтому ответ не собирается в памяти целиком.
+    """
+    name = dataset.value if season_id is None else f"{dataset.value}-season-{season_id}"
+    return StreamingResponse(
+        service.export_dataset(dataset, export_format, season_id),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'}
+    )
@@ -1,18 +1,71 @@
-from datetime import datetime
+import hmac
+from datetime import date, datetime
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
-from errors import Missing
+from batches import parse_ids
+from config import Config
+from errors import Missing, InvalidBatch, InvalidCursor, InvalidTimezone
+from models.pydantic.batches import BatchSchema
 from models.pydantic.games import (
     GameDetailSchema,
+    GameIngestSchema,
+    GamesBatchResultSchema,
     GameWithLeagueSchema
 )
+from pagination import decode_cursor, next_cursor
+from periods import parse_timezone
 from services import games as service
 
 
 router = APIRouter(prefix="/games", tags=["games"])
 
 
+def _require_ingest_token(x_ingest_token: Optional[str] = Header(default=None)) -> None:
+    """Пропускает запрос на запись только с общим секретом Config.INGEST_API_TOKEN.
+
+    Без настроенного секрета загрузка через API выключена и маршрут отвечает 404.
+    """
+    if not Config.INGEST_API_TOKEN:
+        raise HTTPException(status_code=404, detail="загрузка матчей через API выключена")
+    if x_ingest_token is None or not hmac.compare_digest(x_ingest_token, Config.INGEST_API_TOKEN):
+        raise HTTPException(status_code=401, detail="неверный X-Ingest-Token")
+
+
+@router.post("/bulk", dependencies=[Depends(_require_ingest_token)])
+async def save_games(
+        games: list[GameIngestSchema] = Body(min_length=1, max_length=Config.GAMES_BATCH_MAX_SIZE)
+) -> GamesBatchResultSchema:
+    """Загрузить пакет матчей с результатами, составами, тренерами и событиями.
+
+    Доступно только с заголовком X-Ingest-Token, равным Config.INGEST_API_TOKEN.
+    Матчи с уже существующим id обновляются, повторная загрузка пакета
+    ничего не меняет. Таблицы и статистика игроков сезонов пересчитываются.
+    """
+    try:
+        result = await service.save_games(games)
+    except Missing as m:
+        raise HTTPException(status_code=422, detail=m.msg)
+    return result
+
+
+@router.get("/batch")
+async def get_games(
+        ids: str = Query(description="id матчей через запятую, например 1,2,3")
+) -> BatchSchema[GameDetailSchema]:
+    """Получить полную информацию о нескольких матчах.
+
+    Ненайденные матчи попадают в errors, остальные возвращаются в items.
+    """
+    try:
+        game_ids = parse_ids(ids)
+    except InvalidBatch as e:
+        raise HTTPException(status_code=422, detail=e.msg)
+    return await service.get_games(game_ids)
+
+
 @router.get("/{game_id}")
 async def get_game(game_id: int) -> GameDetailSchema:
     """Получить полную информацию о конкретном матче"""
@@ -23,9 +76,63 @@ async def get_game(game_id: int) -> GameDetailSchema:
     return game
 
 
+@router.get("/{game_id}/live", response_class=StreamingResponse)
+async def stream_game(game_id: int) -> StreamingResponse:
+    """Получить поток событий матча (server-sent events).
+
+    Первым приходит событие score с текущим счетом, затем события game_event
+    с новыми событиями матча и score при изменении счета.
+    """
+    try:
+        stream = await service.stream_game(game_id)
+    except Missing as m:
+        raise HTTPException(status_code=404, detail=m.msg)
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/")
-async def get_games_for_date(date: str) -> list[GameWithLeagueSchema]:
-    """Получить список матчей за определенный день"""
-    query_date = datetime.strptime(date, "%Y-%m-%d")
-    games = await service.get_games_for_date(query_date)
+async def get_games_for_period(
+        response: Response,
+        day: Optional[date] = Query(default=None, alias="date"),
+        date_from: Optional[date] = Query(default=None, alias="from"),
+        date_to: Optional[date] = Query(default=None, alias="to"),
+        tz: str = "UTC",
+        limit: int = Query(default=100, ge=1, le=500),
+        cursor: Optional[str] = None
+) -> list[GameWithLeagueSchema]:
+    """Получить список матчей за день (date) или период (from - to включительно) в часовом поясе tz.
+
+    Матчи отсортированы по времени начала. Если страница заполнена полностью,
+    курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    """
+    if day is not None:
+        if date_from is not None or date_to is not None:
+            raise HTTPException(status_code=422, detail="укажите либо date, либо период from - to")
+        date_from = date_to = day
+    if date_from is None:
+        raise HTTPException(status_code=422, detail="не указан день или начало периода")
+    if date_to is None:
+        date_to = date_from
+    if date_to < date_from:
+        raise HTTPException(status_code=422, detail="конец периода раньше его начала")
+
+    try:
+        zone = parse_timezone(tz)
+    except InvalidTimezone as e:
+        raise HTTPException(status_code=422, detail=e.msg)
+
+    try:
+        after = decode_cursor(cursor, datetime, int) if cursor is not None else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=e.msg)
+
+    games = await service.get_games_for_period(date_from, date_to, zone, limit, after)
+
+    cursor = next_cursor(games, limit, lambda x: (x.game_date, x.id))
+    if cursor is not None:
+        response.headers["X-Next-Cursor"] = cursor
     return games
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+
+from database import get_pool_metrics
+from models.pydantic.internal import PoolMetricsSchema
+
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+
+@router.get("/pool")
+async def get_pool() -> PoolMetricsSchema:
+    """Получить состояние пула соединений postgresql.
+
+    checked_out и overflow - текущие значения, overflow_checkouts, waits,
+    wait_seconds и timeouts накапливаются с запуска процесса.
+    """
+    return PoolMetricsSchema(**get_pool_metrics())
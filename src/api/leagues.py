@@ -1,6 +1,12 @@
-from fastapi import APIRouter, HTTPException
+import hashlib
+import json
+from datetime import datetime
+from typing import Optional
 
-from errors import Missing
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+
+from errors import Missing, InvalidCursor
+from models.mongo_documents.games import EventType
 from models.pydantic.leagues import (
     LeagueWithCurrentSeasonSchema,
     LeagueCountrySchema,
@@ -10,16 +16,19 @@ from models.pydantic.leagues import (
     SeasonWithTopPlayersSchema,
     SeasonWithGamesSchema
 )
+from pagination import decode_cursor, next_cursor
+from responses import SchemaJSONResponse
 from services import leagues as service
 
 router = APIRouter(prefix="/leagues", tags=["leagues and seasons"])
 
 
-@router.get("/")
-async def get_all_leagues() -> list[LeagueWithCurrentSeasonSchema]:
+@router.get("/", response_model=list[LeagueWithCurrentSeasonSchema])
+async def get_all_leagues() -> SchemaJSONResponse:
     """Получить список всех доступных лиг с информацией о текущем сезоне"""
-    leagues = await service.get_all_leagues()
-    return leagues
+    version = await service.get_leagues_version()
+    leagues = await service.get_all_leagues(version)
+    return SchemaJSONResponse(leagues)
 
 
 @router.get("/{league_id}")
@@ -36,47 +45,185 @@ async def get_one_league(league_id: int) -> LeagueCountrySchema:
 async def get_seasons(league_id: int) -> list[SeasonWithLeaderSchema]:
     """Получить список сезонов для указанной лиги с информацией о лидерах в каждом сезоне"""
     try:
-        seasons = await service.get_seasons(league_id)
+        version = await service.get_league_seasons_version(league_id)
+        seasons = await service.get_seasons(league_id, version)
     except Missing as m:
         raise HTTPException(status_code=404, detail=m.msg)
     return seasons
 
 
 @router.get("/{league_id}/seasons/{season_id}")
-async def get_season(league_id: int, season_id: int) -> SeasonRelSchema:
-    """Получить информацию о конкретном сезоне указанной лиги"""
+async def get_season(
+        response: Response,
+        league_id: int,
+        season_id: int,
+        if_none_match: Optional[str] = Header(default=None)
+) -> SeasonRelSchema:
+    """Получить информацию о конкретном сезоне указанной лиги.
+
+    Ответ помечается ETag версии сезона, при совпадении If-None-Match
+    возвращается 304 без выгрузки сезона.
+    """
     try:
-        season = await service.get_season(league_id, season_id)
+        version = await service.get_season_version(league_id, season_id)
+        etag = _season_etag(season_id, version, "season")
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+        season = await service.get_season(league_id, season_id, version)
     except Missing as m:
         raise HTTPException(status_code=404, detail=m.msg)
+
+    _set_etag(response, etag)
     return season
 
 
-@router.get("/{league_id}/seasons/{season_id}/players")
-async def get_players_in_season(league_id: int, season_id: int) -> SeasonWithPlayersSchema:
+@router.get("/{league_id}/seasons/{season_id}/players", response_model=SeasonWithPlayersSchema)
+async def get_players_in_season(league_id: int, season_id: int) -> SchemaJSONResponse:
     """Получить информацию об игроках в конкретном сезоне лиги"""
     try:
-        season = await service.get_players_in_season(league_id, season_id)
+        version = await service.get_season_version(league_id, season_id)
+        season = await service.get_players_in_season(league_id, season_id, version)
     except Missing as m:
         raise HTTPException(status_code=404, detail=m.msg)
-    return season
-
+    return SchemaJSONResponse(season)
+
+
+@router.get("/{league_id}/seasons/{season_id}/games", response_model=SeasonWithGamesSchema)
+async def get_games_for_season(
+        response: Response,
+        league_id: int,
+        season_id: int,
+        limit: int = Query(default=100, ge=1, le=500),
+        cursor: Optional[str] = None,
+        with_total: bool = False
+) -> SchemaJSONResponse:
+    """Получить страницу матчей в конкретном сезоне лиги.
+
+    Матчи отсортированы по дате. Курсор следующей страницы возвращается
+    в заголовке X-Next-Cursor, общее количество матчей (with_total) - в X-Total-Count.
+    """
+    try:
+        after = decode_cursor(cursor, datetime, int) if cursor is not None else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=e.msg)
 
-@router.get("/{league_id}/seasons/{season_id}/games")
-async def get_games_for_season(league_id: int, season_id: int) -> SeasonWithGamesSchema:
-    """Получить информацию о матчах в конкретном сезоне лиги"""
     try:
-        season = await service.get_games_for_season(league_id, season_id)
+        version = await service.get_season_version(league_id, season_id)
+        season = await service.get_games_for_season(league_id, season_id, version, limit, after)
     except Missing as m:
         raise HTTPException(status_code=404, detail=m.msg)
-    return season
 
+    cursor = next_cursor(season.games, limit, lambda x: (x.game_date, x.id))
+    if cursor is not None:
+        response.headers["X-Next-Cursor"] = cursor
+    if with_total:
+        response.headers["X-Total-Count"] = str(
+            await service.count_games_for_season(league_id, season_id, version)
+        )
+    return SchemaJSONResponse(season, headers=response.headers)
+
+
+@router.get("/{league_id}/seasons/{season_id}/scores", response_model=SeasonWithTopPlayersSchema)
+async def get_scores_in_season(
+        response: Response,
+        league_id: int,
+        season_id: int,
+        limit: Optional[int] = Query(default=None, ge=1),
+        offset: int = Query(default=0, ge=0),
+        if_none_match: Optional[str] = Header(default=None)
+) -> Response:
+    """Получить информацию о бомбардирах в конкретном сезоне лиги.
+
+    Ответ помечается ETag версии сезона, при совпадении If-None-Match
+    возвращается 304 без подсчета бомбардиров.
+    """
+    try:
+        version = await service.get_season_version(league_id, season_id)
+        etag = _season_etag(season_id, version, "scores", limit=limit, offset=offset)
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+        season = await service.get_scores_in_season(league_id, season_id, version, limit, offset)
+    except Missing as m:
+        raise HTTPException(status_code=404, detail=m.msg)
 
-@router.get("/{league_id}/seasons/{season_id}/scores")
-async def get_scores_in_season(league_id: int, season_id: int) -> SeasonWithTopPlayersSchema:
-    """Получить информацию о бомбардирах в конкретном сезоне лиги"""
+    _set_etag(response, etag)
+    return SchemaJSONResponse(season, headers=response.headers)
+
+
+@router.get("/{league_id}/seasons/{season_id}/leaders", response_model=SeasonWithTopPlayersSchema)
+async def get_leaders_in_season(
+        response: Response,
+        league_id: int,
+        season_id: int,
+        stat: list[str] = Query(
+            description="Тип события или тип события с весом через двоеточие, например goal или assist:2"
+        ),
+        limit: Optional[int] = Query(default=None, ge=1),
+        offset: int = Query(default=0, ge=0),
+        if_none_match: Optional[str] = Header(default=None)
+) -> Response:
+    """Получить рейтинг игроков сезона по любому типу событий или взвешенной сумме нескольких типов.
+
+    Ответ помечается ETag версии сезона, при совпадении If-None-Match возвращается 304.
+    """
+    weights = _parse_stat_weights(stat)
     try:
-        season = await service.get_scores_in_season(league_id, season_id)
+        version = await service.get_season_version(league_id, season_id)
+        etag = _season_etag(season_id, version, "leaders",
+                             stat={x.value: w for x, w in weights.items()}, limit=limit, offset=offset)
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+        season = await service.get_leaders_in_season(league_id, season_id, version, weights, limit, offset)
     except Missing as m:
         raise HTTPException(status_code=404, detail=m.msg)
-    return season
+
+    _set_etag(response, etag)
+    return SchemaJSONResponse(season, headers=response.headers)
+
+
+def _parse_stat_weights(stats: list[str]) -> dict[EventType, int]:
+    """Разобрать показатели рейтинга вида goal или goal:2 в словарь весов"""
+    weights = {}
+    for stat in stats:
+        event_type, _, weight = stat.partition(':')
+        try:
+            event_type = EventType(event_type)
+            weight = int(weight) if weight else 1
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"некорректный показатель рейтинга - {stat}")
+        if weight == 0:
+            raise HTTPException(status_code=422, detail=f"вес показателя не может быть равен 0 - {stat}")
+        weights[event_type] = weights.get(event_type, 0) + weight
+
+    return weights
+
+
+def _season_etag(season_id: int, version: int, route: str, **params) -> str:
+    """Строгий ETag представления данных сезона: версия сезона, маршрут и хэш параметров запроса.
+
+    Параметры уже разобраны и нормализованы (значения по умолчанию подставлены,
+    веса показателей просуммированы), ключи сортируются, поэтому одинаковые по
+    смыслу запросы получают один ETag.
+    """
+    query = json.dumps(params, sort_keys=True)
+    digest = hashlib.sha1(query.encode()).hexdigest()[:12]
+    return f'"season-{season_id}-v{version}-{route}-{digest}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Совпадает ли один из ETag заголовка If-None-Match с текущим (слабое сравнение)"""
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+
+def _set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def _not_modified(etag: str) -> Response:
+    response = Response(status_code=304)
+    _set_etag(response, etag)
+    return response
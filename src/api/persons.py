@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 
-from errors import Missing
+from batches import parse_ids
+from errors import Missing, InvalidBatch
+from models.pydantic.batches import BatchSchema
 from models.pydantic.persons import PlayerDetailsSchema, PersonDetailsSchema
 from services import persons as service
 
@@ -8,6 +10,21 @@ from services import persons as service
 router = APIRouter(prefix="", tags=["persons"])
 
 
+@router.get("/players/batch")
+async def get_players(
+        ids: str = Query(description="id игроков через запятую, например 1,2,3")
+) -> BatchSchema[PlayerDetailsSchema]:
+    """Получить полную информацию о нескольких игроках.
+
+    Ненайденные игроки попадают в errors, остальные возвращаются в items.
+    """
+    try:
+        player_ids = parse_ids(ids)
+    except InvalidBatch as e:
+        raise HTTPException(status_code=422, detail=e.msg)
+    return await service.get_players(player_ids)
+
+
 @router.get("/players/{player_id}")
 async def get_player(player_id: int) -> PlayerDetailsSchema:
     """Получить полную информацию о конкретном игроке"""
@@ -18,6 +35,21 @@ async def get_player(player_id: int) -> PlayerDetailsSchema:
     return player
 
 
+@router.get("/managers/batch")
+async def get_managers(
+        ids: str = Query(description="id тренеров через запятую, например 1,2,3")
+) -> BatchSchema[PersonDetailsSchema]:
+    """Получить полную информацию о нескольких тренерах.
+
+    Ненайденные тренеры попадают в errors, остальные возвращаются в items.
+    """
+    try:
+        manager_ids = parse_ids(ids)
+    except InvalidBatch as e:
+        raise HTTPException(status_code=422, detail=e.msg)
+    return await service.get_managers(manager_ids)
+
+
 @router.get("/managers/{manager_id}")
 async def get_manager(manager_id: int) -> PersonDetailsSchema:
     """Получить полную информацию о конкретном тренере"""
@@ -1,22 +1,65 @@
-from fastapi import APIRouter, HTTPException
+from datetime import date, datetime
+from typing import Optional
 
-from errors import Missing
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from batches import parse_ids
+from errors import Missing, InvalidBatch, InvalidCursor, InvalidTimezone
+from models.pydantic.batches import BatchSchema
 from models.pydantic.teams import (
     TeamRelSchema,
     TeamDetailsSchema,
     TeamWithGamesSchema
 )
+from pagination import decode_cursor, next_cursor
+from periods import parse_timezone
+from responses import SchemaJSONResponse
 from services import teams as service
 
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
 
-@router.get("/")
-async def get_all_teams() -> list[TeamDetailsSchema]:
-    """Получить список всех команд с полной информацией о каждой"""
-    teams = await service.get_all_teams()
-    return teams
+@router.get("/", response_model=list[TeamDetailsSchema])
+async def get_all_teams(
+        response: Response,
+        limit: int = Query(default=100, ge=1, le=500),
+        cursor: Optional[str] = None,
+        with_total: bool = False
+) -> SchemaJSONResponse:
+    """Получить страницу списка команд с полной информацией о каждой.
+
+    Команды отсортированы по id. Курсор следующей страницы возвращается
+    в заголовке X-Next-Cursor, общее количество команд (with_total) - в X-Total-Count.
+    """
+    try:
+        after = decode_cursor(cursor, int) if cursor is not None else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=e.msg)
+
+    teams = await service.get_all_teams(limit, after)
+
+    cursor = next_cursor(teams, limit, lambda x: (x.id,))
+    if cursor is not None:
+        response.headers["X-Next-Cursor"] = cursor
+    if with_total:
+        response.headers["X-Total-Count"] = str(await service.count_teams())
+    return SchemaJSONResponse(teams, headers=response.headers)
+
+
+@router.get("/batch")
+async def get_teams(
+        ids: str = Query(description="id команд через запятую, например 1,2,3")
+) -> BatchSchema[TeamRelSchema]:
+    """Получить полную информацию о нескольких командах.
+
+    Ненайденные команды попадают в errors, остальные возвращаются в items.
+    """
+    try:
+        team_ids = parse_ids(ids)
+    except InvalidBatch as e:
+        raise HTTPException(status_code=422, detail=e.msg)
+    return await service.get_teams(team_ids)
 
 
 @router.get("/{team_id}")
@@ -30,10 +73,47 @@ async def get_one_team(team_id: int) -> TeamRelSchema:
 
 
 @router.get("/{team_id}/games")
-async def get_games_for_team(team_id: int) -> TeamWithGamesSchema:
-    """Получить информацию о матчах конкретной команды по её ID"""
+async def get_games_for_team(
+        response: Response,
+        team_id: int,
+        season_id: Optional[int] = None,
+        date_from: Optional[date] = Query(default=None, alias="from"),
+        date_to: Optional[date] = Query(default=None, alias="to"),
+        tz: str = "UTC",
+        limit: int = Query(default=100, ge=1, le=500),
+        cursor: Optional[str] = None,
+        with_total: bool = False
+) -> TeamWithGamesSchema:
+    """Получить страницу матчей конкретной команды по её ID.
+
+    Матчи можно ограничить сезоном (season_id) и периодом from - to включительно
+    в часовом поясе tz.
+    Матчи отсортированы от новых к старым. Курсор следующей страницы возвращается
+    в заголовке X-Next-Cursor, общее количество матчей (with_total) - в X-Total-Count.
+    """
+    if date_from is not None and date_to is not None and date_to < date_from:
+        raise HTTPException(status_code=422, detail="конец периода раньше его начала")
+
+    try:
+        zone = parse_timezone(tz)
+    except InvalidTimezone as e:
+        raise HTTPException(status_code=422, detail=e.msg)
+
+    try:
+        after = decode_cursor(cursor, datetime, int) if cursor is not None else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=e.msg)
+
     try:
-        team = await service.get_games_for_team(team_id)
+        team = await service.get_games_for_team(team_id, limit, after, season_id, date_from, date_to, zone)
     except Missing as m:
         raise HTTPException(status_code=404, detail=m.msg)
+
+    cursor = next_cursor(team.games, limit, lambda x: (x.game_date, x.id))
+    if cursor is not None:
+        response.headers["X-Next-Cursor"] = cursor
+    if with_total:
+        response.headers["X-Total-Count"] = str(
+            await service.count_games_for_team(team_id, season_id, date_from, date_to, zone)
+        )
     return team
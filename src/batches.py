@@ -0,0 +1,31 @@
+from typing import Callable, TypeVar
+
+from config import Config
+from errors import InvalidBatch
+from models.pydantic.batches import BatchErrorSchema, BatchSchema
+
+T = TypeVar("T")
+
+
+def parse_ids(ids: str, max_size: int = Config.LOOKUP_BATCH_MAX_SIZE) -> list[int]:
+    """Разобрать список id через запятую, повторы убираются с сохранением порядка"""
+    try:
+        result = list(dict.fromkeys(int(x) for x in ids.split(",")))
+    except ValueError:
+        raise InvalidBatch(f"некорректный список id - {ids}")
+    if len(result) > max_size:
+        raise InvalidBatch(f"за один запрос можно запросить не больше {max_size} id")
+    return result
+
+
+def to_batch_schema(
+        schema: type[T],
+        ids: list[int],
+        found: dict[int, T],
+        missing: Callable[[int], str]
+) -> BatchSchema[T]:
+    """Собирает ответ пакетного запроса: найденные записи в порядке ids и ошибки для остальных id"""
+    return BatchSchema[schema](
+        items=[found[x] for x in ids if x in found],
+        errors=[BatchErrorSchema(id=x, detail=missing(x)) for x in ids if x not in found]
+    )
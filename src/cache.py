@@ -0,0 +1,160 @@
+import functools
+import inspect
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from config import Config
+
+
+class MemoryCache:
+    """Кэш в памяти процесса с вытеснением давно неиспользуемых записей (LRU) и временем жизни (TTL)"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str) -> tuple[bool, Any]:
+        """Найти запись по ключу, возвращает пару (найдено, значение)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisCache:
+    """Кэш в redis (или совместимом хранилище), общий для всех процессов.
+
+    Значения сериализуются pickle, все ключи получают общий префикс namespace.
+    Пакет redis импортируется только при создании кэша без готового клиента.
+    """
+
+    def __init__(self, url: str | None = None, ttl: int = 300, client: Any = None,
+                 namespace: str = "fast_leagues:"):
+        if client is None:
+            from redis import asyncio as redis
+
+            client = redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+        self.namespace = namespace
+
+    async def get(self, key: str) -> tuple[bool, Any]:
+        """Найти запись по ключу, возвращает пару (найдено, значение)"""
+        raw = await self.client.get(self.namespace + key)
+        if raw is None:
+            return False, None
+        return True, pickle.loads(raw)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.client.set(self.namespace + key, pickle.dumps(value), ex=self.ttl)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        keys = [key async for key in self.client.scan_iter(match=f"{self.namespace}{prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def clear(self) -> None:
+        await self.delete_prefix("")
+
+
+def create_cache() -> MemoryCache | RedisCache | None:
+    """Создать кэш по настройкам Config.CACHE_BACKEND: memory, redis или none.
+
+    Удаление записей из кэша в памяти не доходит до других процессов,
+    поэтому memory при нескольких процессах приложения (Config.WEB_CONCURRENCY)
+    не допускается - выбрасывается ValueError.
+    """
+    if Config.CACHE_BACKEND == "redis":
+        return RedisCache(Config.REDIS_URL, Config.CACHE_TTL)
+    if Config.CACHE_BACKEND == "memory":
+        if Config.WEB_CONCURRENCY > 1:
+            raise ValueError(
+                f"CACHE_BACKEND=memory нельзя использовать с {Config.WEB_CONCURRENCY} процессами, "
+                "нужен redis или none"
+            )
+        return MemoryCache(Config.CACHE_MAX_ENTRIES, Config.CACHE_TTL)
+    return None
+
+
+_cache = create_cache()
+
+
+def get_cache() -> MemoryCache | RedisCache | None:
+    return _cache
+
+
+def set_cache(cache: MemoryCache | RedisCache | None) -> None:
+    """Заменить кэш процесса, None отключает кэширование"""
+    global _cache
+    _cache = cache
+
+
+def cached(key_template: str) -> Callable:
+    """Декоратор асинхронной функции, кэширующий её результат.
+
+    Ключ записи получается подстановкой аргументов вызова (по именам
+    параметров, с учетом значений по умолчанию) в key_template.
+    Исключения не кэшируются.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if cache is None:
+                return await func(*args, **kwargs)
+
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            key = key_template.format(**arguments.arguments)
+
+            found, value = await cache.get(key)
+            if found:
+                return value
+
+            value = await func(*args, **kwargs)
+            await cache.set(key, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate_season(season_id: int) -> None:
+    """Удалить из кэша данные, зависящие от таблицы, матчей и статистики сезона.
+
+    Кроме записей самого сезона удаляются список лиг с лидерами текущих
+    сезонов и списки сезонов лиг с лидерами.
+    """
+    cache = get_cache()
+    if cache is None:
+        return
+
+    await cache.delete_prefix(f"seasons:{season_id}:")
+    await cache.delete_prefix("leagues:all")
+    await cache.delete_prefix("leagues:seasons:")
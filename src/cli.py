@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import sys
+from collections import Counter
+
+from pydantic import TypeAdapter
+
+from database import close_mongo_db, engine, init_mongo_db
+from models.pydantic.games import GameIngestSchema
+from models.pydantic.internal import ExportDataset, ExportFormat, SnapshotFormat
+from repositories import consistency, games, snapshots, standings, stats
+from services import exports
+
+
+async def rebuild_player_stats(season_id: int | None) -> None:
+    """Пересчитать статистику игроков по документам матчей"""
+    await init_mongo_db()
+    try:
+        season_ids = await stats.rebuild_player_season_stats(season_id)
+    finally:
+        await close_mongo_db()
+    print(f"статистика игроков пересчитана для сезонов: {season_ids}")
+
+
+async def rebuild_standings(season_id: int | None) -> None:
+    """Пересчитать таблицы сезонов по результатам матчей"""
+    try:
+        season_ids = await standings.rebuild_season_standings(season_id)
+    finally:
+        await engine.dispose()
+    print(f"таблицы пересчитаны для сезонов: {season_ids}")
+
+
+async def record_game_result(game_id: int, home_scored: int, guest_scored: int) -> None:
+    """Записать результат матча и обновить таблицу его сезона"""
+    try:
+        await standings.record_game_result(game_id, home_scored, guest_scored)
+    finally:
+        await engine.dispose()
+    print(f"результат матча {game_id} записан: {home_scored}:{guest_scored}")
+
+
+async def load_games(path: str, batch_size: int) -> None:
+    """Загрузить матчи из JSON-файла (массив матчей, - для stdin) пакетами по batch_size"""
+    with (open(path, encoding="utf-8") if path != "-" else sys.stdin) as source:
+        batch = TypeAdapter(list[GameIngestSchema]).validate_json(source.read())
+
+    await init_mongo_db()
+    try:
+        for start in range(0, len(batch), batch_size):
+            result = await games.save_games(batch[start:start + batch_size])
+            print(f"матчей добавлено: {len(result.created)}, обновлено: {len(result.updated)}, "
+                  f"сезоны: {result.season_ids}")
+    finally:
+        await close_mongo_db()
+        await engine.dispose()
+
+
+async def check_games_consistency(batch_size: int, repair: bool, repair_scores: bool) -> None:
+    """Сверить матчи postgresql с документами mongo, расхождения выводятся по одному JSON в строке"""
+    await init_mongo_db()
+    issues = Counter()
+    try:
+        async for issue in consistency.check_games_consistency(batch_size, repair, repair_scores):
+            issues[issue.issue.value] += 1
+            print(issue.model_dump_json())
+    finally:
+        await close_mongo_db()
+        await engine.dispose()
+    print(f"расхождений найдено: {dict(issues)}", file=sys.stderr)
+
+
+async def export_dataset(dataset: ExportDataset, export_format: ExportFormat,
+                         season_id: int | None, path: str) -> None:
+    """Выгрузить набор данных сезона или всего архива в NDJSON или CSV (в файл или stdout)"""
+    await init_mongo_db()
+    try:
+        with (open(path, "w", encoding="utf-8", newline="") if path != "-" else sys.stdout) as target:
+            async for chunk in exports.export_dataset(dataset, export_format, season_id):
+                target.write(chunk)
+    finally:
+        await close_mongo_db()
+        await engine.dispose()
+
+
+async def write_snapshot(root: str, file_format: SnapshotFormat, batch_size: int, full: bool) -> None:
+    """Выгрузить матчи, таблицы и события матчей в parquet или arrow, разбитые по лигам и сезонам"""
+    await init_mongo_db()
+    try:
+        result = await snapshots.write_snapshot(root, file_format, batch_size, full)
+    finally:
+        await close_mongo_db()
+        await engine.dispose()
+    print(result.model_dump_json())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Служебные команды fast-leagues")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_stats_parser = commands.add_parser(
+        "rebuild-player-stats",
+        help="пересчитать статистику игроков по сезонам"
+    )
+    rebuild_stats_parser.add_argument("--season-id", type=int, default=None)
+
+    rebuild_standings_parser = commands.add_parser(
+        "rebuild-standings",
+        help="пересчитать таблицы сезонов по результатам матчей"
+    )
+    rebuild_standings_parser.add_argument("--season-id", type=int, default=None)
+
+    record_result_parser = commands.add_parser(
+        "record-game-result",
+        help="записать результат матча и обновить таблицу сезона"
+    )
+    record_result_parser.add_argument("game_id", type=int)
+    record_result_parser.add_argument("home_scored", type=int)
+    record_result_parser.add_argument("guest_scored", type=int)
+
+    load_games_parser = commands.add_parser(
+        "load-games",
+        help="загрузить матчи с составами и событиями из JSON-файла"
+    )
+    load_games_parser.add_argument("path", help="путь к файлу, - для stdin")
+    load_games_parser.add_argument("--batch-size", type=int, default=1000)
+
+    consistency_parser = commands.add_parser(
+        "check-games-consistency",
+        help="сверить матчи postgresql с документами mongo"
+    )
+    consistency_parser.add_argument("--batch-size", type=int, default=1000)
+    consistency_parser.add_argument("--repair", action="store_true", help="исправить расхождения")
+    consistency_parser.add_argument(
+        "--repair-scores",
+        action="store_true",
+        help="перезаписать записанные результаты матчей счетом по событиям документов"
+    )
+
+    export_parser = commands.add_parser(
+        "export",
+        help="выгрузить матчи, таблицы, статистику игроков или события в NDJSON или CSV"
+    )
+    export_parser.add_argument("dataset", choices=[x.value for x in ExportDataset])
+    export_parser.add_argument("--season-id", type=int, default=None)
+    export_parser.add_argument("--format", choices=[x.value for x in ExportFormat], default=ExportFormat.ndjson.value)
+    export_parser.add_argument("--output", default="-", help="путь к файлу, - для stdout")
+
+    snapshot_parser = commands.add_parser(
+        "snapshot",
+        help="выгрузить матчи, таблицы и события в parquet или arrow для аналитики"
+    )
+    snapshot_parser.add_argument("root", help="каталог снимка")
+    snapshot_parser.add_argument("--format", choices=[x.value for x in SnapshotFormat],
+                                 default=SnapshotFormat.parquet.value)
+    snapshot_parser.add_argument("--batch-size", type=int, default=1000)
+    snapshot_parser.add_argument("--full", action="store_true", help="выгрузить все матчи заново")
+
+    args = parser.parse_args()
+
+    if args.command == "rebuild-player-stats":
+        asyncio.run(rebuild_player_stats(args.season_id))
+    elif args.command == "rebuild-standings":
+        asyncio.run(rebuild_standings(args.season_id))
+    elif args.command == "record-game-result":
+        asyncio.run(record_game_result(args.game_id, args.home_scored, args.guest_scored))
+    elif args.command == "load-games":
+        asyncio.run(load_games(args.path, args.batch_size))
+    elif args.command == "check-games-consistency":
+        asyncio.run(check_games_consistency(args.batch_size, args.repair, args.repair_scores))
+    elif args.command == "export":
+        asyncio.run(export_dataset(ExportDataset(args.dataset), ExportFormat(args.format), args.season_id, args.output))
+    elif args.command == "snapshot":
+        asyncio.run(write_snapshot(args.root, SnapshotFormat(args.format), args.batch_size, args.full))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,14 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def getenv_bool(name: str, default: bool = False) -> bool:
+    """Прочитать логический флаг из переменной окружения"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 class Config:
     DB_USERNAME = os.getenv('DB_USERNAME')
     DB_PASSWORD = os.getenv('DB_PASSWORD')
@@ -13,6 +21,15 @@ class Config:
     DB_HOST = os.getenv('DB_HOST')
     DB_PORT = os.getenv('DB_PORT')
     DATABASE_URI = f'postgresql+asyncpg://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_DBNAME}'
+    DB_ECHO = getenv_bool('DB_ECHO')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = getenv_bool('DB_POOL_PRE_PING', True)
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 0))
+    DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv('DB_PREPARED_STATEMENT_CACHE_SIZE', 500))
+    DB_QUERY_CACHE_SIZE = int(os.getenv('DB_QUERY_CACHE_SIZE', 500))
 
     MONGO_USERNAME = os.getenv('MONGO_USERNAME')
     MONGO_PASSWORD = os.getenv('MONGO_PASSWORD')
@@ -20,3 +37,27 @@ class Config:
     MONGO_HOST = os.getenv('MONGO_HOST')
     MONGO_PORT = os.getenv('MONGO_PORT')
     MONGO_URI = f'mongodb://{MONGO_USERNAME}:{MONGO_PASSWORD}@{MONGO_HOST}:{MONGO_PORT}'
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 50))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 5))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', '')
+
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 300))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+
+    GAMES_BATCH_MAX_SIZE = int(os.getenv('GAMES_BATCH_MAX_SIZE', 5000))
+    INGEST_API_TOKEN = os.getenv('INGEST_API_TOKEN', '')
+
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+
+    LOOKUP_BATCH_MAX_SIZE = int(os.getenv('LOOKUP_BATCH_MAX_SIZE', 100))
+
+    STANDINGS_TIEBREAKERS = tuple(
+        x.strip() for x in os.getenv('STANDINGS_TIEBREAKERS', 'goal_difference,scored').split(',') if x.strip()
+    )
+
+    LIVE_HEARTBEAT_SECONDS = float(os.getenv('LIVE_HEARTBEAT_SECONDS', 15))
+    LIVE_QUEUE_SIZE = int(os.getenv('LIVE_QUEUE_SIZE', 100))
@@ -1,17 +1,102 @@
 import asyncio
+import logging
+import time
 
-from beanie import init_beanie
-from motor.motor_asyncio import AsyncIOMotorClient
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from beanie import Document, init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from sqlalchemy import exc, make_url
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
 
 from config import Config
 from models.db.base import Base
 from models.mongo_documents.games import GameDocument
+from models.mongo_documents.stats import PlayerSeasonStatsDocument
 
-engine = create_async_engine(Config.DATABASE_URI, echo=True)
+logger = logging.getLogger(__name__)
+
+MONGO_DOCUMENT_MODELS = [GameDocument, PlayerSeasonStatsDocument]
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений postgresql со счетчиками для метрик.
+
+    Считает выдачи соединений, которым пришлось ждать освобождения
+    соединения (пул и overflow исчерпаны), суммарное время ожидания,
+    таймауты ожидания и выдачи соединений сверх pool_size.
+    """
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        self.max_overflow = max_overflow
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.overflow_checkouts = 0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        saturated = self.overflow() >= self.max_overflow > -1 and self.checkedin() == 0
+        overflow_before = self.overflow()
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            if saturated:
+                self.waits += 1
+                self.wait_seconds += time.perf_counter() - started
+
+        if self.overflow() > max(overflow_before, 0):
+            self.overflow_checkouts += 1
+        return entry
+
+
+engine = create_async_engine(
+    make_url(Config.DATABASE_URI).update_query_dict(
+        {"prepared_statement_cache_size": str(Config.DB_PREPARED_STATEMENT_CACHE_SIZE)}
+    ),
+    echo=Config.DB_ECHO,
+    query_cache_size=Config.DB_QUERY_CACHE_SIZE,
+    poolclass=MonitoredQueuePool,
+    pool_size=Config.DB_POOL_SIZE,
+    max_overflow=Config.DB_MAX_OVERFLOW,
+    pool_timeout=Config.DB_POOL_TIMEOUT,
+    pool_recycle=Config.DB_POOL_RECYCLE,
+    pool_pre_ping=Config.DB_POOL_PRE_PING,
+    connect_args=(
+        {"server_settings": {"statement_timeout": str(Config.DB_STATEMENT_TIMEOUT_MS)}}
+        if Config.DB_STATEMENT_TIMEOUT_MS > 0 else {}
+    )
+)
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
 
+def dialect_insert(session: AsyncSession, table):
+    """INSERT диалекта БД сессии (postgresql или sqlite в тестах) с поддержкой ON CONFLICT"""
+    if session.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
+def get_pool_metrics(pool: MonitoredQueuePool | None = None) -> dict[str, int | float]:
+    """Текущее состояние и накопленные счетчики пула соединений postgresql"""
+    pool = pool if pool is not None else engine.pool
+    return dict(
+        size=pool.size(),
+        max_overflow=max(pool.max_overflow, 0),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=max(pool.overflow(), 0),
+        overflow_checkouts=pool.overflow_checkouts,
+        waits=pool.waits,
+        wait_seconds=round(pool.wait_seconds, 6),
+        timeouts=pool.timeouts
+    )
+
+
 async def create_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -19,13 +104,130 @@ async def create_tables():
     await engine.dispose()
 
 
+_mongo_client: AsyncIOMotorClient | None = None
+_mongo_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_mongo_client() -> AsyncIOMotorClient:
+    """Общий для процесса клиент mongo с настройками пула из Config.
+
+    Клиент создается при первом обращении и переиспользуется. Клиент motor
+    привязан к циклу событий, поэтому при обращении из другого цикла
+    (повторный asyncio.run в CLI, тесты) старый клиент закрывается и создается новый.
+    """
+    global _mongo_client, _mongo_client_loop
+    loop = asyncio.get_running_loop()
+    if _mongo_client is not None and _mongo_client_loop is not loop:
+        _mongo_client.close()
+        _mongo_client = None
+
+    if _mongo_client is None:
+        options = dict(
+            maxPoolSize=Config.MONGO_MAX_POOL_SIZE,
+            minPoolSize=Config.MONGO_MIN_POOL_SIZE,
+            serverSelectionTimeoutMS=Config.MONGO_SERVER_SELECTION_TIMEOUT_MS
+        )
+        if Config.MONGO_COMPRESSORS:
+            options["compressors"] = Config.MONGO_COMPRESSORS
+        _mongo_client = AsyncIOMotorClient(Config.MONGO_URI, **options)
+        _mongo_client_loop = loop
+
+    return _mongo_client
+
+
 async def init_mongo_db():
-    client = AsyncIOMotorClient(Config.MONGO_URI)
+    client = get_mongo_client()
+    database = client[Config.MONGO_DBNAME]
+
+    conflicts = await find_mongo_index_conflicts(database, MONGO_DOCUMENT_MODELS)
+    if conflicts:
+        raise RuntimeError("индексы mongo конфликтуют с объявленными в моделях:\n" + "\n".join(conflicts))
 
     await init_beanie(
-        database=client[Config.MONGO_DBNAME],
-        document_models=[GameDocument]
+        database=database,
+        document_models=MONGO_DOCUMENT_MODELS
     )
+    await verify_mongo_indexes(MONGO_DOCUMENT_MODELS)
+
+
+async def close_mongo_db():
+    """Закрыть общий клиент mongo и его пул соединений"""
+    global _mongo_client, _mongo_client_loop
+    if _mongo_client is not None:
+        _mongo_client.close()
+    _mongo_client = _mongo_client_loop = None
+
+
+async def find_mongo_index_conflicts(
+        database: AsyncIOMotorDatabase,
+        document_models: list[type[Document]]
+) -> list[str]:
+    """Найти индексы mongo, которые не дают создать объявленные в моделях документов.
+
+    Проверка выполняется до инициализации beanie по настройкам моделей: индекс
+    с объявленным именем, но другими ключами или уникальностью, и индекс с теми же
+    ключами под другим именем. Конфликты пишутся в лог и возвращаются списком.
+    """
+    report = []
+    for model in document_models:
+        collection = database[model.Settings.name]
+        existing = {
+            name: ([(field, direction) for field, direction in info["key"]], info.get("unique", False))
+            for name, info in (await collection.index_information()).items()
+        }
+
+        for index in model.Settings.indexes:
+            declared = index.document
+            name = declared["name"]
+            keys = list(declared["key"].items())
+            unique = declared.get("unique", False)
+
+            if name in existing:
+                actual_keys, actual_unique = existing[name]
+                if (actual_keys, actual_unique) != (keys, unique):
+                    report.append(
+                        f"{collection.name}: индекс {name} отличается от объявленного - "
+                        f"ожидалось {keys}, unique={unique}, "
+                        f"в базе {actual_keys}, unique={actual_unique}"
+                    )
+                continue
+
+            for actual_name, (actual_keys, _) in existing.items():
+                if actual_keys == keys:
+                    report.append(f"{collection.name}: индекс {name} уже есть в базе под именем {actual_name}")
+
+    for line in report:
+        logger.error(line)
+
+    return report
+
+
+async def verify_mongo_indexes(document_models: list[type[Document]]) -> list[str]:
+    """Сверить индексы коллекций mongo с объявленными в моделях документов.
+
+    Недостающие индексы создаются при инициализации beanie, а конфликтующие
+    находит find_mongo_index_conflicts до нее. Поэтому здесь проверяется,
+    что все объявленные индексы есть и что в базе нет необъявленных индексов.
+    Расхождения пишутся в лог и возвращаются списком.
+    """
+    report = []
+    for model in document_models:
+        collection = model.get_motor_collection()
+        existing = await collection.index_information()
+        existing.pop("_id_", None)
+
+        for index in model.get_settings().indexes:
+            name = index.index.document["name"]
+            if existing.pop(name, None) is None:
+                report.append(f"{collection.name}: индекс {name} отсутствует")
+
+        for name in existing:
+            report.append(f"{collection.name}: индекс {name} не объявлен в модели")
+
+    for line in report:
+        logger.warning(line)
+
+    return report
 
 
 if __name__ == '__main__':
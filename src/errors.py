@@ -3,3 +3,18 @@
 class Missing(Exception):
     def __init__(self, msg: str):
         self.msg = msg
+
+
+class InvalidCursor(Exception):
+    def __init__(self, msg: str):
+        self.msg = msg
+
+
+class InvalidBatch(Exception):
+    def __init__(self, msg: str):
+        self.msg = msg
+
+
+class InvalidTimezone(Exception):
+    def __init__(self, msg: str):
+        self.msg = msg
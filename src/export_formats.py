@@ -0,0 +1,52 @@
+import csv
+import io
+from datetime import date
+from typing import AsyncIterator, Iterable
+
+import orjson
+
+from models.pydantic.internal import ExportFormat
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+async def encode_rows(
+        export_format: ExportFormat,
+        columns: tuple[str, ...],
+        rows: AsyncIterator[tuple],
+        chunk_rows: int = 500
+) -> AsyncIterator[str]:
+    """Закодировать поток строк в NDJSON или CSV.
+
+    Строки отдаются кусками по chunk_rows, чтобы не писать в сокет каждую
+    строку отдельно. CSV начинается со строки заголовков.
+    """
+    encode = _ndjson_lines if export_format == ExportFormat.ndjson else _csv_lines
+    if export_format == ExportFormat.csv:
+        yield _csv_lines(columns, [columns])
+
+    chunk = []
+    async for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield encode(columns, chunk)
+            chunk = []
+    if chunk:
+        yield encode(columns, chunk)
+
+
+def _ndjson_lines(columns: tuple[str, ...], rows: Iterable[tuple]) -> str:
+    return "".join(orjson.dumps(dict(zip(columns, row))).decode() + "\n" for row in rows)
+
+
+def _csv_lines(columns: tuple[str, ...], rows: Iterable[tuple]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows(
+        [value.isoformat() if isinstance(value, date) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
@@ -0,0 +1,278 @@
+import asyncio
+import json
+import logging
+from collections import Counter
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import Config
+from database import async_session, engine
+from models.mongo_documents.games import EventEmbeddedObject, EventType, GameDocument
+from models.pydantic.games import GameEventSchema, GameScoreSchema
+from models.pydantic.persons import BasePersonSchema
+
+logger = logging.getLogger(__name__)
+
+SCORING_EVENTS = {EventType.goal, EventType.penalty_goal, EventType.own_goal}
+
+# канал postgresql LISTEN/NOTIFY, через который процессы, пишущие матчи, сообщают об изменениях
+LIVE_CHANNEL = "live_games"
+# предел размера уведомления postgresql (8000 байт) с запасом
+NOTIFY_PAYLOAD_MAX_BYTES = 7900
+
+_NOTIFY_STATEMENT = text("SELECT pg_notify(:channel, :payload)")
+
+
+class LiveGameBroker:
+    """Рассылка изменений матчей подписчикам внутри процесса.
+
+    Каждый подписчик получает свою очередь сообщений (событие, данные).
+    Если подписчик не успевает читать, старые сообщения вытесняются новыми.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, game_id: int) -> AsyncIterator[asyncio.Queue]:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(game_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers[game_id]
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[game_id]
+
+    def subscribers_count(self, game_id: int) -> int:
+        return len(self._subscribers.get(game_id, ()))
+
+    def publish(self, game_id: int, event: str, data: dict) -> None:
+        for queue in self._subscribers.get(game_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait((event, data))
+
+
+broker = LiveGameBroker(Config.LIVE_QUEUE_SIZE)
+
+
+def game_score(game: GameDocument) -> GameScoreSchema:
+    """Счет матча по событиям документа, автогол засчитывается сопернику"""
+    return score_from_events(
+        {p.id for p in game.home_start_composition + game.home_substitution},
+        ((event.event_type, event.person.id) for event in game.events)
+    )
+
+
+def score_from_events(
+        home_player_ids: set[int],
+        events: Iterable[tuple[EventType, int]]
+) -> GameScoreSchema:
+    """Счет матча по парам (тип события, id игрока), автогол засчитывается сопернику"""
+    home_scored = guest_scored = 0
+
+    for event_type, person_id in events:
+        if event_type not in SCORING_EVENTS:
+            continue
+        if (event_type == EventType.own_goal) != (person_id in home_player_ids):
+            home_scored += 1
+        else:
+            guest_scored += 1
+
+    return GameScoreSchema(home_scored=home_scored, guest_scored=guest_scored)
+
+
+def new_events(previous_game: GameDocument | None, game: GameDocument) -> list[EventEmbeddedObject]:
+    """События новой версии документа матча, которых не было в предыдущей"""
+    seen = Counter()
+    if previous_game is not None:
+        seen.update(_event_key(event) for event in previous_game.events)
+
+    result = []
+    for event in game.events:
+        key = _event_key(event)
+        if seen[key] > 0:
+            seen[key] -= 1
+        else:
+            result.append(event)
+
+    return result
+
+
+def _event_key(event: EventEmbeddedObject) -> tuple:
+    return event.event_type, event.minute, event.person.id
+
+
+def game_change_messages(previous_game: GameDocument | None, game: GameDocument) -> list[tuple[str, dict]]:
+    """Сообщения подписчикам матча: его новые события и счет, если он изменился"""
+    messages = []
+    for event in new_events(previous_game, game):
+        schema = GameEventSchema(
+            event_type=event.event_type.value,
+            minute=event.minute,
+            person=BasePersonSchema(id=event.person.id, name=event.person.name)
+        )
+        messages.append(("game_event", schema.model_dump(mode="json")))
+
+    score = game_score(game)
+    if previous_game is None or game_score(previous_game) != score:
+        messages.append(("score", score.model_dump()))
+
+    return messages
+
+
+def game_notification(
+        game_id: int,
+        messages: Iterable[tuple[str, dict]] = (),
+        refresh_score: bool = False
+) -> str:
+    """Уведомление канала LIVE_CHANNEL об изменении матча в формате JSON.
+
+    refresh_score - слушатель сам перечитает и разошлет счет матча. Если сообщения
+    не помещаются в уведомление postgresql, вместо них рассылается перечитанный счет.
+    """
+    payload = json.dumps(
+        {"game_id": game_id, "messages": list(messages), "refresh_score": refresh_score},
+        ensure_ascii=False
+    )
+    if len(payload.encode()) > NOTIFY_PAYLOAD_MAX_BYTES:
+        payload = json.dumps({"game_id": game_id, "messages": [], "refresh_score": True})
+    return payload
+
+
+async def notify_game_changes(session: AsyncSession, payloads: list[str]) -> None:
+    """Отправить уведомления об изменениях матчей в транзакции сессии.
+
+    postgresql доставляет их слушателям (watch_game_notifications) всех процессов
+    только при фиксации транзакции. В других БД (sqlite в тестах) LISTEN/NOTIFY нет,
+    и уведомления не отправляются.
+    """
+    if not payloads or session.get_bind().dialect.name != "postgresql":
+        return
+    await session.execute(_NOTIFY_STATEMENT, [{"channel": LIVE_CHANNEL, "payload": x} for x in payloads])
+
+
+async def send_game_notifications(payloads: list[str]) -> None:
+    """Отправить уведомления об изменениях матчей отдельной транзакцией - для записей только в mongo"""
+    if not payloads:
+        return
+    async with async_session() as session:
+        await notify_game_changes(session, payloads)
+        await session.commit()
+
+
+async def deliver_notification(payload: str, get_score: Callable[[int], Awaitable[GameScoreSchema]]) -> None:
+    """Разослать подписчикам матча изменения из уведомления канала LIVE_CHANNEL"""
+    try:
+        notification = json.loads(payload)
+        game_id = notification["game_id"]
+        if broker.subscribers_count(game_id) == 0:
+            return
+
+        for event, data in notification["messages"]:
+            broker.publish(game_id, event, data)
+        if notification["refresh_score"]:
+            score = await get_score(game_id)
+            broker.publish(game_id, "score", score.model_dump())
+    except Exception:
+        logger.warning("уведомление об изменении матча пропущено: %s", payload, exc_info=True)
+
+
+async def watch_game_notifications(
+        get_score: Callable[[int], Awaitable[GameScoreSchema]],
+        retry_delay: float = 1,
+        max_retry_delay: float = 60,
+        ping_interval: float = Config.LIVE_HEARTBEAT_SECONDS
+) -> None:
+    """Транслировать в broker изменения матчей из канала LIVE_CHANNEL postgresql.
+
+    Для LISTEN из пула берется одно соединение на все время работы, раз в
+    ping_interval секунд оно проверяется запросом. При ошибке соединение
+    открывается заново, паузы между попытками растут от retry_delay до
+    max_retry_delay. Уведомления, отправленные во время переподключения,
+    теряются - подписчики получат следующие изменения.
+    """
+    delay = retry_delay
+    tasks = set()
+
+    def on_notification(_connection, _pid, _channel, payload: str) -> None:
+        task = asyncio.create_task(deliver_notification(payload, get_score))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    while True:
+        try:
+            async with engine.connect() as connection:
+                listener = (await connection.get_raw_connection()).driver_connection
+                await listener.add_listener(LIVE_CHANNEL, on_notification)
+                try:
+                    delay = retry_delay
+                    while True:
+                        await asyncio.sleep(ping_interval)
+                        await listener.execute("SELECT 1")
+                finally:
+                    with suppress(Exception):
+                        await listener.remove_listener(LIVE_CHANNEL, on_notification)
+        except Exception:
+            logger.warning("прослушивание изменений матчей прервано, повтор через %s с", delay, exc_info=True)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_retry_delay)
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Сообщение в формате server-sent events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_game(
+        game_id: int,
+        get_score: Callable[[int], Awaitable[GameScoreSchema]],
+        heartbeat: float = Config.LIVE_HEARTBEAT_SECONDS
+) -> AsyncIterator[str]:
+    """Поток server-sent events матча: текущий счет, затем новые события и изменения счета.
+
+    Счет читается get_score уже после подписки на изменения матча, поэтому
+    изменения, опубликованные во время чтения, не теряются. Если изменений
+    нет дольше heartbeat секунд, отправляется комментарий, чтобы соединение
+    не закрывалось прокси и обрыв клиента обнаруживался.
+    """
+    async with broker.subscribe(game_id) as queue:
+        score = await get_score(game_id)
+        yield format_sse("score", score.model_dump())
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event, data)
+
+
+async def open_game_stream(
+        game_id: int,
+        get_score: Callable[[int], Awaitable[GameScoreSchema]],
+        heartbeat: float = Config.LIVE_HEARTBEAT_SECONDS
+) -> AsyncIterator[str]:
+    """Начать поток матча stream_game: подписаться и прочитать текущий счет.
+
+    Ошибки чтения счета (например, Missing для несуществующего матча)
+    выбрасываются сразу, до начала ответа клиенту.
+    """
+    stream = stream_game(game_id, get_score, heartbeat)
+    first = await anext(stream)
+    return _prepend(first, stream)
+
+
+async def _prepend(first: str, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+    try:
+        yield first
+        async for message in stream:
+            yield message
+    finally:
+        await stream.aclose()
@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 import uvicorn
 
@@ -5,18 +8,38 @@ from api.leagues import router as leagues_router
 from api.teams import router as teams_router
 from api.persons import router as persons_router
 from api.games import router as games_router
-from database import init_mongo_db
+from api.internal import router as internal_router
+from api.exports import router as exports_router
+from database import close_mongo_db, engine, init_mongo_db
+from services.games import watch_game_notifications
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Открывает соединения с БД при запуске приложения и закрывает их при остановке.
+
+    На время работы приложения запускается трансляция подписчикам изменений
+    матчей из уведомлений postgresql.
+    """
+    await init_mongo_db()
+    watcher = asyncio.create_task(watch_game_notifications())
+    try:
+        yield
+    finally:
+        watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await watcher
+        await close_mongo_db()
+        await engine.dispose()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(leagues_router)
 app.include_router(teams_router)
 app.include_router(persons_router)
 app.include_router(games_router)
-
-
-@app.on_event("startup")
-async def startup():
-    await init_mongo_db()
+app.include_router(internal_router)
+app.include_router(exports_router)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,47 @@
+"""added indexes for hot queries
+
+Revision ID: c4e8a1f2d9b7
+Revises: 383d546f2103
+Create Date: 2026-10-17 12:04:31.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f2d9b7'
+down_revision: Union[str, None] = '383d546f2103'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_games_season_id_game_date', 'games', ['season_id', 'game_date'])
+    op.create_index('ix_games_home_team_id_game_date', 'games', ['home_team_id', 'game_date'])
+    op.create_index('ix_games_guest_team_id_game_date', 'games', ['guest_team_id', 'game_date'])
+    op.create_index('ix_games_game_date', 'games', ['game_date'])
+    op.create_index('ix_seasons_league_id', 'seasons', ['league_id'])
+    op.create_index('ix_seasons_league_id_current', 'seasons', ['league_id'],
+                    postgresql_where=sa.text('is_current_season = true'))
+    op.create_index('ix_seasons_teams_season_id_position', 'seasons_teams', ['season_id', 'position'],
+                    postgresql_include=['team_id', 'games', 'wins', 'draws', 'loses',
+                                        'scored_goals', 'conceded_goals', 'points'])
+    op.create_index('ix_seasons_teams_team_id', 'seasons_teams', ['team_id'])
+    op.create_index('ix_players_team_id', 'players', ['team_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_players_team_id', table_name='players')
+    op.drop_index('ix_seasons_teams_team_id', table_name='seasons_teams')
+    op.drop_index('ix_seasons_teams_season_id_position', table_name='seasons_teams')
+    op.drop_index('ix_seasons_league_id_current', table_name='seasons')
+    op.drop_index('ix_seasons_league_id', table_name='seasons')
+    op.drop_index('ix_games_game_date', table_name='games')
+    op.drop_index('ix_games_guest_team_id_game_date', table_name='games')
+    op.drop_index('ix_games_home_team_id_game_date', table_name='games')
+    op.drop_index('ix_games_season_id_game_date', table_name='games')
@@ -0,0 +1,29 @@
+"""added seasons version
+
+Revision ID: e2b7d5a91c3f
+Revises: c4e8a1f2d9b7
+Create Date: 2026-10-17 14:21:09.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7d5a91c3f'
+down_revision: Union[str, None] = 'c4e8a1f2d9b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('seasons',
+                  sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('seasons', 'version')
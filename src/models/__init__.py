@@ -1,5 +1,6 @@
 from models.pydantic.games import (
     GameEventSchema,
+    GameScoreSchema,
     GameDetailSchema,
     BaseGameSchema,
     GameWithSeasonSchema,
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Annotated, TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from models.db.base import Base
@@ -17,6 +17,12 @@ int_pk = Annotated[int, mapped_column(primary_key=True)]
 
 class Game(Base):
     __tablename__ = "games"
+    __table_args__ = (
+        Index("ix_games_season_id_game_date", "season_id", "game_date"),
+        Index("ix_games_home_team_id_game_date", "home_team_id", "game_date"),
+        Index("ix_games_guest_team_id_game_date", "guest_team_id", "game_date"),
+        Index("ix_games_game_date", "game_date"),
+    )
     id: Mapped[int_pk]
     game_date: Mapped[datetime] = mapped_column(nullable=True)
     season_id: Mapped[int] = mapped_column(ForeignKey("seasons.id", ondelete="CASCADE"))
@@ -1,6 +1,6 @@
 from typing import Annotated, TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, text
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from models.db.base import Base
@@ -37,9 +37,19 @@ class League(Base):
 
 class Season(Base):
     __tablename__ = "seasons"
+    __table_args__ = (
+        Index("ix_seasons_league_id", "league_id"),
+        Index(
+            "ix_seasons_league_id_current",
+            "league_id",
+            postgresql_where=text("is_current_season = true"),
+            sqlite_where=text("is_current_season = 1")
+        ),
+    )
     id: Mapped[int_pk]
     name: Mapped[str]
     is_current_season: Mapped[bool] = mapped_column(default=False)
+    version: Mapped[int] = mapped_column(default=0, server_default="0")
     league_id: Mapped[int] = mapped_column(ForeignKey("leagues.id", ondelete="CASCADE"))
 
     league: Mapped["League"] = relationship(back_populates="seasons")
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Annotated, TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from models.db.base import Base
@@ -32,6 +32,9 @@ class Person(Base):
 
 class Player(Base):
     __tablename__ = "players"
+    __table_args__ = (
+        Index("ix_players_team_id", "team_id"),
+    )
     id: Mapped[int_pk]
     team_number: Mapped[int] = mapped_column(nullable=True, default=None)
     person_id: Mapped[int] = mapped_column(
@@ -1,6 +1,6 @@
 from typing import Annotated, TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from models.db.base import Base
@@ -41,6 +41,18 @@ class Team(Base):
 
 class SeasonTeam(Base):
     __tablename__ = "seasons_teams"
+    __table_args__ = (
+        Index(
+            "ix_seasons_teams_season_id_position",
+            "season_id",
+            "position",
+            postgresql_include=[
+                "team_id", "games", "wins", "draws", "loses",
+                "scored_goals", "conceded_goals", "points"
+            ]
+        ),
+        Index("ix_seasons_teams_team_id", "team_id"),
+    )
     season_id: Mapped[int] = mapped_column(
         ForeignKey("seasons.id", ondelete="CASCADE"),
         primary_key=True
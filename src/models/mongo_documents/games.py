@@ -3,6 +3,7 @@ from typing import Optional
 
 from beanie import Document
 from pydantic import BaseModel
+from pymongo import ASCENDING, IndexModel
 
 
 class EventType(Enum):
@@ -46,3 +47,12 @@ class GameDocument(Document):
 
     class Settings:
         name = "games"
+        indexes = [
+            IndexModel([("game_id", ASCENDING)], name="game_id", unique=True),
+            IndexModel([("season_id", ASCENDING)], name="season_id"),
+            IndexModel([("league_id", ASCENDING)], name="league_id"),
+            IndexModel(
+                [("events.event_type", ASCENDING), ("events.person.id", ASCENDING)],
+                name="events_event_type_person_id"
+            ),
+        ]
@@ -0,0 +1,40 @@
+from beanie import Document
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from models.mongo_documents.games import EventType, TeamEmbeddedObject
+
+
+STAT_FIELDS = ['appearances'] + [f'{event_type.value}s' for event_type in EventType]
+
+
+class PlayerSeasonStatsDocument(Document):
+    season_id: int
+    league_id: int
+    player_id: int
+    name: str
+    team: 'TeamEmbeddedObject'
+    appearances: int = 0
+    goals: int = 0
+    own_goals: int = 0
+    assists: int = 0
+    penalty_goals: int = 0
+    unrealized_penalty_goals: int = 0
+    yellow_cards: int = 0
+    red_cards: int = 0
+
+    class Settings:
+        name = "player_season_stats"
+        indexes = [
+            IndexModel(
+                [("season_id", ASCENDING), ("player_id", ASCENDING)],
+                name="season_id_player_id",
+                unique=True
+            )
+        ] + [
+            IndexModel(
+                [("season_id", ASCENDING), (f"{event_type.value}s", DESCENDING), ("appearances", ASCENDING),
+                 ("name", ASCENDING), ("player_id", ASCENDING)],
+                name=f"season_id_{event_type.value}s"
+            )
+            for event_type in EventType
+        ]
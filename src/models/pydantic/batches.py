@@ -0,0 +1,15 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class BatchErrorSchema(BaseModel):
+    id: int
+    detail: str
+
+
+class BatchSchema(BaseModel, Generic[T]):
+    items: list[T]
+    errors: list[BatchErrorSchema]
@@ -4,6 +4,8 @@ from typing import TYPE_CHECKING, Optional
 
 from pydantic import BaseModel, Field
 
+from models.mongo_documents.games import EventEmbeddedObject, PersonEmbeddedObject
+
 if TYPE_CHECKING:
     from models.pydantic.leagues import (
         SeasonSchema,
@@ -49,9 +51,37 @@ class GameEventSchema(BaseModel):
     person: 'BasePersonSchema'
 
 
+class GameScoreSchema(BaseModel):
+    home_scored: Optional[int]
+    guest_scored: Optional[int]
+
+
 class GameDetailSchema(GameWithSeasonSchema):
     home_team_composition: list['PlayerInGameSchema']
     guest_team_composition: list['PlayerInGameSchema']
     home_manager: Optional['BasePersonSchema']
     guest_manager: Optional['BasePersonSchema']
     game_events: list['GameEventSchema']
+
+
+class GameIngestSchema(BaseModel):
+    id: int
+    season_id: int
+    game_date: Optional[datetime] = None
+    home_team_id: int
+    guest_team_id: int
+    home_scored: Optional[int] = Field(ge=0, default=None)
+    guest_scored: Optional[int] = Field(ge=0, default=None)
+    home_start_composition: list[PersonEmbeddedObject] = []
+    guest_start_composition: list[PersonEmbeddedObject] = []
+    home_substitution: list[PersonEmbeddedObject] = []
+    guest_substitution: list[PersonEmbeddedObject] = []
+    home_manager: Optional[PersonEmbeddedObject] = None
+    guest_manager: Optional[PersonEmbeddedObject] = None
+    events: list[EventEmbeddedObject] = []
+
+
+class GamesBatchResultSchema(BaseModel):
+    created: list[int]
+    updated: list[int]
+    season_ids: list[int]
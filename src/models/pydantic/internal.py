@@ -0,0 +1,54 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class PoolMetricsSchema(BaseModel):
+    size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    overflow_checkouts: int
+    waits: int
+    wait_seconds: float
+    timeouts: int
+
+
+class ConsistencyIssueType(str, Enum):
+    missing_document = 'missing_document'
+    orphan_document = 'orphan_document'
+    season_mismatch = 'season_mismatch'
+    score_mismatch = 'score_mismatch'
+
+
+class ConsistencyIssueSchema(BaseModel):
+    game_id: int
+    issue: ConsistencyIssueType
+    detail: str
+    repaired: bool = False
+
+
+class ExportDataset(str, Enum):
+    games = 'games'
+    standings = 'standings'
+    player_stats = 'player_stats'
+    events = 'events'
+
+
+class ExportFormat(str, Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
+
+
+class SnapshotFormat(str, Enum):
+    parquet = 'parquet'
+    arrow = 'arrow'
+
+
+class SnapshotResultSchema(BaseModel):
+    games: int
+    events: int
+    standings: int
+    last_game_id: int
+    rewritten_seasons: int = 0
@@ -18,7 +18,7 @@ class BasePersonSchema(BaseModel):
 class PersonDetailsSchema(BasePersonSchema):
     full_name: str
     birth_date: datetime
-    country: 'CountrySchema'
+    country: Optional['CountrySchema']
     team: Optional['BaseTeamSchema']
 
 
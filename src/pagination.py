@@ -0,0 +1,50 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence
+
+from errors import InvalidCursor
+
+
+def encode_cursor(*values: int | str | datetime | None) -> str:
+    """Закодировать значения ключа сортировки последней записи страницы в непрозрачный курсор"""
+    payload = [x.isoformat() if isinstance(x, datetime) else x for x in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Раскодировать курсор в значения ключа сортировки указанных типов.
+
+    Значения типа datetime могут быть пустыми (None).
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError
+        return tuple(
+            _decode_value(value, value_type)
+            for value, value_type in zip(payload, types)
+        )
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise InvalidCursor(f"некорректный курсор пагинации - {cursor}")
+
+
+def _decode_value(value: Any, value_type: type) -> Any:
+    """Привести значение из курсора к типу ключа сортировки"""
+    if value_type is datetime:
+        return None if value is None else datetime.fromisoformat(value)
+    if not isinstance(value, (int, str)):
+        raise ValueError
+    return value_type(value)
+
+
+def next_cursor(
+        items: Sequence[Any],
+        limit: int,
+        key: Callable[[Any], tuple]
+) -> str | None:
+    """Курсор следующей страницы, если текущая страница заполнена полностью"""
+    if len(items) < limit:
+        return None
+    return encode_cursor(*key(items[-1]))
@@ -0,0 +1,34 @@
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from errors import InvalidTimezone
+
+
+UTC = ZoneInfo("UTC")
+
+
+def parse_timezone(tz: str) -> ZoneInfo:
+    """Разобрать название часового пояса из базы IANA, например Europe/Moscow"""
+    try:
+        return ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise InvalidTimezone(f"неизвестный часовой пояс - {tz}")
+
+
+def to_utc(day: date, tz: ZoneInfo) -> datetime:
+    """Начало дня в часовом поясе tz в виде времени UTC без указания пояса"""
+    return datetime.combine(day, time.min, tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_utc_period(
+        date_from: date | None,
+        date_to: date | None,
+        tz: ZoneInfo
+) -> tuple[datetime | None, datetime | None]:
+    """Переводит дни с date_from по date_to включительно по календарю пояса tz в полуинтервал UTC [start, end).
+
+    Незаданная граница периода остается None.
+    """
+    start = to_utc(date_from, tz) if date_from is not None else None
+    end = to_utc(date_to + timedelta(days=1), tz) if date_to is not None else None
+    return start, end
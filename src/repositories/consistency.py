@@ -0,0 +1,186 @@
+from typing import Any, AsyncIterator
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.engine import Row
+
+from database import async_session
+from live import score_from_events
+from models.db.games import Game
+from models.db.leagues import Season
+from models.mongo_documents.games import EventType, GameDocument
+from models.pydantic.internal import ConsistencyIssueSchema, ConsistencyIssueType
+from repositories.games import save_game_document
+from repositories.standings import record_game_result
+from repositories.stats import apply_games_to_player_stats
+
+
+DOCUMENT_PROJECTION = {
+    "_id": 0,
+    "game_id": 1,
+    "season_id": 1,
+    "league_id": 1,
+    "home_start_composition.id": 1,
+    "home_substitution.id": 1,
+    "events.event_type": 1,
+    "events.person.id": 1,
+}
+
+
+_GAMES_BATCH_QUERY = select(
+    Game.id,
+    Game.season_id,
+    Season.league_id,
+    Game.home_scored,
+    Game.guest_scored
+).join(
+    Season, Season.id == Game.season_id
+).filter(
+    Game.id > bindparam("after")
+).order_by(
+    Game.id
+).limit(
+    bindparam("limit")
+)
+
+
+async def check_games_consistency(
+        batch_size: int = 1000,
+        repair: bool = False,
+        repair_scores: bool = False
+) -> AsyncIterator[ConsistencyIssueSchema]:
+    """Сверить матчи postgresql с их документами в mongo, выдавая найденные расхождения.
+
+    Обе БД читаются параллельно отсортированными по id матча пачками (keyset),
+    в памяти одновременно находится не больше batch_size записей каждой БД.
+    Проверяются:
+        missing_document - для матча нет документа
+        orphan_document  - для документа нет матча
+        season_mismatch  - season_id или league_id документа расходится с postgresql
+        score_mismatch   - счет матча расходится с голами в событиях документа
+                           (автогол засчитывается сопернику)
+
+    При repair=True расхождения исправляются, источником истины считается
+    postgresql для сезона и лиги. Документы без матча удаляются с вычитанием
+    из статистики игроков. Счет по событиям документа записывается только
+    матчам без результата в postgresql: записанный результат официальный, а
+    неполный список событий - как раз то, что ищет сверка. Перезаписать
+    расходящиеся результаты счетом по событиям можно явно, repair_scores=True.
+    Матчи без документа и расхождения счета с документом без голов только
+    попадают в отчет.
+    """
+    games = _iter_games(batch_size)
+    documents = _iter_documents(batch_size)
+    game = await anext(games, None)
+    document = await anext(documents, None)
+
+    while game is not None or document is not None:
+        if document is None or (game is not None and game.id < document["game_id"]):
+            yield ConsistencyIssueSchema(
+                game_id=game.id,
+                issue=ConsistencyIssueType.missing_document,
+                detail="нет документа матча в mongo"
+            )
+            game = await anext(games, None)
+        elif game is None or document["game_id"] < game.id:
+            yield await _orphan_document_issue(document, repair)
+            document = await anext(documents, None)
+        else:
+            for issue in await _compare(game, document, repair, repair_scores):
+                yield issue
+            game = await anext(games, None)
+            document = await anext(documents, None)
+
+
+async def _get_games_batch(after: int, limit: int) -> list[Row]:
+    """Выгрузить из postgresql пачку матчей с id больше after"""
+    async with async_session() as session:
+        result = await session.execute(_GAMES_BATCH_QUERY, {"after": after, "limit": limit})
+        return list(result.all())
+
+
+async def _get_documents_batch(after: int, limit: int) -> list[dict[str, Any]]:
+    """Выгрузить из mongo пачку документов матчей с game_id больше after, только нужные для сверки поля"""
+    cursor = GameDocument.get_motor_collection().find(
+        {"game_id": {"$gt": after}},
+        DOCUMENT_PROJECTION
+    ).sort("game_id", 1).limit(limit)
+    return await cursor.to_list(limit)
+
+
+async def _iter_games(batch_size: int) -> AsyncIterator[Row]:
+    after = 0
+    while batch := await _get_games_batch(after, batch_size):
+        for game in batch:
+            yield game
+        after = batch[-1].id
+
+
+async def _iter_documents(batch_size: int) -> AsyncIterator[dict[str, Any]]:
+    after = 0
+    while batch := await _get_documents_batch(after, batch_size):
+        for document in batch:
+            yield document
+        after = batch[-1]["game_id"]
+
+
+async def _orphan_document_issue(document: dict[str, Any], repair: bool) -> ConsistencyIssueSchema:
+    game_id = document["game_id"]
+    if repair:
+        orphan = await GameDocument.find_one({"game_id": game_id})
+        if orphan is not None:
+            await apply_games_to_player_stats([(orphan, None)])
+            await orphan.delete()
+
+    return ConsistencyIssueSchema(
+        game_id=game_id,
+        issue=ConsistencyIssueType.orphan_document,
+        detail=f"нет матча в postgresql, сезон документа - {document['season_id']}",
+        repaired=repair
+    )
+
+
+async def _compare(
+        game: Row,
+        document: dict[str, Any],
+        repair: bool,
+        repair_scores: bool
+) -> list[ConsistencyIssueSchema]:
+    """Сравнить матч postgresql с его документом"""
+    issues = []
+
+    postgres_season = (game.season_id, game.league_id)
+    mongo_season = (document["season_id"], document["league_id"])
+    if postgres_season != mongo_season:
+        if repair:
+            full_document = await GameDocument.find_one({"game_id": game.id})
+            full_document.season_id, full_document.league_id = postgres_season
+            await save_game_document(full_document)
+        issues.append(ConsistencyIssueSchema(
+            game_id=game.id,
+            issue=ConsistencyIssueType.season_mismatch,
+            detail=f"сезон и лига в postgresql - {postgres_season}, в mongo - {mongo_season}",
+            repaired=repair
+        ))
+
+    events = document.get("events", [])
+    score = score_from_events(
+        {p["id"] for p in document.get("home_start_composition", []) + document.get("home_substitution", [])},
+        ((EventType(event["event_type"]), event["person"]["id"]) for event in events)
+    )
+    postgres_score = (game.home_scored, game.guest_scored)
+    mongo_score = (score.home_scored, score.guest_scored)
+    played = postgres_score != (None, None) or mongo_score != (0, 0)
+    if played and postgres_score != mongo_score:
+        repairable = mongo_score != (0, 0) and (
+            repair and postgres_score == (None, None) or repair_scores
+        )
+        if repairable:
+            await record_game_result(game.id, *mongo_score)
+        issues.append(ConsistencyIssueSchema(
+            game_id=game.id,
+            issue=ConsistencyIssueType.score_mismatch,
+            detail=f"счет в postgresql - {postgres_score}, по событиям mongo - {mongo_score}",
+            repaired=repairable
+        ))
+
+    return issues
@@ -0,0 +1,203 @@
+from typing import Any, AsyncIterator
+
+from sqlalchemy import Select, bindparam, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import aliased
+
+from config import Config
+from database import async_session
+from models.db.games import Game
+from models.db.leagues import Season
+from models.db.teams import SeasonTeam, Team
+from models.mongo_documents.games import GameDocument
+from models.mongo_documents.stats import STAT_FIELDS, PlayerSeasonStatsDocument
+from models.pydantic.internal import ExportDataset
+
+
+EXPORT_COLUMNS = {
+    ExportDataset.games: (
+        "game_id", "season_id", "league_id", "game_date",
+        "home_team_id", "home_team", "guest_team_id", "guest_team",
+        "home_scored", "guest_scored"
+    ),
+    ExportDataset.standings: (
+        "season_id", "league_id", "position", "team_id", "team",
+        "games", "wins", "draws", "loses", "scored_goals", "conceded_goals", "points"
+    ),
+    ExportDataset.player_stats: (
+        "season_id", "league_id", "player_id", "name", "team_id", "team", *STAT_FIELDS
+    ),
+    ExportDataset.events: (
+        "game_id", "season_id", "league_id", "minute", "event_type",
+        "person_id", "person", "team_id", "team"
+    ),
+}
+
+
+_home_team, _guest_team = aliased(Team), aliased(Team)
+
+_GAMES_EXPORT_QUERY = select(
+    Game.id,
+    Game.season_id,
+    Season.league_id,
+    Game.game_date,
+    _home_team.id,
+    _home_team.name,
+    _guest_team.id,
+    _guest_team.name,
+    Game.home_scored,
+    Game.guest_scored
+).join(
+    Season, Season.id == Game.season_id
+).join(
+    _home_team, _home_team.id == Game.home_team_id
+).join(
+    _guest_team, _guest_team.id == Game.guest_team_id
+).order_by(
+    Game.id
+)
+
+
+_GAMES_EXPORT_BATCH_QUERY = _GAMES_EXPORT_QUERY.filter(
+    Game.id > bindparam("after")
+).limit(
+    bindparam("limit")
+)
+
+
+_SEASON_GAMES_EXPORT_BATCH_QUERY = _GAMES_EXPORT_QUERY.filter(
+    Game.season_id == bindparam("season_id"),
+    Game.id > bindparam("after"),
+    Game.id <= bindparam("until")
+).limit(
+    bindparam("limit")
+)
+
+
+_SEASON_VERSIONS_QUERY = select(
+    Season.id,
+    Season.version
+)
+
+
+_STANDINGS_EXPORT_QUERY = select(
+    SeasonTeam.season_id,
+    Season.league_id,
+    SeasonTeam.position,
+    Team.id,
+    Team.name,
+    SeasonTeam.games,
+    SeasonTeam.wins,
+    SeasonTeam.draws,
+    SeasonTeam.loses,
+    SeasonTeam.scored_goals,
+    SeasonTeam.conceded_goals,
+    SeasonTeam.points
+).join(
+    Season, Season.id == SeasonTeam.season_id
+).join(
+    Team, Team.id == SeasonTeam.team_id
+).order_by(
+    SeasonTeam.season_id,
+    SeasonTeam.position
+)
+
+
+def iter_export_rows(
+        dataset: ExportDataset,
+        season_id: int | None = None,
+        batch_size: int = Config.EXPORT_BATCH_SIZE
+) -> AsyncIterator[tuple]:
+    """Выгрузить строки набора данных для экспорта в порядке колонок EXPORT_COLUMNS.
+
+    Строки читаются серверным курсором postgresql или курсором mongo пачками
+    по batch_size, в памяти одновременно находится не больше одной пачки.
+    Без season_id выгружается весь архив.
+    """
+    if dataset == ExportDataset.games:
+        return _stream_rows(_GAMES_EXPORT_QUERY, Game.season_id, season_id, batch_size)
+    if dataset == ExportDataset.standings:
+        return _stream_rows(_STANDINGS_EXPORT_QUERY, SeasonTeam.season_id, season_id, batch_size)
+    if dataset == ExportDataset.player_stats:
+        return _iter_player_stats(season_id, batch_size)
+    return _iter_events(season_id, batch_size)
+
+
+async def _stream_rows(query: Select, season_column, season_id: int | None, batch_size: int) -> AsyncIterator[tuple]:
+    if season_id is not None:
+        query = query.filter(season_column == season_id)
+
+    async with async_session() as session:
+        result = await session.stream(query, execution_options={"yield_per": batch_size})
+        async for row in result:
+            yield tuple(row)
+
+
+def _season_filter(season_id: int | None) -> dict[str, Any]:
+    return {} if season_id is None else {"season_id": season_id}
+
+
+async def _iter_player_stats(season_id: int | None, batch_size: int) -> AsyncIterator[tuple]:
+    cursor = PlayerSeasonStatsDocument.get_motor_collection().find(
+        _season_filter(season_id),
+        {"_id": 0, "season_id": 1, "league_id": 1, "player_id": 1, "name": 1, "team": 1,
+         **{field: 1 for field in STAT_FIELDS}}
+    ).sort(
+        [("season_id", 1), ("player_id", 1)]
+    ).batch_size(batch_size)
+
+    async for stats in cursor:
+        yield (
+            stats["season_id"], stats["league_id"], stats["player_id"], stats["name"],
+            stats["team"]["id"], stats["team"]["name"], *(stats.get(field, 0) for field in STAT_FIELDS)
+        )
+
+
+async def _iter_events(season_id: int | None, batch_size: int) -> AsyncIterator[tuple]:
+    cursor = GameDocument.get_motor_collection().find(
+        _season_filter(season_id),
+        {"_id": 0, "game_id": 1, "season_id": 1, "league_id": 1, "events": 1}
+    ).sort(
+        "game_id", 1
+    ).batch_size(batch_size)
+
+    async for game in cursor:
+        for event in game.get("events", []):
+            person = event["person"]
+            yield (
+                game["game_id"], game["season_id"], game["league_id"], event["minute"], event["event_type"],
+                person["id"], person["name"], person["team"]["id"], person["team"]["name"]
+            )
+
+
+async def get_games_batch(after: int, limit: int) -> list[Row]:
+    """Выгрузить из postgresql пачку матчей с id больше after в порядке колонок экспорта матчей"""
+    async with async_session() as session:
+        result = await session.execute(_GAMES_EXPORT_BATCH_QUERY, {"after": after, "limit": limit})
+        return list(result.all())
+
+
+async def get_season_games_batch(season_id: int, after: int, until: int, limit: int) -> list[Row]:
+    """Выгрузить из postgresql пачку матчей сезона с id больше after и не больше until"""
+    async with async_session() as session:
+        result = await session.execute(
+            _SEASON_GAMES_EXPORT_BATCH_QUERY,
+            {"season_id": season_id, "after": after, "until": until, "limit": limit}
+        )
+        return list(result.all())
+
+
+async def get_season_versions() -> dict[int, int]:
+    """Выгрузить из postgresql версии данных всех сезонов"""
+    async with async_session() as session:
+        result = await session.execute(_SEASON_VERSIONS_QUERY)
+        return dict(result.all())
+
+
+async def get_games_events(game_ids: list[int]) -> list[dict[str, Any]]:
+    """Выгрузить из mongo события матчей с указанными id, без составов и тренеров"""
+    cursor = GameDocument.get_motor_collection().find(
+        {"game_id": {"$in": game_ids}},
+        {"_id": 0, "game_id": 1, "season_id": 1, "league_id": 1, "events": 1}
+    ).sort("game_id", 1)
+    return await cursor.to_list(None)
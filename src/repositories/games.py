@@ -1,18 +1,27 @@
+import asyncio
 from datetime import datetime
 
-from sqlalchemy import select
+from pymongo import ReplaceOne
+from pymongo.errors import DuplicateKeyError
+from sqlalchemy import ColumnElement, UnaryExpression, and_, bindparam, or_, select, tuple_
 from sqlalchemy.exc import NoResultFound
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
-from database import async_session
+from batches import to_batch_schema
+from database import async_session, dialect_insert
 from errors import Missing
 from models.db.games import Game
 from models.db.leagues import Season
+from models.db.persons import Person  # noqa: F401 - нужен для связей моделей в запросах модуля
+from models.db.teams import Team
 from models.mongo_documents.games import GameDocument
+from models.pydantic.batches import BatchSchema
 from models.pydantic.games import (
     GameDetailSchema,
     GameEventSchema,
+    GameIngestSchema,
+    GameScoreSchema,
+    GamesBatchResultSchema,
     GameWithLeagueSchema)
 from models.pydantic.leagues import (
     SeasonSchema,
@@ -23,56 +32,297 @@ from models.pydantic.persons import (
     BasePersonSchema
 )
 from models.pydantic.teams import BaseTeamSchema
+from live import game_change_messages, game_notification, game_score, send_game_notifications
+from repositories.standings import write_season_standings
+from repositories.stats import apply_games_to_player_stats, write_player_season_stats
+from repositories.versions import bump_season_versions, invalidate_seasons
 
 
 async def get_game(game_id: int) -> GameDetailSchema:
-    """Выгрузить из БД подробную информацию о конкретном матче"""
-    async with async_session() as session:
-        game_from_postgresql = await _get_game_from_postgresql(session, game_id)
+    """Выгрузить из БД подробную информацию о конкретном матче.
 
-        game_from_mongo = await _get_game_detail_from_mongo(game_id)
+    Запросы к postgresql и mongo выполняются параллельно, соединение
+    postgresql возвращается в пул сразу после выполнения своего запроса.
+    Если матча нет в postgresql - выбрасывается Missing, запрос к mongo
+    при этом отменяется. Если для матча нет документа в mongo - матч
+    возвращается без составов, тренеров и событий.
+    """
+    try:
+        async with asyncio.TaskGroup() as tg:
+            orm_task = tg.create_task(_get_game_from_postgresql(game_id))
+            odm_task = tg.create_task(_get_game_detail_from_mongo(game_id))
+    except* Missing as group:
+        raise group.exceptions[0]
 
-    return _to_one_game_schema(game_from_postgresql, game_from_mongo)
+    return _to_one_game_schema(orm_task.result(), odm_task.result())
 
 
-async def _get_game_from_postgresql(
-        session: AsyncSession,
-        game_id: int
-) -> Game:
+_BASE_GAME_QUERY = select(
+    Game
+).options(
+    joinedload(Game.season)
+).options(
+    joinedload(Game.home_team)
+).options(
+    joinedload(Game.guest_team)
+)
+
+
+_GAME_QUERY = _BASE_GAME_QUERY.filter(
+    Game.id == bindparam("game_id")
+)
+
+
+_GAMES_QUERY = _BASE_GAME_QUERY.filter(
+    Game.id.in_(bindparam("game_ids", expanding=True))
+)
+
+
+async def _get_game_from_postgresql(game_id: int) -> Game:
     """Выгрузить из postgresql информацию о конкретном матче"""
-    query = select(
-        Game
-    ).options(
-        joinedload(Game.season)
-    ).options(
-        joinedload(Game.home_team)
-    ).options(
-        joinedload(Game.guest_team)
-    ).filter(
-        Game.id == game_id
-    )
-    result = await session.execute(query)
-    try:
-        result = result.scalars().one()
-    except NoResultFound:
-        raise Missing(f"матча с id - {game_id} не найдено")
+    async with async_session() as session:
+        result = await session.execute(_GAME_QUERY, {"game_id": game_id})
+        try:
+            result = result.scalars().one()
+        except NoResultFound:
+            raise Missing(_game_missing(game_id))
 
     return result
 
 
+async def get_games(game_ids: list[int]) -> BatchSchema[GameDetailSchema]:
+    """Выгрузить из БД подробную информацию о нескольких матчах.
+
+    Матчи выбираются из postgresql одним запросом, документы матчей из
+    mongo - параллельно одним запросом. Матчи возвращаются в порядке
+    game_ids, для ненайденных id - ошибки.
+    """
+    async with asyncio.TaskGroup() as tg:
+        orm_task = tg.create_task(_get_games_from_postgresql(game_ids))
+        odm_task = tg.create_task(GameDocument.find({"game_id": {"$in": game_ids}}).to_list())
+
+    documents = {x.game_id: x for x in odm_task.result()}
+    games = {x.id: _to_one_game_schema(x, documents.get(x.id)) for x in orm_task.result()}
+    return to_batch_schema(GameDetailSchema, game_ids, games, _game_missing)
+
+
+async def _get_games_from_postgresql(game_ids: list[int]) -> list[Game]:
+    """Выгрузить из postgresql информацию о матчах с указанными id"""
+    async with async_session() as session:
+        result = await session.execute(_GAMES_QUERY, {"game_ids": game_ids})
+        return list(result.scalars().all())
+
+
+def _game_missing(game_id: int) -> str:
+    return f"матча с id - {game_id} не найдено"
+
+
 async def _get_game_detail_from_mongo(
         game_id: int
-) -> GameDocument:
+) -> GameDocument | None:
     """Выгрузить из mongo подробную информацию о конкретном матче"""
     result = await GameDocument.find_one({"game_id": game_id})
     return result
 
 
+async def save_game_document(game: GameDocument) -> GameDocument:
+    """Сохранить в mongo документ матча и обновить статистику игроков сезона.
+
+    Если документ матча с таким game_id уже есть - он заменяется, а статистика
+    игроков обновляется на разницу между старой и новой версией матча.
+    Замена выполняется только если документ не изменился с момента чтения,
+    иначе документ перечитывается и попытка повторяется, поэтому при
+    одновременном сохранении одного матча разница не учитывается дважды.
+    Новые события и изменившийся счет отправляются подписчикам матча
+    во всех процессах API через уведомление postgresql.
+    """
+    collection = GameDocument.get_motor_collection()
+    document = game.model_dump(mode="json", exclude={"id", "revision_id"})
+    while True:
+        previous_document = await _get_raw_game_document(game.game_id)
+        if previous_document is None:
+            try:
+                result = await collection.insert_one(dict(document))
+            except DuplicateKeyError:
+                continue
+            game.id = result.inserted_id
+            previous_game = None
+            break
+
+        result = await collection.replace_one(previous_document, document)
+        if result.matched_count == 1:
+            game.id = previous_document["_id"]
+            previous_game = GameDocument.model_validate(previous_document)
+            break
+
+    await apply_games_to_player_stats([(previous_game, game)])
+    if messages := game_change_messages(previous_game, game):
+        await send_game_notifications([game_notification(game.game_id, messages)])
+
+    return game
+
+
+async def _get_raw_game_document(game_id: int) -> dict | None:
+    """Выгрузить из mongo документ матча без разбора схемой, для сравнения при замене"""
+    return await GameDocument.get_motor_collection().find_one({"game_id": game_id})
+
+
+GAME_COLUMNS = ("id", "game_date", "season_id", "home_team_id", "guest_team_id", "home_scored", "guest_scored")
+
+GAME_DOCUMENT_FIELDS = (
+    "home_start_composition", "guest_start_composition", "home_substitution",
+    "guest_substitution", "home_manager", "guest_manager", "events"
+)
+
+
+_SEASONS_LEAGUES_QUERY = select(
+    Season.id,
+    Season.league_id
+).filter(
+    Season.id.in_(bindparam("season_ids", expanding=True))
+)
+
+
+_EXISTING_TEAMS_QUERY = select(
+    Team.id
+).filter(
+    Team.id.in_(bindparam("team_ids", expanding=True))
+)
+
+
+_EXISTING_GAMES_QUERY = select(
+    Game.id,
+    Game.season_id
+).filter(
+    Game.id.in_(bindparam("game_ids", expanding=True))
+)
+
+
+async def save_games(games: list[GameIngestSchema]) -> GamesBatchResultSchema:
+    """Загрузить пакет матчей с составами, тренерами и событиями в postgresql и mongo.
+
+    Загрузка идемпотентна: матчи и их документы записываются upsert по id матча,
+    при повторе id в пакете берется последний матч. Строки матчей записываются
+    одним INSERT ... ON CONFLICT DO UPDATE, документы - одним bulk_write.
+    Затем статистика игроков и таблицы затронутых сезонов пересчитываются
+    целиком по их документам и результатам за один проход. Версии сезонов
+    увеличиваются в транзакциях записи матчей и таблиц, после чего кэш сезонов
+    очищается один раз. Пересчет не зависит от прежних данных, поэтому
+    повтор после сбоя на любом шаге приводит статистику и таблицы в порядок.
+    Новые события и счет матчей отправляются подписчикам через уведомления
+    postgresql. Если в БД нет сезона или команды какого-либо матча - выбрасывается
+    Missing и ничего не записывается.
+    """
+    games = list({game.id: game for game in games}.values())
+    if not games:
+        return GamesBatchResultSchema(created=[], updated=[], season_ids=[])
+
+    game_ids = [game.id for game in games]
+    season_ids = {game.season_id for game in games}
+    team_ids = {game.home_team_id for game in games} | {game.guest_team_id for game in games}
+
+    async with async_session() as session:
+        result = await session.execute(_SEASONS_LEAGUES_QUERY, {"season_ids": sorted(season_ids)})
+        leagues = dict(result.all())
+        if missing := season_ids - leagues.keys():
+            raise Missing(f"сезонов с id - {sorted(missing)} не найдено")
+
+        result = await session.execute(_EXISTING_TEAMS_QUERY, {"team_ids": sorted(team_ids)})
+        if missing := team_ids - set(result.scalars().all()):
+            raise Missing(f"команд с id - {sorted(missing)} не найдено")
+
+        result = await session.execute(_EXISTING_GAMES_QUERY, {"game_ids": game_ids})
+        previous_seasons = dict(result.all())
+
+        statement = dialect_insert(session, Game)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Game.id],
+            set_={column: statement.excluded[column] for column in GAME_COLUMNS[1:]}
+        )
+        await session.execute(statement, [game.model_dump(include=set(GAME_COLUMNS)) for game in games])
+        await bump_season_versions(session, season_ids | set(previous_seasons.values()))
+        await session.commit()
+
+    documents = [
+        GameDocument(
+            game_id=game.id,
+            season_id=game.season_id,
+            league_id=leagues[game.season_id],
+            **{field: getattr(game, field) for field in GAME_DOCUMENT_FIELDS}
+        )
+        for game in games
+    ]
+    previous_documents = {
+        document.game_id: document
+        async for document in GameDocument.find({"game_id": {"$in": game_ids}})
+    }
+    await GameDocument.get_motor_collection().bulk_write([
+        ReplaceOne(
+            {"game_id": document.game_id},
+            document.model_dump(mode="json", exclude={"id", "revision_id"}),
+            upsert=True
+        )
+        for document in documents
+    ], ordered=False)
+
+    affected_season_ids = sorted(
+        season_ids
+        | set(previous_seasons.values())
+        | {document.season_id for document in previous_documents.values()}
+    )
+    await write_player_season_stats(affected_season_ids)
+    await write_season_standings(affected_season_ids)
+    await invalidate_seasons(affected_season_ids)
+
+    await send_game_notifications([
+        game_notification(document.game_id, messages)
+        for document in documents
+        if (messages := game_change_messages(previous_documents.get(document.game_id), document))
+    ])
+
+    return GamesBatchResultSchema(
+        created=sorted(set(game_ids) - previous_seasons.keys()),
+        updated=sorted(previous_seasons.keys()),
+        season_ids=affected_season_ids
+    )
+
+
+async def get_game_score(game_id: int) -> GameScoreSchema:
+    """Выгрузить из БД текущий счет матча.
+
+    Если для матча есть документ в mongo - счет считается по его событиям,
+    иначе берется из postgresql.
+    """
+    try:
+        async with asyncio.TaskGroup() as tg:
+            orm_task = tg.create_task(_get_game_from_postgresql(game_id))
+            odm_task = tg.create_task(_get_game_detail_from_mongo(game_id))
+    except* Missing as group:
+        raise group.exceptions[0]
+
+    odm_game = odm_task.result()
+    if odm_game is not None:
+        return game_score(odm_game)
+
+    orm_game = orm_task.result()
+    return GameScoreSchema(home_scored=orm_game.home_scored, guest_scored=orm_game.guest_scored)
+
+
 def _to_one_game_schema(
         orm_game: Game,
-        odm_game: GameDocument
+        odm_game: GameDocument | None
 ) -> GameDetailSchema:
-    """Преобразует данные матча из БД в pydantic схему"""
+    """Преобразует данные матча из БД в pydantic схему.
+
+    При отсутствии документа в mongo составы и события матча пустые.
+    """
+    if odm_game is None:
+        odm_game = GameDocument.model_construct(
+            game_id=orm_game.id,
+            season_id=orm_game.season_id,
+            league_id=orm_game.season.league_id
+        )
+
     home_start = [PlayerInGameSchema(id=x.id, name=x.name, status="starting lineups")
                   for x in odm_game.home_start_composition]
     home_substitution = [PlayerInGameSchema(id=x.id, name=x.name, status="substitutes")
@@ -116,8 +366,17 @@ def _to_one_game_schema(
     )
 
 
-async def get_games_for_date(date: datetime) -> list[GameWithLeagueSchema]:
-    """Выгрузить из БД все матчи за определенный день"""
+async def get_games_for_period(
+        start: datetime,
+        end: datetime,
+        limit: int,
+        after: tuple[datetime, int] | None = None
+) -> list[GameWithLeagueSchema]:
+    """Выгрузить из БД матчи, начинающиеся в полуинтервале [start, end).
+
+    Матчи отсортированы по времени начала и id, страница начинается
+    после матча с ключом after (keyset-пагинация).
+    """
     async with async_session() as session:
         query = select(
             Game
@@ -128,16 +387,50 @@ async def get_games_for_date(date: datetime) -> list[GameWithLeagueSchema]:
         ).options(
             joinedload(Game.guest_team)
         ).filter(
-            Game.game_date == date
+            Game.game_date >= start,
+            Game.game_date < end
+        )
+        if after is not None:
+            query = query.filter(tuple_(Game.game_date, Game.id) > tuple_(*after))
+        query = query.order_by(
+            Game.game_date, Game.id
+        ).limit(
+            limit
         )
 
         result = await session.execute(query)
         result = result.scalars().all()
 
-    return to_games_for_date_schema(result)
+    return to_games_for_period_schema(result)
+
+
+def games_order(descending: bool = False) -> tuple[UnaryExpression, ...]:
+    """Стабильный порядок матчей по (game_date, id), матчи без даты - в конце списка"""
+    if descending:
+        return Game.game_date.desc().nulls_last(), Game.id.desc()
+    return Game.game_date.asc().nulls_last(), Game.id.asc()
+
+
+def games_after(
+        after: tuple[datetime | None, int],
+        descending: bool = False
+) -> ColumnElement[bool]:
+    """Условие keyset-пагинации: матчи, идущие в порядке games_order после матча с ключом after"""
+    game_date, game_id = after
+    if game_date is None:
+        return and_(
+            Game.game_date.is_(None),
+            Game.id < game_id if descending else Game.id > game_id
+        )
+
+    key, after_key = tuple_(Game.game_date, Game.id), tuple_(game_date, game_id)
+    return or_(
+        Game.game_date.is_(None),
+        key < after_key if descending else key > after_key
+    )
 
 
-def to_games_for_date_schema(
+def to_games_for_period_schema(
         games: list[Game]
 ) -> list[GameWithLeagueSchema]:
     """Преобразует список матчей из БД в pydantic схему"""
@@ -1,9 +1,9 @@
-import bisect
+import asyncio
+from datetime import datetime
 
-from sqlalchemy import select, and_
+from sqlalchemy import bindparam, select, and_, func
 from sqlalchemy.exc import NoResultFound
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased
 
 from database import async_session
 from errors import Missing
@@ -11,8 +11,8 @@ from models.db.games import Game
 from models.db.leagues import League, Country, Season
 from models.db.persons import Player, Person
 from models.db.teams import SeasonTeam, Team
-from models.mongo_documents.games import GameDocument
-from models.pydantic.games import BaseGameSchema
+from models.mongo_documents.games import EventType
+from models.mongo_documents.stats import PlayerSeasonStatsDocument
 from models.pydantic.leagues import (
     CountrySchema,
     LeagueWithCurrentSeasonSchema,
@@ -24,44 +24,47 @@ from models.pydantic.leagues import (
     SeasonWithGamesSchema
 )
 from models.pydantic.persons import (
-    PlayerDetailsSchema,
     PlayerStatsSummarySchema
 )
 from models.pydantic.teams import (
     TeamInSeasonSchema,
     BaseTeamSchema
 )
+from repositories.games import games_after, games_order
+from repositories.stats import stat_field
+
+
+_ALL_LEAGUES_QUERY = select(
+    League.id,
+    League.name,
+    Country.id,
+    Country.name,
+    Season.id,
+    Season.name,
+    Team.id,
+    Team.name
+).select_from(
+    League
+).join(
+    Country, Country.id == League.country_id
+).join(
+    Season, League.id == Season.league_id
+).join(
+    SeasonTeam, Season.id == SeasonTeam.season_id
+).join(
+    Team, Team.id == SeasonTeam.team_id
+).filter(
+    and_(
+        Season.is_current_season == True,
+        SeasonTeam.position == 1
+    )
+)
 
 
 async def get_all_leagues() -> list[LeagueWithCurrentSeasonSchema]:
     """Выгрузить из БД список всех лиг с их текущими сезонами и лидирующими командами"""
     async with async_session() as session:
-        query = select(
-            League.id,
-            League.name,
-            Country.id,
-            Country.name,
-            Season.id,
-            Season.name,
-            Team.id,
-            Team.name
-        ).select_from(
-            League
-        ).join(
-            Country, Country.id == League.country_id
-        ).join(
-            Season, League.id == Season.league_id
-        ).join(
-            SeasonTeam, Season.id == SeasonTeam.season_id
-        ).join(
-            Team, Team.id == SeasonTeam.team_id
-        ).filter(
-            and_(
-                Season.is_current_season == True,
-                SeasonTeam.position == 1
-            )
-        )
-        result = await session.execute(query)
+        result = await session.execute(_ALL_LEAGUES_QUERY)
         result = result.all()
 
     return to_many_leagues_schemas(result)
@@ -92,20 +95,22 @@ def to_many_leagues_schemas(
     return result
 
 
+_ONE_LEAGUE_QUERY = select(
+    League.id,
+    League.name,
+    League.country_id,
+    Country.name
+).join(
+    Country, Country.id == League.country_id
+).filter(
+    League.id == bindparam("league_id")
+)
+
+
 async def get_one_league(league_id: int) -> LeagueCountrySchema:
     """Выгрузить из БД подробную информацию о конкретной лиге с данными о стране"""
     async with async_session() as session:
-        query = select(
-            League.id,
-            League.name,
-            League.country_id,
-            Country.name
-        ).join(
-            Country, Country.id == League.country_id
-        ).filter(
-            League.id == league_id
-        )
-        result = await session.execute(query)
+        result = await session.execute(_ONE_LEAGUE_QUERY, {"league_id": league_id})
         try:
             result = result.one()
         except NoResultFound:
@@ -123,25 +128,27 @@ def to_one_league_schema(league: tuple) -> LeagueCountrySchema:
     )
 
 
+_SEASONS_QUERY = select(
+    Season.id,
+    Season.name,
+    Team.id,
+    Team.name
+).join(
+    SeasonTeam, Season.id == SeasonTeam.season_id
+).join(
+    Team, Team.id == SeasonTeam.team_id
+).filter(
+    and_(
+        Season.league_id == bindparam("league_id"),
+        SeasonTeam.position == 1
+    )
+)
+
+
 async def get_seasons(league_id: int) -> list[SeasonWithLeaderSchema]:
     """Выгрузить из БД список сезонов указанной лиги с командами-лидерами"""
     async with async_session() as session:
-        query = select(
-            Season.id,
-            Season.name,
-            Team.id,
-            Team.name
-        ).join(
-            SeasonTeam, Season.id == SeasonTeam.season_id
-        ).join(
-            Team, Team.id == SeasonTeam.team_id
-        ).filter(
-            and_(
-                Season.league_id == league_id,
-                SeasonTeam.position == 1
-            )
-        )
-        result = await session.execute(query)
+        result = await session.execute(_SEASONS_QUERY, {"league_id": league_id})
         result = result.all()
         if len(result) == 0:
             raise Missing(f"сезонов с id лиги - {league_id} не найдено")
@@ -165,6 +172,45 @@ def to_many_seasons_schemas(rows: list[tuple]) -> list[SeasonWithLeaderSchema]:
     return result
 
 
+_SEASON_QUERY = select(
+    Season.id,
+    Season.name,
+    League.id,
+    League.name,
+    Country.id,
+    Country.name
+).join(
+    League, League.id == Season.league_id
+).join(
+    Country, Country.id == League.country_id
+).filter(
+    and_(
+        Season.league_id == bindparam("league_id"),
+        Season.id == bindparam("season_id")
+    )
+)
+
+
+_SEASON_TEAMS_QUERY = select(
+    Team.id,
+    Team.name,
+    SeasonTeam.position,
+    SeasonTeam.games,
+    SeasonTeam.wins,
+    SeasonTeam.draws,
+    SeasonTeam.loses,
+    SeasonTeam.scored_goals,
+    SeasonTeam.conceded_goals,
+    SeasonTeam.points
+).join(
+    Team, Team.id == SeasonTeam.team_id
+).filter(
+    SeasonTeam.season_id == bindparam("season_id")
+).order_by(
+    SeasonTeam.position
+)
+
+
 async def get_season(league_id: int, season_id: int) -> SeasonRelSchema:
     """Выгрузить из БД полную информацию о конкретном сезоне лиги.
 
@@ -174,48 +220,16 @@ async def get_season(league_id: int, season_id: int) -> SeasonRelSchema:
         2. Данные всех команд в сезоне с их статистикой
     """
     async with async_session() as session:
-        query = select(
-            Season.id,
-            Season.name,
-            League.id,
-            League.name,
-            Country.id,
-            Country.name
-        ).join(
-            League, League.id == Season.league_id
-        ).join(
-            Country, Country.id == League.country_id
-        ).filter(
-            and_(
-                Season.league_id == league_id,
-                Season.id == season_id
-            )
+        season_result = await session.execute(
+            _SEASON_QUERY,
+            {"league_id": league_id, "season_id": season_id}
         )
-        season_result = await session.execute(query)
         try:
             season_data = season_result.one()
         except NoResultFound:
             raise Missing(f"сезонa с id лиги - {league_id} и id сезона - {season_id} не найдено")
 
-        query = select(
-            Team.id,
-            Team.name,
-            SeasonTeam.position,
-            SeasonTeam.games,
-            SeasonTeam.wins,
-            SeasonTeam.draws,
-            SeasonTeam.loses,
-            SeasonTeam.scored_goals,
-            SeasonTeam.conceded_goals,
-            SeasonTeam.points
-        ).join(
-            Team, Team.id == SeasonTeam.team_id
-        ).filter(
-            SeasonTeam.season_id == season_id
-        ).order_by(
-            SeasonTeam.position
-        )
-        teams_result = await session.execute(query)
+        teams_result = await session.execute(_SEASON_TEAMS_QUERY, {"season_id": season_id})
         teams_data = teams_result.all()
 
     return to_one_season_schema(season_data, teams_data)
@@ -252,217 +266,311 @@ def to_one_season_schema(season: tuple, teams: list[tuple]) -> SeasonRelSchema:
     )
 
 
+_SEASON_NAME_QUERY = select(
+    Season.id,
+    Season.name
+).filter(
+    and_(
+        Season.league_id == bindparam("league_id"),
+        Season.id == bindparam("season_id")
+    )
+)
+
+
+_SEASON_PLAYERS_QUERY = select(
+    Player.id,
+    Person.name,
+    Person.full_name,
+    Person.birth_date,
+    Player.team_number,
+    Country.id,
+    Country.name,
+    Team.id,
+    Team.name
+).select_from(
+    SeasonTeam
+).join(
+    Team, Team.id == SeasonTeam.team_id
+).join(
+    Player, Player.team_id == Team.id
+).join(
+    Person, Person.id == Player.person_id
+).outerjoin(
+    Country, Country.id == Person.country_id
+).filter(
+    SeasonTeam.season_id == bindparam("season_id")
+).order_by(
+    Team.id,
+    Player.id
+)
+
+
 async def get_players_in_season(league_id: int, season_id: int) -> SeasonWithPlayersSchema:
-    """Выгрузить из БД информацию об игроках в конкретном сезоне лиги"""
+    """Выгрузить из БД информацию об игроках в конкретном сезоне лиги.
+
+    Игроки выбираются одним запросом только нужных колонок, без загрузки
+    ORM-объектов команд, игроков и персон.
+    """
     async with async_session() as session:
-        query = select(
-            Season
-        ).options(
-            selectinload(
-                Season.teams
-            ).selectinload(
-                Team.players
-            ).joinedload(
-                Player.person
-            ).joinedload(
-                Person.country
-            )
-        ).filter(
-            and_(
-                Season.league_id == league_id,
-                Season.id == season_id
-            )
+        result = await session.execute(
+            _SEASON_NAME_QUERY,
+            {"league_id": league_id, "season_id": season_id}
         )
-
-        result = await session.execute(query)
         try:
-            season_result = result.scalars().one()
+            season_result = result.one()
         except NoResultFound:
             raise Missing(f"сезонa с id лиги - {league_id} и id сезона - {season_id} не найдено")
 
-    return to_season_with_players_schema(season_result)
+        result = await session.execute(_SEASON_PLAYERS_QUERY, {"season_id": season_id})
+        players_result = result.all()
 
+    return to_season_with_players_schema(season_result, players_result)
 
-def to_season_with_players_schema(season_data: Season) -> SeasonWithPlayersSchema:
-    """Собирает pydantic схему сезона с данными об игроках"""
-    players = []
-    for team in season_data.teams:
-        for player in team.players:
-            players.append(PlayerDetailsSchema(
-                id=player.id,
-                name=player.person.name,
-                full_name=player.person.full_name,
-                birth_date=player.person.birth_date,
-                team_number=player.team_number,
-                country=CountrySchema.model_validate(player.person.country, from_attributes=True),
-                team=BaseTeamSchema.model_validate(team, from_attributes=True)
-            ))
 
-    return SeasonWithPlayersSchema(
-        id=season_data.id,
-        name=season_data.name,
-        players=players
+def to_season_with_players_schema(season: tuple, players: list[tuple]) -> SeasonWithPlayersSchema:
+    """Собирает pydantic схему сезона с данными об игроках.
+
+    Схема валидируется одним вызовом по словарям из строк БД, без создания
+    вложенных схем по одной.
+    """
+    season_id, season_name = season
+    return SeasonWithPlayersSchema.model_validate({
+        "id": season_id,
+        "name": season_name,
+        "players": [
+            {
+                "id": player_id,
+                "name": name,
+                "full_name": full_name,
+                "birth_date": birth_date,
+                "team_number": team_number,
+                "country": (
+                    {"id": country_id, "name": country_name}
+                    if country_id is not None else None
+                ),
+                "team": {"id": team_id, "name": team_name}
+            }
+            for (player_id, name, full_name, birth_date, team_number,
+                 country_id, country_name, team_id, team_name) in players
+        ]
+    })
+
+
+_BASE_SEASON_QUERY = select(
+    Season
+).filter(
+    and_(
+        Season.league_id == bindparam("league_id"),
+        Season.id == bindparam("season_id")
     )
+)
 
 
-async def get_games_for_season(league_id: int, season_id: int) -> SeasonWithGamesSchema:
-    """Выгрузить из БД информацию об матчах в конкретном сезоне лиги"""
+async def get_games_for_season(
+        league_id: int,
+        season_id: int,
+        limit: int = 100,
+        after: tuple[datetime | None, int] | None = None
+) -> SeasonWithGamesSchema:
+    """Выгрузить из БД страницу матчей конкретного сезона лиги.
+
+    Матчи отсортированы по дате и id, страница начинается после матча
+    с ключом after (keyset-пагинация). Выбираются только нужные колонки
+    матчей и названия обеих команд.
+    """
     async with async_session() as session:
-        query = select(
-            Season
-        ).outerjoin(
-            Game
-        ).options(
-            selectinload(
-                Season.games
-            ).joinedload(
-                Game.home_team
-            ),
-            selectinload(
-                Season.games
-            ).joinedload(
-                Game.guest_team
-            )
-        ).filter(
-            and_(
-                Season.league_id == league_id,
-                Season.id == season_id
-            )
-        ).order_by(
-            Game.game_date
+        result = await session.execute(
+            _SEASON_NAME_QUERY,
+            {"league_id": league_id, "season_id": season_id}
         )
-
-        result = await session.execute(query)
         try:
-            season_result = result.unique().scalars().one()
+            season_result = result.one()
         except NoResultFound:
             raise Missing(f"сезонa с id лиги - {league_id} и id сезона - {season_id} не найдено")
 
-    return SeasonWithGamesSchema.model_validate(season_result, from_attributes=True)
-
+        home_team, guest_team = aliased(Team), aliased(Team)
+        query = select(
+            Game.id,
+            Game.game_date,
+            home_team.id,
+            home_team.name,
+            guest_team.id,
+            guest_team.name,
+            Game.home_scored,
+            Game.guest_scored
+        ).join(
+            home_team, Game.home_team_id == home_team.id
+        ).join(
+            guest_team, Game.guest_team_id == guest_team.id
+        ).filter(
+            Game.season_id == season_id
+        )
+        if after is not None:
+            query = query.filter(games_after(after))
+        query = query.order_by(
+            *games_order()
+        ).limit(
+            limit
+        )
 
-async def get_scores_in_season(league_id: int, season_id: int) -> SeasonWithTopPlayersSchema:
-    """Выгрузить из БД информацию о бомбардирах в конкретном сезоне лиги"""
-    async with async_session() as session:
-        base_season = await get_base_season(session, league_id, season_id)
+        result = await session.execute(query)
+        games_result = result.all()
+
+    return to_season_with_games_schema(season_result, games_result)
+
+
+def to_season_with_games_schema(season: tuple, games: list[tuple]) -> SeasonWithGamesSchema:
+    """Собирает pydantic схему сезона со страницей матчей одним вызовом валидации"""
+    season_id, season_name = season
+    return SeasonWithGamesSchema.model_validate({
+        "id": season_id,
+        "name": season_name,
+        "games": [
+            {
+                "id": game_id,
+                "game_date": game_date,
+                "home_team": {"id": home_id, "name": home_name},
+                "guest_team": {"id": guest_id, "name": guest_name},
+                "home_scored": home_scored,
+                "guest_scored": guest_scored
+            }
+            for game_id, game_date, home_id, home_name, guest_id, guest_name, home_scored, guest_scored in games
+        ]
+    })
+
+
+_COUNT_GAMES_FOR_SEASON_QUERY = select(
+    func.count()
+).select_from(
+    Game
+).join(
+    Season
+).filter(
+    Season.league_id == bindparam("league_id"),
+    Game.season_id == bindparam("season_id")
+)
 
-        games_for_players = await get_number_of_games_for_players_in_season(season_id)
 
-        top_scores = await get_top_scores_in_season(season_id)
+async def count_games_for_season(league_id: int, season_id: int) -> int:
+    """Посчитать в БД количество матчей конкретного сезона лиги"""
+    async with async_session() as session:
+        result = await session.execute(
+            _COUNT_GAMES_FOR_SEASON_QUERY,
+            {"league_id": league_id, "season_id": season_id}
+        )
 
-    return to_season_with_top_players_schema(
-        base_season,
-        games_for_players,
-        top_scores,
-        'goals'
-    )
+    return result.scalar_one()
 
 
-async def get_base_season(
-        session: AsyncSession,
+async def get_scores_in_season(
         league_id: int,
-        season_id: int
-) -> Season:
-    """Выгрузить базовые данные из бд о конкретном сезоне"""
-    query = select(
-        Season
-    ).filter(
-        and_(
-            Season.league_id == league_id,
-            Season.id == season_id
-        )
+        season_id: int,
+        limit: int | None = None,
+        offset: int = 0
+) -> SeasonWithTopPlayersSchema:
+    """Выгрузить из БД информацию о бомбардирах в конкретном сезоне лиги"""
+    return await get_leaders_in_season(
+        league_id,
+        season_id,
+        {EventType.goal: 1, EventType.penalty_goal: 1},
+        limit,
+        offset
     )
-    result = await session.execute(query)
-    try:
-        season_result = result.scalars().one()
-    except NoResultFound:
-        raise Missing(f"сезонa с id лиги - {league_id} и id сезона - {season_id} не найдено")
-
-    return season_result
 
 
-async def get_number_of_games_for_players_in_season(
-        season_id: int
-) -> list[dict[str, dict[str, str | int] | int]]:
-    """Выгрузить данные из mongodb о количестве матчей для каждого игрока в сезоне"""
-    pipeline = [
-        {"$match": {"season_id": season_id}},
-
-        {"$project": {
-            "players": {
-                "$concatArrays": ["$home_start_composition", "$guest_start_composition"]
-            }
-        }},
+async def get_leaders_in_season(
+        league_id: int,
+        season_id: int,
+        weights: dict[EventType, int],
+        limit: int | None = None,
+        offset: int = 0
+) -> SeasonWithTopPlayersSchema:
+    """Выгрузить из БД лучших игроков сезона по взвешенной сумме указанных типов событий.
 
-        {"$unwind": "$players"},
+    Запрос сезона к postgresql и запрос статистики игроков к mongo выполняются
+    параллельно, соединение postgresql не удерживается на время работы с mongo.
+    """
+    try:
+        async with asyncio.TaskGroup() as tg:
+            season_task = tg.create_task(get_base_season(league_id, season_id))
+            players_task = tg.create_task(get_top_players_in_season(
+                season_id,
+                {stat_field(event_type): weight for event_type, weight in weights.items()},
+                limit,
+                offset
+            ))
+    except* Missing as group:
+        raise group.exceptions[0]
 
-        {"$group": {
-            "_id": {"player_id": "$players.id", "player_name": "$players.name",
-                    "team_id": "$players.team.id", "team_name": "$players.team.name"},
-            "games": {"$sum": 1}
-        }},
+    return to_season_with_top_players_schema(season_task.result(), players_task.result())
 
-        {"$sort": {"_id.player_id": 1}}
-    ]
 
-    return await GameDocument.aggregate(pipeline).to_list()
+async def get_base_season(league_id: int, season_id: int) -> Season:
+    """Выгрузить базовые данные из бд о конкретном сезоне"""
+    async with async_session() as session:
+        result = await session.execute(
+            _BASE_SEASON_QUERY,
+            {"league_id": league_id, "season_id": season_id}
+        )
+        try:
+            season_result = result.scalars().one()
+        except NoResultFound:
+            raise Missing(f"сезонa с id лиги - {league_id} и id сезона - {season_id} не найдено")
 
+    return season_result
 
-async def get_top_scores_in_season(
-        season_id: int
-) -> list[dict[str, dict[str, str | int] | int]]:
-    """Выгрузить данные из mongodb о лучших бомбардирах в сезоне"""
-    pipeline = [
-        {"$match": {"season_id": season_id}},
 
-        {"$unwind": "$events"},
+async def get_top_players_in_season(
+        season_id: int,
+        weights: dict[str, int],
+        limit: int | None = None,
+        offset: int = 0
+) -> list[dict[str, dict[str, str | int] | str | int]]:
+    """Выгрузить из mongodb лучших игроков сезона по взвешенной сумме показателей.
 
-        {"$match": {
-            "events.event_type": {"$in": ["goal", "penalty_goal"]}
-        }},
+    Данные читаются из предрассчитанной статистики игроков сезона одним запросом,
+    сортировка и пагинация выполняются в mongodb. Рейтинг по одному показателю
+    сортируется по индексу (season_id, показатель). Игроки без матчей в сезоне
+    (например, убранные из состава исправлением матча) в рейтинг не попадают.
+    """
+    effective_actions = {
+        "$add": [{"$multiply": [f"${field}", weight]} for field, weight in weights.items()]
+    }
+    pipeline = [{"$match": {"season_id": season_id, "appearances": {"$gt": 0}}}]
 
-        {"$group": {
-            "_id": {"player_id": "$events.person.id", "player_name": "$events.person.name",
-                    "team_id": "$events.person.team.id", "team_name": "$events.person.team.name"},
-            "goals": {"$sum": 1}
-        }},
+    if len(weights) == 1 and list(weights.values())[0] > 0:
+        [field] = weights
+        pipeline.append({"$sort": {field: -1, "appearances": 1, "name": 1, "player_id": 1}})
+    else:
+        pipeline += [
+            {"$addFields": {"effective_actions": effective_actions}},
+            {"$sort": {"effective_actions": -1, "appearances": 1, "name": 1, "player_id": 1}}
+        ]
 
-        {"$sort": {"_id.player_id": 1}}
-    ]
+    pipeline.append({"$skip": offset})
+    if limit is not None:
+        pipeline.append({"$limit": limit})
+    pipeline.append({"$addFields": {"effective_actions": effective_actions}})
 
-    return await GameDocument.aggregate(pipeline).to_list()
+    return await PlayerSeasonStatsDocument.aggregate(pipeline).to_list()
 
 
 def to_season_with_top_players_schema(
         season_data: Season,
-        players_with_games: list[dict[str, dict[str, str | int] | int]],
-        top_players: list[dict[str, dict[str, str | int] | int]],
-        event_type: str
+        top_players: list[dict[str, dict[str, str | int] | str | int]]
 ) -> SeasonWithTopPlayersSchema:
     """Собирает pydantic схему сезона о лучших игроках по конкретному показателю"""
     players = []
-    for player in players_with_games:
-        idx_player_with_actions = bisect.bisect_left(
-            top_players,
-            player['_id']['player_id'],
-            key=lambda x: x['_id']['player_id']
-        )
-        try:
-            effective_actions = top_players[idx_player_with_actions][event_type]
-        except IndexError:
-            effective_actions = 0
-
+    for player in top_players:
         players.append(PlayerStatsSummarySchema(
-            id=player['_id']['player_id'],
-            name=player['_id']['player_name'],
+            id=player['player_id'],
+            name=player['name'],
             team_number=None,
-            team=BaseTeamSchema(id=player['_id']['team_id'], name=player['_id']['team_name']),
-            games=player['games'],
-            effective_actions=effective_actions
+            team=BaseTeamSchema(id=player['team']['id'], name=player['team']['name']),
+            games=player['appearances'],
+            effective_actions=player['effective_actions']
         ))
 
-    players.sort(key=lambda x: (-x.effective_actions, x.games, x.name))
-
     return SeasonWithTopPlayersSchema(
         id=season_data.id,
         name=season_data.name,
@@ -1,40 +1,69 @@
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import joinedload
 
+from batches import to_batch_schema
 from database import async_session
 from errors import Missing
+from models.db.leagues import Country
 from models.db.persons import Player, Person, Manager
+from models.pydantic.batches import BatchSchema
 from models.pydantic.leagues import CountrySchema
 from models.pydantic.persons import PlayerDetailsSchema, PersonDetailsSchema
 from models.pydantic.teams import BaseTeamSchema
 
 
+_BASE_PLAYER_QUERY = select(
+    Player
+).options(
+    joinedload(
+        Player.person
+    ).joinedload(
+        Person.country
+    )
+).options(
+    joinedload(Player.team)
+)
+
+
+_PLAYER_QUERY = _BASE_PLAYER_QUERY.filter(
+    Player.id == bindparam("player_id")
+)
+
+
+_PLAYERS_QUERY = _BASE_PLAYER_QUERY.filter(
+    Player.id.in_(bindparam("player_ids", expanding=True))
+)
+
+
 async def get_player(player_id: int) -> PlayerDetailsSchema:
     """Выгрузить из БД полную информацию о конкретном игроке"""
     async with async_session() as session:
-        query = select(
-            Player
-        ).options(
-            joinedload(
-                Player.person
-            ).joinedload(
-                Person.country
-            )
-        ).options(
-            joinedload(Player.team)
-        ).filter(
-            Player.id == player_id
-        )
-        result = await session.execute(query)
+        result = await session.execute(_PLAYER_QUERY, {"player_id": player_id})
         try:
             result = result.scalars().one()
         except NoResultFound:
-            raise Missing(f"игрок с id - {player_id} не найден")
+            raise Missing(_player_missing(player_id))
 
     return to_player_schema(result)
 
 
+async def get_players(player_ids: list[int]) -> BatchSchema[PlayerDetailsSchema]:
+    """Выгрузить из БД полную информацию о нескольких игроках одним запросом.
+
+    Игроки возвращаются в порядке player_ids, для ненайденных id - ошибки.
+    """
+    async with async_session() as session:
+        result = await session.execute(_PLAYERS_QUERY, {"player_ids": player_ids})
+        players = {x.id: to_player_schema(x) for x in result.scalars().all()}
+
+    return to_batch_schema(PlayerDetailsSchema, player_ids, players, _player_missing)
+
+
+def _player_missing(player_id: int) -> str:
+    return f"игрок с id - {player_id} не найден"
+
+
 def to_player_schema(player: Player) -> PlayerDetailsSchema:
     """Преобразует сырой SQL-результат в pydantic схему игрока"""
     if player.team is not None:
@@ -48,38 +77,64 @@ def to_player_schema(player: Player) -> PlayerDetailsSchema:
         full_name=player.person.full_name,
         birth_date=player.person.birth_date,
         team_number=player.team_number,
-        country=CountrySchema.model_validate(player.person.country, from_attributes=True),
+        country=_to_country_schema(player.person.country),
         team=team
     )
 
     return player_schema
 
 
+_BASE_MANAGER_QUERY = select(
+    Manager
+).options(
+    joinedload(
+        Manager.person
+    ).joinedload(
+        Person.country
+    )
+).options(
+    joinedload(Manager.team)
+)
+
+
+_MANAGER_QUERY = _BASE_MANAGER_QUERY.filter(
+    Manager.id == bindparam("manager_id")
+)
+
+
+_MANAGERS_QUERY = _BASE_MANAGER_QUERY.filter(
+    Manager.id.in_(bindparam("manager_ids", expanding=True))
+)
+
+
 async def get_manager(manager_id: int) -> PersonDetailsSchema:
     """Выгрузить из БД полную информацию о конкретном тренере"""
     async with async_session() as session:
-        query = select(
-            Manager
-        ).options(
-            joinedload(
-                Manager.person
-            ).joinedload(
-                Person.country
-            )
-        ).options(
-            joinedload(Manager.team)
-        ).filter(
-            Manager.id == manager_id
-        )
-        result = await session.execute(query)
+        result = await session.execute(_MANAGER_QUERY, {"manager_id": manager_id})
         try:
             result = result.scalars().one()
         except NoResultFound:
-            raise Missing(f"тренер с id - {manager_id} не найден")
+            raise Missing(_manager_missing(manager_id))
 
     return to_manager_schema(result)
 
 
+async def get_managers(manager_ids: list[int]) -> BatchSchema[PersonDetailsSchema]:
+    """Выгрузить из БД полную информацию о нескольких тренерах одним запросом.
+
+    Тренеры возвращаются в порядке manager_ids, для ненайденных id - ошибки.
+    """
+    async with async_session() as session:
+        result = await session.execute(_MANAGERS_QUERY, {"manager_ids": manager_ids})
+        managers = {x.id: to_manager_schema(x) for x in result.scalars().all()}
+
+    return to_batch_schema(PersonDetailsSchema, manager_ids, managers, _manager_missing)
+
+
+def _manager_missing(manager_id: int) -> str:
+    return f"тренер с id - {manager_id} не найден"
+
+
 def to_manager_schema(manager: Manager) -> PersonDetailsSchema:
     """Преобразует сырой SQL-результат в pydantic схему тренера"""
     if manager.team is not None:
@@ -92,8 +147,14 @@ def to_manager_schema(manager: Manager) -> PersonDetailsSchema:
         name=manager.person.name,
         full_name=manager.person.full_name,
         birth_date=manager.person.birth_date,
-        country=CountrySchema.model_validate(manager.person.country, from_attributes=True),
+        country=_to_country_schema(manager.person.country),
         team=team
     )
 
     return manager_schema
+
+
+def _to_country_schema(country: Country | None) -> CountrySchema | None:
+    if country is None:
+        return None
+    return CountrySchema.model_validate(country, from_attributes=True)
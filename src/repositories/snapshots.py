@@ -0,0 +1,231 @@
+import json
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from config import Config
+from models.pydantic.internal import ExportDataset, SnapshotFormat, SnapshotResultSchema
+from repositories.exports import (
+    EXPORT_COLUMNS,
+    get_games_batch,
+    get_games_events,
+    get_season_games_batch,
+    get_season_versions,
+    iter_export_rows
+)
+
+
+STATE_FILE = "state.json"
+PARTITIONING = ["league_id", "season_id"]
+
+GAMES_SCHEMA = pa.schema([
+    ("game_id", pa.int64()),
+    ("season_id", pa.int64()),
+    ("league_id", pa.int64()),
+    ("game_date", pa.timestamp("us")),
+    ("home_team_id", pa.int64()),
+    ("home_team", pa.string()),
+    ("guest_team_id", pa.int64()),
+    ("guest_team", pa.string()),
+    ("home_scored", pa.int32()),
+    ("guest_scored", pa.int32()),
+])
+
+STANDINGS_SCHEMA = pa.schema(
+    [("season_id", pa.int64()), ("league_id", pa.int64()), ("position", pa.int32()),
+     ("team_id", pa.int64()), ("team", pa.string())]
+    + [(field, pa.int32()) for field in EXPORT_COLUMNS[ExportDataset.standings][5:]]
+)
+
+EVENTS_SCHEMA = pa.schema([
+    ("game_id", pa.int64()),
+    ("season_id", pa.int64()),
+    ("league_id", pa.int64()),
+    ("minute", pa.string()),
+    ("event_type", pa.string()),
+    ("person_id", pa.int64()),
+    ("person", pa.string()),
+    ("team_id", pa.int64()),
+    ("team", pa.string()),
+])
+
+_TEAM_TYPE = pa.struct([("id", pa.int64()), ("name", pa.string())])
+_EVENT_TYPE = pa.struct([
+    ("event_type", pa.string()),
+    ("minute", pa.string()),
+    ("person", pa.struct([("id", pa.int64()), ("name", pa.string()), ("team", _TEAM_TYPE)])),
+])
+
+
+async def write_snapshot(
+        root: str | Path,
+        file_format: SnapshotFormat = SnapshotFormat.parquet,
+        batch_size: int = Config.EXPORT_BATCH_SIZE,
+        full: bool = False
+) -> SnapshotResultSchema:
+    """Выгрузить матчи, таблицы сезонов и события матчей в колоночные файлы для аналитики.
+
+    Наборы games, events и standings пишутся в подкаталоги root, разбитые по
+    league_id=.../season_id=... (hive). Матчи читаются из postgresql пачками
+    по id, события этих матчей - одним запросом к mongo на пачку и
+    разворачиваются в строки векторно. Последний выгруженный id матча
+    сохраняется в root/state.json после каждой пачки, следующий запуск
+    дописывает только новые матчи; full=True выгружает все заново.
+
+    Матчи и их документы могут меняться и после выгрузки (исправления,
+    результаты, дозагрузка матчей с меньшими id), поэтому в state.json
+    хранятся и версии сезонов. Разделы сезонов, версия которых изменилась,
+    перезаписываются целиком. Версии читаются до выгрузки, изменение во время
+    выгрузки будет подхвачено следующим запуском.
+    Таблицы сезонов небольшие и меняются, они перезаписываются целиком.
+    """
+    root = Path(root)
+    state = _read_state(root)
+    versions = await get_season_versions()
+    if full or not state:
+        for dataset in ("games", "events"):
+            shutil.rmtree(root / dataset, ignore_errors=True)
+        state = {"last_game_id": 0, "format": file_format.value, "season_versions": {}}
+    elif state["format"] != file_format.value:
+        raise ValueError(f"снимок в {root} записан в формате {state['format']}, нужен full")
+
+    games_count = events_count = 0
+    season_versions = state.setdefault("season_versions", {})
+    changed = [
+        season_id for season_id, version in versions.items()
+        if state["last_game_id"] and season_versions.get(str(season_id)) != version
+    ]
+    for season_id in changed:
+        for dataset in ("games", "events"):
+            for directory in (root / dataset).glob(f"league_id=*/season_id={season_id}"):
+                shutil.rmtree(directory)
+
+        after = 0
+        while batch := await get_season_games_batch(season_id, after, state["last_game_id"], batch_size):
+            games, events = await _write_games_batch(root, file_format, batch)
+            games_count += games
+            events_count += events
+            after = batch[-1][0]
+
+        season_versions[str(season_id)] = versions[season_id]
+        _write_state(root, state)
+
+    while batch := await get_games_batch(state["last_game_id"], batch_size):
+        games, events = await _write_games_batch(root, file_format, batch)
+        games_count += games
+        events_count += events
+        state["last_game_id"] = batch[-1][0]
+        _write_state(root, state)
+
+    state["season_versions"] = {str(season_id): version for season_id, version in versions.items()}
+    _write_state(root, state)
+
+    standings_count = await _write_standings(root, file_format, batch_size)
+
+    return SnapshotResultSchema(
+        games=games_count,
+        events=events_count,
+        standings=standings_count,
+        last_game_id=state["last_game_id"],
+        rewritten_seasons=len(changed)
+    )
+
+
+async def _write_games_batch(root: Path, file_format: SnapshotFormat, batch: list[tuple]) -> tuple[int, int]:
+    """Записать пачку матчей и их события, возвращает число строк матчей и событий"""
+    games = _rows_table(batch, GAMES_SCHEMA)
+    events = flatten_events(await get_games_events(games["game_id"].to_pylist()))
+    basename = f"part-{batch[0][0]}"
+    _write_dataset(games, root / "games", file_format, basename)
+    _write_dataset(events, root / "events", file_format, basename)
+    return games.num_rows, events.num_rows
+
+
+def flatten_events(documents: list[dict[str, Any]]) -> pa.Table:
+    """Развернуть события документов матчей в таблицу, по строке на событие.
+
+    Списки событий всех документов собираются в один массив arrow, поля
+    матча размножаются по событиям через индексы родительских списков.
+    """
+    events = pa.array([document.get("events", []) for document in documents], type=pa.list_(_EVENT_TYPE))
+    parents = pc.list_parent_indices(events)
+    flat = pc.list_flatten(events)
+    person = flat.field("person")
+
+    def game_field(name: str) -> pa.Array:
+        return pa.array([document[name] for document in documents], type=pa.int64()).take(parents)
+
+    return pa.Table.from_arrays([
+        game_field("game_id"),
+        game_field("season_id"),
+        game_field("league_id"),
+        flat.field("minute"),
+        flat.field("event_type"),
+        person.field("id"),
+        person.field("name"),
+        person.field("team").field("id"),
+        person.field("team").field("name"),
+    ], schema=EVENTS_SCHEMA)
+
+
+async def _write_standings(root: Path, file_format: SnapshotFormat, batch_size: int) -> int:
+    """Перезаписать таблицы сезонов, строки читаются курсором postgresql пачками"""
+    directory = root / "standings"
+    shutil.rmtree(directory, ignore_errors=True)
+
+    count, rows = 0, []
+    async for row in iter_export_rows(ExportDataset.standings, batch_size=batch_size):
+        rows.append(row)
+        if len(rows) == batch_size:
+            _write_dataset(_rows_table(rows, STANDINGS_SCHEMA), directory, file_format, f"part-{count}")
+            count, rows = count + len(rows), []
+    if rows:
+        _write_dataset(_rows_table(rows, STANDINGS_SCHEMA), directory, file_format, f"part-{count}")
+        count += len(rows)
+
+    return count
+
+
+def _rows_table(rows: list[tuple], schema: pa.Schema) -> pa.Table:
+    """Собрать таблицу arrow из строк БД, колонки строк идут в порядке полей схемы"""
+    return pa.Table.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(zip(*rows), schema)],
+        schema=schema
+    )
+
+
+def _write_dataset(table: pa.Table, directory: Path, file_format: SnapshotFormat, basename: str) -> None:
+    """Записать таблицу в каталог набора с разбиением по лиге и сезону.
+
+    Имена файлов зависят от первой строки пачки, поэтому повтор пачки
+    после сбоя перезаписывает те же файлы, а не создает дубликаты.
+    """
+    if table.num_rows == 0:
+        return
+    ds.write_dataset(
+        table,
+        directory,
+        format="ipc" if file_format == SnapshotFormat.arrow else "parquet",
+        partitioning=PARTITIONING,
+        partitioning_flavor="hive",
+        basename_template=f"{basename}-{{i}}.{file_format.value}",
+        existing_data_behavior="overwrite_or_ignore"
+    )
+
+
+def _read_state(root: Path) -> dict[str, Any]:
+    try:
+        return json.loads((root / STATE_FILE).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def _write_state(root: Path, state: dict[str, Any]) -> None:
+    root.mkdir(parents=True, exist_ok=True)
+    temporary = root / f"{STATE_FILE}.tmp"
+    temporary.write_text(json.dumps(state))
+    temporary.replace(root / STATE_FILE)
@@ -0,0 +1,364 @@
+from collections import Counter
+from typing import Iterable, Sequence
+
+import numpy as np
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import Config
+from database import async_session, dialect_insert
+from errors import Missing
+from models.db.games import Game
+from models.db.teams import SeasonTeam
+from live import game_notification, notify_game_changes
+from repositories.versions import bump_season_versions, invalidate_seasons
+
+
+POINTS_FOR_WIN = 3
+POINTS_FOR_DRAW = 1
+
+STANDINGS_FIELDS = ("games", "wins", "draws", "loses", "scored_goals", "conceded_goals", "points")
+
+TIEBREAKERS = ("goal_difference", "scored", "head_to_head")
+
+
+_GAME_FOR_UPDATE_QUERY = select(
+    Game
+).filter(
+    Game.id == bindparam("game_id")
+).with_for_update()
+
+
+_SEASON_TEAMS_FOR_UPDATE_QUERY = select(
+    SeasonTeam
+).filter(
+    SeasonTeam.season_id == bindparam("season_id")
+).order_by(
+    SeasonTeam.team_id
+).with_for_update()
+
+
+_ALL_RESULTS_QUERY = select(
+    Game.season_id,
+    Game.home_team_id,
+    Game.guest_team_id,
+    Game.home_scored,
+    Game.guest_scored
+).filter(
+    Game.home_scored.is_not(None),
+    Game.guest_scored.is_not(None)
+)
+
+
+_SEASON_RESULTS_QUERY = _ALL_RESULTS_QUERY.filter(
+    Game.season_id == bindparam("season_id")
+)
+
+
+_SEASONS_RESULTS_QUERY = _ALL_RESULTS_QUERY.filter(
+    Game.season_id.in_(bindparam("season_ids", expanding=True))
+)
+
+
+_ALL_SEASON_TEAMS_QUERY = select(
+    SeasonTeam.season_id,
+    SeasonTeam.team_id
+)
+
+
+_SEASONS_TEAMS_QUERY = _ALL_SEASON_TEAMS_QUERY.filter(
+    SeasonTeam.season_id.in_(bindparam("season_ids", expanding=True))
+)
+
+
+def result_deltas(home_scored: int, guest_scored: int) -> tuple[Counter, Counter]:
+    """Вклад результата матча в строки таблицы хозяев и гостей"""
+    home = Counter(games=1, scored_goals=home_scored, conceded_goals=guest_scored)
+    guest = Counter(games=1, scored_goals=guest_scored, conceded_goals=home_scored)
+
+    if home_scored > guest_scored:
+        home.update(wins=1, points=POINTS_FOR_WIN)
+        guest.update(loses=1)
+    elif home_scored < guest_scored:
+        home.update(loses=1)
+        guest.update(wins=1, points=POINTS_FOR_WIN)
+    else:
+        home.update(draws=1, points=POINTS_FOR_DRAW)
+        guest.update(draws=1, points=POINTS_FOR_DRAW)
+
+    return home, guest
+
+
+def compute_standings(
+        entries: Sequence[tuple] | np.ndarray,
+        results: Sequence[tuple] | np.ndarray,
+        tiebreakers: Sequence[str] | None = None
+) -> dict[str, np.ndarray]:
+    """Вычислить таблицы сезонов по результатам матчей за один векторный проход.
+
+    entries - пары (season_id, team_id) команд, которые должны попасть в таблицу
+    даже без сыгранных матчей, results - строки (season_id, home_team_id,
+    guest_team_id, home_scored, guest_scored). Возвращает столбцы строк таблиц:
+    season_id, team_id, position и показатели STANDINGS_FIELDS.
+    """
+    entries = np.asarray(entries, dtype=np.int64).reshape(-1, 2)
+    results = np.asarray(results, dtype=np.int64).reshape(-1, 5)
+    season, home, guest, home_scored, guest_scored = results.T
+
+    pairs = np.concatenate([entries, np.stack([season, home], axis=1), np.stack([season, guest], axis=1)])
+    pairs, inverse = np.unique(pairs, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    home_index = inverse[len(entries):len(entries) + len(results)]
+    guest_index = inverse[len(entries) + len(results):]
+
+    def total(home_values: np.ndarray, guest_values: np.ndarray) -> np.ndarray:
+        return (np.bincount(home_index, home_values, len(pairs))
+                + np.bincount(guest_index, guest_values, len(pairs))).astype(np.int64)
+
+    home_points, guest_points = _result_points(home_scored, guest_scored)
+    standings = dict(
+        season_id=pairs[:, 0],
+        team_id=pairs[:, 1],
+        games=total(np.ones(len(results)), np.ones(len(results))),
+        wins=total(home_scored > guest_scored, guest_scored > home_scored),
+        draws=total(home_scored == guest_scored, home_scored == guest_scored),
+        loses=total(home_scored < guest_scored, guest_scored < home_scored),
+        scored_goals=total(home_scored, guest_scored),
+        conceded_goals=total(guest_scored, home_scored),
+        points=total(home_points, guest_points),
+    )
+    standings["position"] = rank_standings(
+        standings["season_id"],
+        standings["team_id"],
+        standings["points"],
+        standings["scored_goals"],
+        standings["conceded_goals"],
+        tiebreakers,
+        (home_index, guest_index, home_scored, guest_scored)
+    )
+
+    return standings
+
+
+def rank_standings(
+        season: np.ndarray,
+        team: np.ndarray,
+        points: np.ndarray,
+        scored: np.ndarray,
+        conceded: np.ndarray,
+        tiebreakers: Sequence[str] | None = None,
+        games: tuple[np.ndarray, ...] | None = None
+) -> np.ndarray:
+    """Места команд в таблицах своих сезонов.
+
+    Команды упорядочиваются по очкам, затем по критериям tiebreakers
+    (по умолчанию Config.STANDINGS_TIEBREAKERS) в порядке перечисления,
+    затем по id команды:
+        goal_difference - разница забитых и пропущенных мячей
+        scored          - забитые мячи
+        head_to_head    - очки в матчах между командами, равными по предыдущим критериям
+
+    Для head_to_head нужны матчи games - (home_index, guest_index, home_scored,
+    guest_scored), где индексы - номера строк таблицы хозяев и гостей.
+    """
+    if tiebreakers is None:
+        tiebreakers = Config.STANDINGS_TIEBREAKERS
+
+    keys = [season, -points]
+    for tiebreaker in tiebreakers:
+        if tiebreaker not in TIEBREAKERS:
+            raise ValueError(f"неизвестный критерий распределения мест - {tiebreaker}")
+        if tiebreaker == "goal_difference":
+            keys.append(conceded - scored)
+        elif tiebreaker == "scored":
+            keys.append(-scored)
+        elif games is None:
+            raise ValueError("для критерия head_to_head нужны матчи сезона")
+        else:
+            keys.append(-_head_to_head_points(keys, *games))
+    keys.append(team)
+
+    order = np.lexsort(keys[::-1])
+    ordered_season = season[order]
+    positions = np.empty(len(order), dtype=np.int64)
+    positions[order] = np.arange(len(order)) - np.searchsorted(ordered_season, ordered_season) + 1
+    return positions
+
+
+def _result_points(home_scored: np.ndarray, guest_scored: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Очки хозяев и гостей за каждый матч"""
+    draw = np.where(home_scored == guest_scored, POINTS_FOR_DRAW, 0)
+    home = np.where(home_scored > guest_scored, POINTS_FOR_WIN, draw)
+    guest = np.where(guest_scored > home_scored, POINTS_FOR_WIN, draw)
+    return home, guest
+
+
+def _head_to_head_points(
+        keys: list[np.ndarray],
+        home_index: np.ndarray,
+        guest_index: np.ndarray,
+        home_scored: np.ndarray,
+        guest_scored: np.ndarray
+) -> np.ndarray:
+    """Очки каждой команды в матчах с командами, равными ей по ключам keys"""
+    _, group = np.unique(np.stack(keys, axis=1), axis=0, return_inverse=True)
+    group = group.reshape(-1)
+    inside = group[home_index] == group[guest_index]
+
+    home_points, guest_points = _result_points(home_scored[inside], guest_scored[inside])
+    return (np.bincount(home_index[inside], home_points, len(group))
+            + np.bincount(guest_index[inside], guest_points, len(group))).astype(np.int64)
+
+
+async def record_game_result(game_id: int, home_scored: int, guest_scored: int) -> None:
+    """Записать результат матча и инкрементально обновить таблицу сезона.
+
+    В одной транзакции меняются счет матча, строки таблицы двух его команд
+    (вклад прежнего результата, если он был, вычитается) и места команд.
+    Матч и строки таблицы сезона блокируются до конца транзакции, поэтому
+    одновременные результаты матчей одного сезона записываются по очереди.
+    В той же транзакции подписчикам матча отправляется уведомление перечитать счет.
+    """
+    if home_scored < 0 or guest_scored < 0:
+        raise ValueError(f"отрицательный счет матча - {home_scored}:{guest_scored}")
+
+    async with async_session() as session:
+        result = await session.execute(_GAME_FOR_UPDATE_QUERY, {"game_id": game_id})
+        game = result.scalar_one_or_none()
+        if game is None:
+            raise Missing(f"матча с id - {game_id} не найдено")
+
+        deltas = {game.home_team_id: Counter(), game.guest_team_id: Counter()}
+        if game.home_scored is not None and game.guest_scored is not None:
+            home, guest = result_deltas(game.home_scored, game.guest_scored)
+            deltas[game.home_team_id].subtract(home)
+            deltas[game.guest_team_id].subtract(guest)
+        home, guest = result_deltas(home_scored, guest_scored)
+        deltas[game.home_team_id].update(home)
+        deltas[game.guest_team_id].update(guest)
+
+        season_id = game.season_id
+        game.home_scored = home_scored
+        game.guest_scored = guest_scored
+
+        rows = await _get_season_teams(session, season_id, deltas)
+        for team_id, delta in deltas.items():
+            row = rows[team_id]
+            for field in STANDINGS_FIELDS:
+                setattr(row, field, getattr(row, field) + delta[field])
+
+        results = None
+        if "head_to_head" in Config.STANDINGS_TIEBREAKERS:
+            results = await session.execute(_SEASON_RESULTS_QUERY, {"season_id": season_id})
+            results = results.all()
+
+        _rank(list(rows.values()), results)
+        await bump_season_versions(session, [season_id])
+        await notify_game_changes(session, [game_notification(game_id, refresh_score=True)])
+        await session.commit()
+
+    await invalidate_seasons([season_id])
+
+
+async def rebuild_season_standings(season_id: int | None = None) -> list[int]:
+    """Полностью пересчитать таблицы сезонов по результатам их матчей.
+
+    Пересчитывается указанный сезон либо все сезоны, для которых есть
+    матчи или строки таблицы. Возвращает список пересчитанных сезонов.
+    """
+    season_ids = await write_season_standings(None if season_id is None else [season_id])
+    await invalidate_seasons(season_ids)
+
+    return season_ids
+
+
+async def write_season_standings(season_ids: list[int] | None = None) -> list[int]:
+    """Пересчитать таблицы указанных сезонов (None - всех) за один проход.
+
+    Таблицы вычисляются одним векторным проходом (compute_standings) и
+    записываются одним upsert, команды без сыгранных матчей получают нулевые
+    показатели. Версии сезонов увеличиваются в той же транзакции, кэш очищает
+    вызывающий код. Возвращает список пересчитанных сезонов.
+    """
+    if season_ids is not None:
+        results_query, entries_query = _SEASONS_RESULTS_QUERY, _SEASONS_TEAMS_QUERY
+    else:
+        results_query, entries_query = _ALL_RESULTS_QUERY, _ALL_SEASON_TEAMS_QUERY
+
+    async with async_session() as session:
+        results = await session.execute(results_query, {"season_ids": season_ids})
+        entries = await session.execute(entries_query, {"season_ids": season_ids})
+        standings = compute_standings(entries.all(), results.all())
+
+        columns = ("season_id", "team_id", "position") + STANDINGS_FIELDS
+        rows = [
+            dict(zip(columns, values))
+            for values in zip(*(standings[column].tolist() for column in columns))
+        ]
+        if rows:
+            await session.execute(_upsert_standings_statement(session), rows)
+        written_season_ids = sorted(set(standings["season_id"].tolist()) | set(season_ids or ()))
+        await bump_season_versions(session, written_season_ids)
+        await session.commit()
+
+    return written_season_ids
+
+
+def _upsert_standings_statement(session: AsyncSession):
+    """INSERT ... ON CONFLICT DO UPDATE строк таблиц для диалекта БД сессии"""
+    statement = dialect_insert(session, SeasonTeam)
+    return statement.on_conflict_do_update(
+        index_elements=[SeasonTeam.season_id, SeasonTeam.team_id],
+        set_={field: statement.excluded[field] for field in ("position",) + STANDINGS_FIELDS}
+    )
+
+
+async def _get_season_teams(
+        session: AsyncSession,
+        season_id: int,
+        team_ids: Iterable[int]
+) -> dict[int, SeasonTeam]:
+    """Заблокировать строки таблицы сезона и добавить недостающие строки команд team_ids"""
+    result = await session.execute(_SEASON_TEAMS_FOR_UPDATE_QUERY, {"season_id": season_id})
+    rows = {row.team_id: row for row in result.scalars().all()}
+
+    for team_id in team_ids:
+        if team_id not in rows:
+            rows[team_id] = SeasonTeam(
+                season_id=season_id,
+                team_id=team_id,
+                position=0,
+                **{field: 0 for field in STANDINGS_FIELDS}
+            )
+            session.add(rows[team_id])
+
+    return rows
+
+
+def _rank(rows: list[SeasonTeam], results: Sequence[tuple] | None = None) -> None:
+    """Расставить места команд одного сезона, меняются только строки, чье место изменилось.
+
+    results - результаты матчей сезона (как в compute_standings), нужны для критерия head_to_head.
+    """
+    index = {row.team_id: i for i, row in enumerate(rows)}
+    games = None
+    if results is not None:
+        results = [x for x in results if x[1] in index and x[2] in index]
+        games = (
+            np.array([index[x[1]] for x in results], dtype=np.int64),
+            np.array([index[x[2]] for x in results], dtype=np.int64),
+            np.array([x[3] for x in results], dtype=np.int64),
+            np.array([x[4] for x in results], dtype=np.int64),
+        )
+
+    positions = rank_standings(
+        np.array([row.season_id for row in rows], dtype=np.int64),
+        np.array([row.team_id for row in rows], dtype=np.int64),
+        np.array([row.points for row in rows], dtype=np.int64),
+        np.array([row.scored_goals for row in rows], dtype=np.int64),
+        np.array([row.conceded_goals for row in rows], dtype=np.int64),
+        games=games
+    )
+    for row, position in zip(rows, positions.tolist()):
+        if row.position != position:
+            row.position = position
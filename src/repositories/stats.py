@@ -0,0 +1,143 @@
+from collections import Counter
+
+from pymongo import DeleteMany, ReplaceOne, UpdateOne
+
+from models.mongo_documents.games import (
+    EventType,
+    GameDocument,
+    PersonEmbeddedObject
+)
+from models.mongo_documents.stats import PlayerSeasonStatsDocument, STAT_FIELDS
+from repositories.versions import touch_seasons
+
+
+def stat_field(event_type: EventType) -> str:
+    """Имя показателя статистики игрока для типа события"""
+    return f'{event_type.value}s'
+
+
+def count_player_stats(
+        game: GameDocument
+) -> dict[int, tuple[PersonEmbeddedObject, Counter]]:
+    """Посчитать вклад одного матча в статистику игроков сезона.
+
+    Выход в стартовом составе считается за матч игрока,
+    каждое событие увеличивает одноименный показатель.
+    """
+    players = {}
+
+    def player_counter(person: PersonEmbeddedObject) -> Counter:
+        if person.id not in players:
+            players[person.id] = (person, Counter())
+        return players[person.id][1]
+
+    for person in game.home_start_composition + game.guest_start_composition:
+        player_counter(person)['appearances'] += 1
+
+    for event in game.events:
+        player_counter(event.person)[stat_field(event.event_type)] += 1
+
+    return players
+
+
+async def apply_games_to_player_stats(
+        changes: list[tuple[GameDocument | None, GameDocument | None]]
+) -> None:
+    """Инкрементально обновить статистику игроков по изменениям документов матчей.
+
+    Каждое изменение - пара (старый документ, новый документ), для нового матча
+    старый документ None. Вклад старой версии вычитается, вклад новой прибавляется,
+    все изменения записываются в mongo одним bulk_write.
+    """
+    deltas = {}
+    for old_game, new_game in changes:
+        for game, sign in ((old_game, -1), (new_game, 1)):
+            if game is None:
+                continue
+            for player_id, (person, counter) in count_player_stats(game).items():
+                key = (game.season_id, player_id)
+                if key not in deltas:
+                    deltas[key] = dict(league_id=game.league_id, person=person,
+                                       in_new_game=False, counter=Counter())
+                delta = deltas[key]
+                delta['counter'].update({field: sign * value for field, value in counter.items()})
+                if sign > 0:
+                    delta.update(league_id=game.league_id, person=person, in_new_game=True)
+
+    operations = []
+    for (season_id, player_id), delta in deltas.items():
+        person = delta['person']
+        person_fields = dict(league_id=delta['league_id'], name=person.name, team=person.team.model_dump())
+        update = {"$inc": {field: delta['counter'][field] for field in STAT_FIELDS}}
+        if delta['in_new_game']:
+            update["$set"] = person_fields
+        else:
+            update["$setOnInsert"] = person_fields
+
+        operations.append(UpdateOne(
+            {"season_id": season_id, "player_id": player_id},
+            update,
+            upsert=True
+        ))
+
+    if operations:
+        await PlayerSeasonStatsDocument.get_motor_collection().bulk_write(operations, ordered=False)
+
+    await touch_seasons(season_id for season_id, _ in deltas)
+
+
+async def rebuild_player_season_stats(season_id: int | None = None) -> list[int]:
+    """Полностью пересчитать статистику игроков по документам матчей.
+
+    Пересчитывается указанный сезон либо все сезоны, для которых есть матчи.
+    Возвращает список пересчитанных сезонов.
+    """
+    if season_id is not None:
+        season_ids = [season_id]
+    else:
+        season_ids = sorted(await GameDocument.distinct("season_id"))
+
+    await write_player_season_stats(season_ids)
+    await touch_seasons(season_ids)
+
+    return season_ids
+
+
+async def write_player_season_stats(season_ids: list[int]) -> None:
+    """Пересчитать статистику игроков сезонов по документам их матчей за один проход.
+
+    Документы матчей всех сезонов читаются одним запросом, статистика
+    записывается одним bulk_write: строки игроков заменяются целиком,
+    строки игроков, которых больше нет в матчах сезона, удаляются. Результат
+    зависит только от документов, поэтому повтор после сбоя его исправляет.
+    Версии сезонов не меняются - touch_seasons вызывает вызывающий код.
+    """
+    if not season_ids:
+        return
+
+    leagues, persons, counters = {}, {}, {season_id: {} for season_id in season_ids}
+    async for game in GameDocument.find({"season_id": {"$in": season_ids}}).sort("game_id"):
+        leagues[game.season_id] = game.league_id
+        for player_id, (person, counter) in count_player_stats(game).items():
+            persons[game.season_id, player_id] = person
+            counters[game.season_id].setdefault(player_id, Counter()).update(counter)
+
+    operations = []
+    for season_id, players in counters.items():
+        operations.append(DeleteMany({"season_id": season_id, "player_id": {"$nin": list(players)}}))
+        for player_id, counter in players.items():
+            person = persons[season_id, player_id]
+            operations.append(ReplaceOne(
+                {"season_id": season_id, "player_id": player_id},
+                dict(
+                    season_id=season_id,
+                    league_id=leagues[season_id],
+                    player_id=player_id,
+                    name=person.name,
+                    team=person.team.model_dump(),
+                    **{field: counter[field] for field in STAT_FIELDS}
+                ),
+                upsert=True
+            ))
+
+    await PlayerSeasonStatsDocument.get_motor_collection().bulk_write(operations, ordered=False)
@@ -1,160 +1,369 @@
-from sqlalchemy import select
+from collections import defaultdict
+from datetime import datetime
+
+from pydantic import TypeAdapter
+from sqlalchemy import ColumnElement, Row, bindparam, func, or_, select
 from sqlalchemy.exc import NoResultFound
-from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.orm import aliased
 
+from batches import to_batch_schema
 from database import async_session
 from errors import Missing
 from models.db.games import Game
-from models.db.persons import Manager, Player
-from models.db.teams import Team
+from models.db.leagues import Country, Season
+from models.db.persons import Manager, Person, Player
+from models.db.teams import SeasonTeam, Team
+from models.pydantic.batches import BatchSchema
 from models.pydantic.games import BaseGameSchema
-from models.pydantic.leagues import (
-    CountrySchema,
-    SeasonSchema
-)
-from models.pydantic.persons import (
-    BasePersonSchema,
-    BasePlayerSchema
-)
 from models.pydantic.teams import (
+    BaseTeamSchema,
     TeamRelSchema,
     TeamDetailsSchema,
     TeamWithGamesSchema
 )
+from repositories.games import games_after, games_order
+
+
+_TEAMS_ADAPTER = TypeAdapter(list[TeamDetailsSchema])
 
 
-async def get_all_teams() -> list[TeamDetailsSchema]:
-    """Выгрузить из БД список всех команд с краткой информацией"""
+async def get_all_teams(limit: int = 100, after: tuple[int] | None = None) -> list[TeamDetailsSchema]:
+    """Выгрузить из БД страницу списка команд с краткой информацией.
+
+    Команды отсортированы по id, страница начинается после команды
+    с ключом after (keyset-пагинация). Выбираются только нужные колонки
+    команд и их тренеров.
+    """
     async with async_session() as session:
         query = select(
-            Team
-        ).options(
-            joinedload(Team.manager).joinedload(Manager.person)
+            Team.id,
+            Team.name,
+            Team.founded,
+            Manager.id,
+            Person.name
+        ).outerjoin(
+            Manager, Manager.team_id == Team.id
+        ).outerjoin(
+            Person, Person.id == Manager.person_id
+        )
+        if after is not None:
+            query = query.filter(Team.id > after[0])
+        query = query.order_by(
+            Team.id
+        ).limit(
+            limit
         )
         result = await session.execute(query)
-        result = result.scalars().all()
+        result = result.all()
 
     return to_many_teams_schemas(result)
 
 
+_COUNT_TEAMS_QUERY = select(func.count()).select_from(Team)
+
+
+async def count_teams() -> int:
+    """Посчитать в БД количество всех команд"""
+    async with async_session() as session:
+        result = await session.execute(_COUNT_TEAMS_QUERY)
+
+    return result.scalar_one()
+
+
 def to_many_teams_schemas(
-        teams: list[Team]
+        teams: list[tuple]
 ) -> list[TeamDetailsSchema]:
-    """Преобразует сырые SQL-результаты в список pydantic схем всех команд"""
-    result = []
-    for team in teams:
-        if team.manager is not None:
-            manager = BasePersonSchema(id=team.manager.id, name=team.manager.person.name)
-        else:
-            manager = None
-
-        result.append(TeamDetailsSchema(
-            id=team.id,
-            name=team.name,
-            founded=team.founded,
-            manager=manager
-        ))
+    """Преобразует сырые SQL-результаты в список pydantic схем всех команд одним вызовом валидации"""
+    return _TEAMS_ADAPTER.validate_python([
+        {
+            "id": team_id,
+            "name": name,
+            "founded": founded,
+            "manager": _manager(manager_id, manager_name)
+        }
+        for team_id, name, founded, manager_id, manager_name in teams
+    ])
+
 
-    return result
+def _manager(manager_id: int | None, name: str | None) -> dict | None:
+    if manager_id is None:
+        return None
+    return {"id": manager_id, "name": name}
+
+
+_BASE_ONE_TEAM_QUERY = select(
+    Team.id,
+    Team.name,
+    Team.founded,
+    Country.id,
+    Country.name,
+    Manager.id,
+    Person.name
+).join(
+    Country, Country.id == Team.country_id
+).outerjoin(
+    Manager, Manager.team_id == Team.id
+).outerjoin(
+    Person, Person.id == Manager.person_id
+)
+
+
+_ONE_TEAM_QUERY = _BASE_ONE_TEAM_QUERY.filter(
+    Team.id == bindparam("team_id")
+)
+
+
+_TEAMS_QUERY = _BASE_ONE_TEAM_QUERY.filter(
+    Team.id.in_(bindparam("team_ids", expanding=True))
+)
+
+
+_TEAM_SEASONS_QUERY = select(
+    Season.id,
+    Season.name
+).select_from(
+    SeasonTeam
+).join(
+    Season, Season.id == SeasonTeam.season_id
+).filter(
+    SeasonTeam.team_id == bindparam("team_id")
+).order_by(
+    SeasonTeam.season_id
+)
+
+
+_TEAMS_SEASONS_QUERY = select(
+    SeasonTeam.team_id,
+    Season.id,
+    Season.name
+).select_from(
+    SeasonTeam
+).join(
+    Season, Season.id == SeasonTeam.season_id
+).filter(
+    SeasonTeam.team_id.in_(bindparam("team_ids", expanding=True))
+).order_by(
+    SeasonTeam.team_id,
+    SeasonTeam.season_id
+)
+
+
+_TEAM_PLAYERS_QUERY = select(
+    Player.id,
+    Person.name,
+    Player.team_number
+).join(
+    Person, Person.id == Player.person_id
+).filter(
+    Player.team_id == bindparam("team_id")
+).order_by(
+    Player.id
+)
+
+
+_TEAMS_PLAYERS_QUERY = select(
+    Player.team_id,
+    Player.id,
+    Person.name,
+    Player.team_number
+).join(
+    Person, Person.id == Player.person_id
+).filter(
+    Player.team_id.in_(bindparam("team_ids", expanding=True))
+).order_by(
+    Player.team_id,
+    Player.id
+)
 
 
 async def get_one_team(team_id: int) -> TeamRelSchema:
-    """Выгрузить из БД полную информацию о конкретной команде по ID"""
+    """Выгрузить из БД полную информацию о конкретной команде по ID.
+
+    SQL-логика:
+        Выполняет три запроса только нужных колонок:
+        1. Данные команды, страны и тренера
+        2. Сезоны команды
+        3. Игроки команды
+    """
     async with async_session() as session:
-        query = select(
-            Team
-        ).options(
-            joinedload(Team.country)
-        ).options(
-            selectinload(Team.seasons)
-        ).options(
-            joinedload(Team.manager).joinedload(Manager.person)
-        ).options(
-            selectinload(Team.players).joinedload(Player.person)
-        ).filter(
-            Team.id == team_id
-        )
-        result = await session.execute(query)
+        result = await session.execute(_ONE_TEAM_QUERY, {"team_id": team_id})
         try:
-            result = result.scalars().one()
+            team_result = result.one()
         except NoResultFound:
-            raise Missing(f"команда с id - {team_id} не найдена")
+            raise Missing(_team_missing(team_id))
+
+        result = await session.execute(_TEAM_SEASONS_QUERY, {"team_id": team_id})
+        seasons_result = result.all()
+        result = await session.execute(_TEAM_PLAYERS_QUERY, {"team_id": team_id})
+        players_result = result.all()
+
+    return to_one_team_schema(team_result, seasons_result, players_result)
+
+
+async def get_teams(team_ids: list[int]) -> BatchSchema[TeamRelSchema]:
+    """Выгрузить из БД полную информацию о нескольких командах.
+
+    Команды, их сезоны и игроки выбираются тремя запросами на весь пакет.
+    Команды возвращаются в порядке team_ids, для ненайденных id - ошибки.
+    """
+    params = {"team_ids": team_ids}
+    async with async_session() as session:
+        result = await session.execute(_TEAMS_QUERY, params)
+        teams_result = result.all()
+
+        seasons, players = defaultdict(list), defaultdict(list)
+        result = await session.execute(_TEAMS_SEASONS_QUERY, params)
+        for team_id, *season in result.all():
+            seasons[team_id].append(season)
+        result = await session.execute(_TEAMS_PLAYERS_QUERY, params)
+        for team_id, *player in result.all():
+            players[team_id].append(player)
+
+    teams = {team[0]: to_one_team_schema(team, seasons[team[0]], players[team[0]]) for team in teams_result}
+    return to_batch_schema(TeamRelSchema, team_ids, teams, _team_missing)
 
-    return to_one_team_schema(result)
+
+def _team_missing(team_id: int) -> str:
+    return f"команда с id - {team_id} не найдена"
 
 
 def to_one_team_schema(
-        team: Team
+        team: tuple,
+        seasons: list[tuple],
+        players: list[tuple]
 ) -> TeamRelSchema:
-    """Преобразует сырые SQL-результаты в pydantic схему команды"""
-    if team.manager is not None:
-        manager = BasePersonSchema(id=team.manager.id, name=team.manager.person.name)
-    else:
-        manager = None
-
-    team_schema = TeamRelSchema(
-        id=team.id,
-        name=team.name,
-        founded=team.founded,
-        manager=manager,
-        country=CountrySchema(id=team.country.id, name=team.country.name),
-        seasons=[SeasonSchema.model_validate(s, from_attributes=True) for s in team.seasons],
-        players=[BasePlayerSchema(id=p.id, name=p.person.name, team_number=p.team_number) for p in team.players]
-    )
+    """Преобразует сырые SQL-результаты в pydantic схему команды одним вызовом валидации"""
+    team_id, name, founded, country_id, country_name, manager_id, manager_name = team
+
+    return TeamRelSchema.model_validate({
+        "id": team_id,
+        "name": name,
+        "founded": founded,
+        "manager": _manager(manager_id, manager_name),
+        "country": {"id": country_id, "name": country_name},
+        "seasons": [{"id": season_id, "name": season_name} for season_id, season_name in seasons],
+        "players": [
+            {"id": player_id, "name": player_name, "team_number": team_number}
+            for player_id, player_name, team_number in players
+        ]
+    })
+
+
+_BASE_TEAM_QUERY = select(
+    Team
+).filter(
+    Team.id == bindparam("team_id")
+)
 
-    return team_schema
 
+async def get_games_for_team(
+        team_id: int,
+        limit: int = 100,
+        after: tuple[datetime | None, int] | None = None,
+        season_id: int | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None
+) -> TeamWithGamesSchema:
+    """Выгрузить из БД страницу матчей определенной команды.
 
-async def get_games_for_team(team_id: int) -> TeamWithGamesSchema:
-    """Выгрузить из БД информацию об матчах для определенной команды"""
+    Матчи, где команда играет дома или в гостях, выбираются одним запросом
+    с названиями обеих команд и сортируются в БД от новых к старым по дате и id.
+    Страница начинается после матча с ключом after (keyset-пагинация).
+    Матчи можно ограничить сезоном и полуинтервалом дат [start, end).
+    """
     async with async_session() as session:
+        result = await session.execute(_BASE_TEAM_QUERY, {"team_id": team_id})
+        try:
+            team_result = result.scalars().one()
+        except NoResultFound:
+            raise Missing(_team_missing(team_id))
+
+        home_team, guest_team = aliased(Team), aliased(Team)
         query = select(
-            Team
-        ).options(
-            selectinload(
-                Team.home_games
-            ).joinedload(
-                Game.home_team
-            ),
-            selectinload(
-                Team.home_games
-            ).joinedload(
-                Game.guest_team
-            )
-        ).options(
-            selectinload(
-                Team.guest_games
-            ).joinedload(
-                Game.home_team
-            ),
-            selectinload(
-                Team.guest_games
-            ).joinedload(
-                Game.guest_team
-            )
+            Game.id,
+            Game.game_date,
+            home_team.id,
+            home_team.name,
+            guest_team.id,
+            guest_team.name,
+            Game.home_scored,
+            Game.guest_scored
+        ).join(
+            home_team, Game.home_team_id == home_team.id
+        ).join(
+            guest_team, Game.guest_team_id == guest_team.id
         ).filter(
-            Team.id == team_id
+            *_team_games_filters(team_id, season_id, start, end)
+        )
+        if after is not None:
+            query = query.filter(games_after(after, descending=True))
+        query = query.order_by(
+            *games_order(descending=True)
+        ).limit(
+            limit
         )
 
         result = await session.execute(query)
-        try:
-            team_result = result.unique().scalars().one()
-        except NoResultFound:
-            raise Missing(f"команда с id - {team_id} не найдена")
+        games_result = result.all()
+
+    return to_games_for_team_schema(team_result, games_result)
+
 
-    return to_games_for_team_schema(team_result)
+async def count_games_for_team(
+        team_id: int,
+        season_id: int | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None
+) -> int:
+    """Посчитать в БД количество матчей определенной команды с учетом фильтров"""
+    async with async_session() as session:
+        query = select(
+            func.count()
+        ).select_from(
+            Game
+        ).filter(
+            *_team_games_filters(team_id, season_id, start, end)
+        )
+        result = await session.execute(query)
+
+    return result.scalar_one()
+
+
+def _team_games_filters(
+        team_id: int,
+        season_id: int | None,
+        start: datetime | None,
+        end: datetime | None
+) -> list[ColumnElement[bool]]:
+    """Условия выборки матчей команды по сезону и полуинтервалу дат [start, end)"""
+    filters = [or_(Game.home_team_id == team_id, Game.guest_team_id == team_id)]
+    if season_id is not None:
+        filters.append(Game.season_id == season_id)
+    if start is not None:
+        filters.append(Game.game_date >= start)
+    if end is not None:
+        filters.append(Game.game_date < end)
+    return filters
 
 
 def to_games_for_team_schema(
-        team_data: Team
+        team_data: Team,
+        games: list[Row]
 ) -> TeamWithGamesSchema:
-    """Преобразует сырой SQL-результат в pydantic схему матчей команды"""
-    home_games = [BaseGameSchema.model_validate(x, from_attributes=True) for x in team_data.home_games]
-    guest_games = [BaseGameSchema.model_validate(x, from_attributes=True) for x in team_data.guest_games]
-    all_games = sorted(home_games + guest_games, key=lambda x: x.game_date, reverse=True)
+    """Преобразует сырые SQL-результаты в pydantic схему матчей команды"""
+    games_schema = []
+    for game_id, game_date, home_id, home_name, guest_id, guest_name, home_scored, guest_scored in games:
+        games_schema.append(BaseGameSchema(
+            id=game_id,
+            game_date=game_date,
+            home_team=BaseTeamSchema(id=home_id, name=home_name),
+            guest_team=BaseTeamSchema(id=guest_id, name=guest_name),
+            home_scored=home_scored,
+            guest_scored=guest_scored
+        ))
 
     return TeamWithGamesSchema(
         id=team_data.id,
         name=team_data.name,
-        games=all_games
+        games=games_schema
     )
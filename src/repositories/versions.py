@@ -0,0 +1,117 @@
+from typing import Iterable
+
+from sqlalchemy import and_, bindparam, func, select, update
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache import invalidate_season
+from database import async_session
+from errors import Missing
+from models.db.leagues import Season
+
+
+_SEASON_VERSION_QUERY = select(
+    Season.version
+).filter(
+    and_(
+        Season.league_id == bindparam("league_id"),
+        Season.id == bindparam("season_id")
+    )
+)
+
+
+async def get_season_version(league_id: int, season_id: int) -> int:
+    """Выгрузить из БД версию данных сезона - счетчик его изменений"""
+    async with async_session() as session:
+        result = await session.execute(
+            _SEASON_VERSION_QUERY,
+            {"league_id": league_id, "season_id": season_id}
+        )
+        try:
+            version = result.scalar_one()
+        except NoResultFound:
+            raise Missing(f"сезонa с id лиги - {league_id} и id сезона - {season_id} не найдено")
+
+    return version
+
+
+_SEASONS_VERSION_COLUMNS = (
+    func.count(Season.id),
+    func.coalesce(func.sum(Season.id), 0),
+    func.coalesce(func.sum(Season.version), 0)
+)
+
+
+_CURRENT_SEASONS_VERSION_QUERY = select(
+    *_SEASONS_VERSION_COLUMNS
+).filter(
+    Season.is_current_season == True
+)
+
+
+_LEAGUE_SEASONS_VERSION_QUERY = select(
+    *_SEASONS_VERSION_COLUMNS
+).filter(
+    Season.league_id == bindparam("league_id")
+)
+
+
+async def get_current_seasons_version() -> str:
+    """Выгрузить из БД сводную версию текущих сезонов всех лиг.
+
+    Версия складывается из числа сезонов, суммы их id и суммы их версий, поэтому
+    меняется при изменении любого из сезонов и при смене набора сезонов.
+    """
+    async with async_session() as session:
+        result = await session.execute(_CURRENT_SEASONS_VERSION_QUERY)
+        count, ids, versions = result.one()
+
+    return f"{count}.{ids}.{versions}"
+
+
+async def get_league_seasons_version(league_id: int) -> str:
+    """Выгрузить из БД сводную версию всех сезонов лиги, как в get_current_seasons_version"""
+    async with async_session() as session:
+        result = await session.execute(_LEAGUE_SEASONS_VERSION_QUERY, {"league_id": league_id})
+        count, ids, versions = result.one()
+
+    return f"{count}.{ids}.{versions}"
+
+
+async def touch_seasons(season_ids: Iterable[int]) -> None:
+    """Отметить изменение данных сезонов: увеличить их версии и удалить их из кэша.
+
+    Вызывается теми, кто меняет только статистику игроков в mongo, - после записи.
+    Записи в postgresql увеличивают версии в своей транзакции (bump_season_versions)
+    и затем только очищают кэш (invalidate_seasons). Ответы, кэшированные по версии
+    сезона, после этого не выдаются и без очистки кэша - она лишь освобождает память
+    и сбрасывает записи без версии.
+    """
+    season_ids = sorted(set(season_ids))
+    if not season_ids:
+        return
+
+    async with async_session() as session:
+        await bump_season_versions(session, season_ids)
+        await session.commit()
+
+    await invalidate_seasons(season_ids)
+
+
+async def bump_season_versions(session: AsyncSession, season_ids: Iterable[int]) -> None:
+    """Увеличить версии сезонов в транзакции сессии, без фиксации.
+
+    Вызывается в той же транзакции, что меняет данные сезонов, чтобы версия
+    не могла отстать от данных при сбое между двумя транзакциями.
+    """
+    season_ids = sorted(set(season_ids))
+    if season_ids:
+        await session.execute(
+            update(Season).where(Season.id.in_(season_ids)).values(version=Season.version + 1)
+        )
+
+
+async def invalidate_seasons(season_ids: Iterable[int]) -> None:
+    """Удалить из кэша ответы по сезонам после фиксации их изменений"""
+    for season_id in sorted(set(season_ids)):
+        await invalidate_season(season_id)
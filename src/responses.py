@@ -0,0 +1,27 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class SchemaJSONResponse(JSONResponse):
+    """JSON-ответ из pydantic схем, уже собранных и провалидированных репозиторием.
+
+    Обработчик возвращает ответ напрямую, поэтому FastAPI не валидирует данные
+    повторно по модели ответа и не прогоняет их через jsonable_encoder. Схемы
+    выгружаются model_dump и сериализуются orjson. Модель ответа указывается
+    в response_model маршрута и используется только для документации.
+    Заголовки, выставленные обработчиком в Response зависимости, нужно
+    передать в headers - FastAPI их к возвращенному ответу не добавляет.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_dump_schema, option=orjson.OPT_UTC_Z)
+
+
+def _dump_schema(value: Any) -> Any:
+    """Преобразовать вложенную схему для orjson, как это делает FastAPI (по алиасам)"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(by_alias=True)
+    raise TypeError(f"тип {type(value).__name__} не сериализуется в JSON")
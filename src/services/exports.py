@@ -0,0 +1,15 @@
+from typing import AsyncIterator
+
+from export_formats import encode_rows
+from models.pydantic.internal import ExportDataset, ExportFormat
+from repositories import exports as data
+
+
+def export_dataset(
+        dataset: ExportDataset,
+        export_format: ExportFormat,
+        season_id: int | None = None
+) -> AsyncIterator[str]:
+    """Получает поток выгрузки набора данных сезона или всего архива в NDJSON или CSV"""
+    rows = data.iter_export_rows(dataset, season_id)
+    return encode_rows(export_format, data.EXPORT_COLUMNS[dataset], rows)
@@ -1,8 +1,16 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import AsyncIterator
+from zoneinfo import ZoneInfo
+
+import live
+from periods import to_utc_period
 
 from repositories import games as data
+from models.pydantic.batches import BatchSchema
 from models.pydantic.games import (
     GameDetailSchema,
+    GameIngestSchema,
+    GamesBatchResultSchema,
     GameWithLeagueSchema
 )
 
@@ -13,7 +21,45 @@ async def get_game(game_id: int) -> GameDetailSchema:
     return game
 
 
-async def get_games_for_date(date: datetime) -> list[GameWithLeagueSchema]:
-    """Получает список матчей за определенный день"""
-    games = await data.get_games_for_date(date)
+async def get_games(game_ids: list[int]) -> BatchSchema[GameDetailSchema]:
+    """Получает полную информацию о нескольких матчах по их ID"""
+    games = await data.get_games(game_ids)
     return games
+
+
+async def save_games(games: list[GameIngestSchema]) -> GamesBatchResultSchema:
+    """Загружает пакет матчей с составами, тренерами и событиями"""
+    result = await data.save_games(games)
+    return result
+
+
+async def stream_game(game_id: int) -> AsyncIterator[str]:
+    """Получает поток server-sent events матча, начинающийся с текущего счета.
+
+    Если матча нет - выбрасывается Missing до начала потока.
+    """
+    stream = await live.open_game_stream(game_id, data.get_game_score)
+    return stream
+
+
+async def watch_game_notifications() -> None:
+    """Транслирует подписчикам потоков изменения матчей, записанные любым процессом"""
+    await live.watch_game_notifications(data.get_game_score)
+
+
+async def get_games_for_period(
+        date_from: date,
+        date_to: date,
+        tz: ZoneInfo,
+        limit: int,
+        after: tuple[datetime, int] | None = None
+) -> list[GameWithLeagueSchema]:
+    """Получает список матчей с date_from по date_to включительно по календарю часового пояса tz.
+
+    Время начала матчей хранится в UTC, поэтому границы периода
+    переводятся из часового пояса tz в UTC.
+    """
+    start, end = to_utc_period(date_from, date_to, tz)
+    games = await data.get_games_for_period(start, end, limit, after)
+    return games
+
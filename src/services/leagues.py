@@ -1,3 +1,7 @@
+from datetime import datetime
+
+from cache import cached
+from models.mongo_documents.games import EventType
 from models.pydantic.leagues import (
     LeagueWithCurrentSeasonSchema,
     LeagueCountrySchema,
@@ -8,45 +12,111 @@ from models.pydantic.leagues import (
     SeasonWithGamesSchema
 )
 from repositories import leagues as data
+from repositories import versions
+
 
+async def get_leagues_version() -> str:
+    """Получает сводную версию текущих сезонов всех лиг для ключа кэша списка лиг"""
+    version = await versions.get_current_seasons_version()
+    return version
 
-async def get_all_leagues() -> list[LeagueWithCurrentSeasonSchema]:
-    """Получает список всех доступных лиг с информацией о текущем сезоне"""
+
+@cached("leagues:all:v{version}")
+async def get_all_leagues(version: str) -> list[LeagueWithCurrentSeasonSchema]:
+    """Получает список всех доступных лиг с информацией о текущем сезоне, version входит в ключ кэша"""
     leagues = await data.get_all_leagues()
     return leagues
 
 
+@cached("leagues:{league_id}")
 async def get_one_league(league_id: int) -> LeagueCountrySchema:
     """Получает подробную информацию о конкретной лиге"""
     league = await data.get_one_league(league_id)
     return league
 
 
-async def get_seasons(league_id: int) -> list[SeasonWithLeaderSchema]:
-    """Получает список всех сезонов указанной лиги с информацией о лидерах в каждом сезоне"""
+async def get_league_seasons_version(league_id: int) -> str:
+    """Получает сводную версию всех сезонов лиги для ключа кэша списка сезонов"""
+    version = await versions.get_league_seasons_version(league_id)
+    return version
+
+
+@cached("leagues:seasons:{league_id}:v{version}")
+async def get_seasons(league_id: int, version: str) -> list[SeasonWithLeaderSchema]:
+    """Получает список всех сезонов указанной лиги с информацией о лидерах в каждом сезоне.
+
+    version - сводная версия сезонов лиги, она входит в ключ кэша.
+    """
     seasons = await data.get_seasons(league_id)
     return seasons
 
 
-async def get_season(league_id: int, season_id: int) -> SeasonRelSchema:
-    """Получает детальную информацию о конкретном сезоне лиги"""
+async def get_season_version(league_id: int, season_id: int) -> int:
+    """Получает версию данных сезона, она меняется при каждом изменении сезона"""
+    version = await versions.get_season_version(league_id, season_id)
+    return version
+
+
+@cached("seasons:{season_id}:league:{league_id}:v{version}:season")
+async def get_season(league_id: int, season_id: int, version: int) -> SeasonRelSchema:
+    """Получает детальную информацию о конкретном сезоне лиги.
+
+    version - версия сезона, прочитанная до выгрузки, она входит в ключ кэша,
+    поэтому после изменения сезона старая запись не будет выдана под новой версией.
+    """
     season = await data.get_season(league_id, season_id)
     return season
 
 
-async def get_players_in_season(league_id: int, season_id: int) -> SeasonWithPlayersSchema:
-    """Получает информацию об игроках в конкретном сезоне лиги"""
+@cached("seasons:{season_id}:league:{league_id}:v{version}:players")
+async def get_players_in_season(league_id: int, season_id: int, version: int) -> SeasonWithPlayersSchema:
+    """Получает информацию об игроках в конкретном сезоне лиги, version входит в ключ кэша"""
     season = await data.get_players_in_season(league_id, season_id)
     return season
 
 
-async def get_games_for_season(league_id: int, season_id: int) -> SeasonWithGamesSchema:
-    """Получает информацию о матчах в конкретном сезоне лиги"""
-    season = await data.get_games_for_season(league_id, season_id)
+@cached("seasons:{season_id}:league:{league_id}:v{version}:games:{limit}:{after}")
+async def get_games_for_season(
+        league_id: int,
+        season_id: int,
+        version: int,
+        limit: int = 100,
+        after: tuple[datetime | None, int] | None = None
+) -> SeasonWithGamesSchema:
+    """Получает страницу матчей в конкретном сезоне лиги, version входит в ключ кэша"""
+    season = await data.get_games_for_season(league_id, season_id, limit, after)
+    return season
+
+
+@cached("seasons:{season_id}:league:{league_id}:v{version}:games-count")
+async def count_games_for_season(league_id: int, season_id: int, version: int) -> int:
+    """Получает общее количество матчей в конкретном сезоне лиги, version входит в ключ кэша"""
+    count = await data.count_games_for_season(league_id, season_id)
+    return count
+
+
+@cached("seasons:{season_id}:league:{league_id}:v{version}:scores:{limit}:{offset}")
+async def get_scores_in_season(
+        league_id: int,
+        season_id: int,
+        version: int,
+        limit: int | None = None,
+        offset: int = 0
+) -> SeasonWithTopPlayersSchema:
+    """Получает информацию о бомбардирах в конкретном сезоне лиги, version входит в ключ кэша"""
+    season = await data.get_scores_in_season(league_id, season_id, limit, offset)
     return season
 
 
-async def get_scores_in_season(league_id: int, season_id: int) -> SeasonWithTopPlayersSchema:
-    """Получает информацию о бомбардирах в конкретном сезоне лиги"""
-    season = await data.get_scores_in_season(league_id, season_id)
+@cached("seasons:{season_id}:league:{league_id}:v{version}:leaders:{weights}:{limit}:{offset}")
+async def get_leaders_in_season(
+        league_id: int,
+        season_id: int,
+        version: int,
+        weights: dict[EventType, int],
+        limit: int | None = None,
+        offset: int = 0
+) -> SeasonWithTopPlayersSchema:
+    """Получает рейтинг игроков сезона по взвешенной сумме указанных типов событий, version входит в ключ кэша"""
+    season = await data.get_leaders_in_season(league_id, season_id, weights, limit, offset)
     return season
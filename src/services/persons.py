@@ -1,3 +1,4 @@
+from models.pydantic.batches import BatchSchema
 from models.pydantic.persons import PlayerDetailsSchema, PersonDetailsSchema
 from repositories import persons as data
 
@@ -8,7 +9,19 @@ async def get_player(player_id: int) -> PlayerDetailsSchema:
     return player
 
 
+async def get_players(player_ids: list[int]) -> BatchSchema[PlayerDetailsSchema]:
+    """Получает полную информацию о нескольких игроках по их ID"""
+    players = await data.get_players(player_ids)
+    return players
+
+
 async def get_manager(manager_id: int) -> PersonDetailsSchema:
     """Получает полную информацию о конкретном тренере по его ID"""
     manager = await data.get_manager(manager_id)
     return manager
+
+
+async def get_managers(manager_ids: list[int]) -> BatchSchema[PersonDetailsSchema]:
+    """Получает полную информацию о нескольких тренерах по их ID"""
+    managers = await data.get_managers(manager_ids)
+    return managers
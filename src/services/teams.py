@@ -1,24 +1,68 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from models.pydantic.batches import BatchSchema
 from models.pydantic.teams import (
     TeamRelSchema,
     TeamDetailsSchema,
     TeamWithGamesSchema
 )
+from periods import UTC, to_utc_period
 from repositories import teams as data
 
 
-async def get_all_teams() -> list[TeamDetailsSchema]:
-    """Получает список всех команд с их полными данными"""
-    teams = await data.get_all_teams()
+async def get_all_teams(limit: int = 100, after: tuple[int] | None = None) -> list[TeamDetailsSchema]:
+    """Получает страницу списка команд с их полными данными"""
+    teams = await data.get_all_teams(limit, after)
     return teams
 
 
+async def count_teams() -> int:
+    """Получает общее количество команд"""
+    count = await data.count_teams()
+    return count
+
+
 async def get_one_team(team_id: int) -> TeamRelSchema:
     """Получает полную информацию о конкретной команде по её ID"""
     team = await data.get_one_team(team_id)
     return team
 
 
-async def get_games_for_team(team_id: int) -> TeamWithGamesSchema:
-    """Получает информацию о матчах конкретной команды по её ID"""
-    team = await data.get_games_for_team(team_id)
+async def get_teams(team_ids: list[int]) -> BatchSchema[TeamRelSchema]:
+    """Получает полную информацию о нескольких командах по их ID"""
+    teams = await data.get_teams(team_ids)
+    return teams
+
+
+async def get_games_for_team(
+        team_id: int,
+        limit: int = 100,
+        after: tuple[datetime | None, int] | None = None,
+        season_id: int | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        tz: ZoneInfo = UTC
+) -> TeamWithGamesSchema:
+    """Получает страницу матчей конкретной команды по её ID.
+
+    Матчи можно ограничить сезоном и периодом с date_from по date_to включительно
+    по календарю часового пояса tz.
+    """
+    start, end = to_utc_period(date_from, date_to, tz)
+    team = await data.get_games_for_team(team_id, limit, after, season_id, start, end)
     return team
+
+
+async def count_games_for_team(
+        team_id: int,
+        season_id: int | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        tz: ZoneInfo = UTC
+) -> int:
+    """Получает общее количество матчей конкретной команды по её ID с учетом фильтров"""
+    start, end = to_utc_period(date_from, date_to, tz)
+    count = await data.count_games_for_team(team_id, season_id, start, end)
+    return count
+
@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from models.pydantic.internal import ExportDataset, ExportFormat
+
+
+async def chunks(*values: str):
+    for value in values:
+        yield value
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "url, dataset, export_format, season_id, content_type, filename",
+    [
+        ("/exports/games", ExportDataset.games, ExportFormat.ndjson, None,
+         "application/x-ndjson", "games.ndjson"),
+        ("/exports/standings?season_id=3&format=csv", ExportDataset.standings, ExportFormat.csv, 3,
+         "text/csv; charset=utf-8", "standings-season-3.csv"),
+        ("/exports/events?season_id=1", ExportDataset.events, ExportFormat.ndjson, 1,
+         "application/x-ndjson", "events-season-1.ndjson"),
+    ]
+)
+@patch("api.exports.service.export_dataset")
+async def test_export_dataset(mock_service_export_dataset, url, dataset, export_format, season_id,
+                              content_type, filename):
+    mock_service_export_dataset.return_value = chunks('{"game_id":1}\n', '{"game_id":2}\n')
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(url)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == content_type
+    assert response.headers["content-disposition"] == f'attachment; filename="{filename}"'
+    assert response.text == '{"game_id":1}\n{"game_id":2}\n'
+    mock_service_export_dataset.assert_called_once_with(dataset, export_format, season_id)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url", ["/exports/teams", "/exports/games?format=xml"])
+@patch("api.exports.service.export_dataset")
+async def test_export_dataset_invalid(mock_service_export_dataset, url):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(url)
+
+    assert response.status_code == 422
+    mock_service_export_dataset.assert_not_called()
@@ -1,14 +1,18 @@
-from datetime import datetime
+from datetime import date, datetime
 from unittest.mock import patch
+from zoneinfo import ZoneInfo
 
 import pytest
 from httpx import AsyncClient, ASGITransport
 
+from config import Config
 from errors import Missing
 from main import app
 from models.pydantic.games import (
     GameWithLeagueSchema,
-    GameDetailSchema, GameEventSchema
+    GameDetailSchema, GameEventSchema,
+    GameIngestSchema,
+    GamesBatchResultSchema
 )
 from models.pydantic.leagues import SeasonSchema, LeagueSchema
 from models.pydantic.persons import (
@@ -16,6 +20,7 @@ from models.pydantic.persons import (
     PlayerInGameSchema
 )
 from models.pydantic.teams import BaseTeamSchema
+from pagination import decode_cursor, encode_cursor
 
 
 @pytest.mark.asyncio
@@ -90,6 +95,108 @@ async def test_get_game_missing(mock_service_get_game):
     mock_service_get_game.assert_called_once_with(999)
 
 
+INGEST_GAME = dict(
+    id=3, season_id=1, game_date='2025-03-01T18:00:00', home_team_id=2, guest_team_id=1,
+    home_scored=0, guest_scored=1,
+    home_start_composition=[dict(id=3, name='player3', team=dict(id=2, name='team2'))],
+    events=[dict(event_type='own_goal', minute='50',
+                 person=dict(id=3, name='player3', team=dict(id=2, name='team2')))]
+)
+
+
+@pytest.fixture
+def ingest_token(monkeypatch):
+    monkeypatch.setattr(Config, "INGEST_API_TOKEN", "secret")
+    return "secret"
+
+
+@pytest.mark.asyncio
+@patch("api.games.service.save_games")
+async def test_save_games(mock_service_save_games, ingest_token):
+    mock_service_save_games.return_value = GamesBatchResultSchema(created=[3], updated=[], season_ids=[1])
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/games/bulk", json=[INGEST_GAME], headers={"X-Ingest-Token": ingest_token})
+
+    assert response.status_code == 200
+    assert response.json() == dict(created=[3], updated=[], season_ids=[1])
+    mock_service_save_games.assert_called_once_with([GameIngestSchema(**INGEST_GAME)])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "body, side_effect, expected_status",
+    [
+        ([], None, 422),
+        ([dict(INGEST_GAME, home_scored=-1)], None, 422),
+        ([dict(INGEST_GAME, events=[dict(event_type='corner', minute='1', person=None)])], None, 422),
+        ([INGEST_GAME], Missing("сезонов с id - [1] не найдено"), 422),
+    ]
+)
+@patch("api.games.service.save_games")
+async def test_save_games_invalid(mock_service_save_games, body, side_effect, expected_status, ingest_token):
+    mock_service_save_games.side_effect = side_effect
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/games/bulk", json=body, headers={"X-Ingest-Token": ingest_token})
+
+    assert response.status_code == expected_status
+    assert mock_service_save_games.called == (side_effect is not None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "configured_token, headers, expected_status",
+    [
+        ("", {"X-Ingest-Token": ""}, 404),
+        ("", {}, 404),
+        ("secret", {}, 401),
+        ("secret", {"X-Ingest-Token": "wrong"}, 401),
+    ]
+)
+@patch("api.games.service.save_games")
+async def test_save_games_requires_token(mock_service_save_games, monkeypatch, configured_token, headers,
+                                         expected_status):
+    monkeypatch.setattr(Config, "INGEST_API_TOKEN", configured_token)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/games/bulk", json=[INGEST_GAME], headers=headers)
+
+    assert response.status_code == expected_status
+    mock_service_save_games.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("api.games.service.stream_game")
+async def test_stream_game(mock_service_stream_game):
+    async def stream():
+        yield "event: score\ndata: {}\n\n"
+
+    mock_service_stream_game.return_value = stream()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/games/1/live")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.text == "event: score\ndata: {}\n\n"
+    mock_service_stream_game.assert_called_once_with(1)
+
+
+@pytest.mark.asyncio
+@patch("api.games.service.stream_game")
+async def test_stream_game_missing(mock_service_stream_game):
+    mock_service_stream_game.side_effect = Missing("Game not found")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/games/999/live")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Game not found"}
+    mock_service_stream_game.assert_called_once_with(999)
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "service_return, expected_response",
@@ -145,8 +252,8 @@ async def test_get_game_missing(mock_service_get_game):
     ]
 )
 @pytest.mark.asyncio
-@patch("api.games.service.get_games_for_date")
-async def test_get_games_for_date(mock_service_get_games, service_return, expected_response):
+@patch("api.games.service.get_games_for_period")
+async def test_get_games_for_period(mock_service_get_games, service_return, expected_response):
     service_get_manager_return_value = service_return
     mock_service_get_games.return_value = service_get_manager_return_value
 
@@ -154,4 +261,60 @@ async def test_get_games_for_date(mock_service_get_games, service_return, expect
         response = await client.get("/games/?date=2025-01-01")
 
     assert response.json() == expected_response
-    mock_service_get_games.assert_called_once()
+    assert "X-Next-Cursor" not in response.headers
+    mock_service_get_games.assert_called_once_with(date(2025, 1, 1), date(2025, 1, 1), ZoneInfo("UTC"), 100, None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query, service_args",
+    [
+        ("?from=2025-01-01&to=2025-01-07&tz=Europe/Moscow&limit=1",
+         (date(2025, 1, 1), date(2025, 1, 7), ZoneInfo("Europe/Moscow"), 1, None)),
+
+        ("?from=2025-01-01&limit=1&cursor=" + encode_cursor(datetime(2025, 1, 1, 18), 3),
+         (date(2025, 1, 1), date(2025, 1, 1), ZoneInfo("UTC"), 1, (datetime(2025, 1, 1, 18), 3))),
+    ]
+)
+@patch("api.games.service.get_games_for_period")
+async def test_get_games_for_period_paginated(mock_service_get_games, query, service_args):
+    mock_service_get_games.return_value = [
+        GameWithLeagueSchema(
+            id=5,
+            season=SeasonSchema(id=1, name='season1'),
+            league=LeagueSchema(id=1, name='league1'),
+            game_date=datetime(2025, 1, 1, 19, 30),
+            home_team=BaseTeamSchema(id=1, name='team1'),
+            guest_team=BaseTeamSchema(id=2, name='team2'),
+            home_scored=1,
+            guest_scored=0
+        )
+    ]
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(f"/games/{query}")
+
+    assert response.status_code == 200
+    assert decode_cursor(response.headers["X-Next-Cursor"], datetime, int) == (datetime(2025, 1, 1, 19, 30), 5)
+    mock_service_get_games.assert_called_once_with(*service_args)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query, expected_status",
+    [
+        ("", 422),
+        ("?date=2025-01-01&from=2025-01-01", 422),
+        ("?from=2025-01-07&to=2025-01-01", 422),
+        ("?date=2025-01-01&tz=Mars/Olympus", 422),
+        ("?date=2025-01-01&limit=0", 422),
+        ("?date=2025-01-01&cursor=broken", 400),
+    ]
+)
+@patch("api.games.service.get_games_for_period")
+async def test_get_games_for_period_invalid(mock_service_get_games, query, expected_status):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(f"/games/{query}")
+
+    assert response.status_code == expected_status
+    mock_service_get_games.assert_not_called()
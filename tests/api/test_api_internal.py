@@ -0,0 +1,21 @@
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+
+
+@pytest.mark.asyncio
+@patch("api.internal.get_pool_metrics")
+async def test_get_pool(mock_get_pool_metrics):
+    metrics = dict(size=10, max_overflow=5, checked_in=7, checked_out=3, overflow=0,
+                   overflow_checkouts=2, waits=1, wait_seconds=0.25, timeouts=0)
+    mock_get_pool_metrics.return_value = metrics
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/internal/pool")
+
+    assert response.status_code == 200
+    assert response.json() == metrics
+    mock_get_pool_metrics.assert_called_once_with()
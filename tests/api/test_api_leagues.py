@@ -4,8 +4,10 @@ from unittest.mock import patch
 import pytest
 from httpx import AsyncClient, ASGITransport
 
+from api.leagues import _season_etag
 from errors import Missing
 from main import app
+from models.mongo_documents.games import EventType
 from models.pydantic.games import BaseGameSchema
 from models.pydantic.leagues import (
     CountrySchema,
@@ -25,6 +27,25 @@ from models.pydantic.teams import (
     BaseTeamSchema,
     TeamInSeasonSchema
 )
+from pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture(autouse=True)
+def mock_service_get_season_version():
+    """Версия сезона для ETag, по умолчанию 1"""
+    with patch("api.leagues.service.get_season_version") as mock:
+        mock.return_value = 1
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def mock_service_get_seasons_versions():
+    """Сводные версии сезонов для ключей кэша списков лиг и сезонов"""
+    with patch("api.leagues.service.get_leagues_version") as leagues_mock, \
+            patch("api.leagues.service.get_league_seasons_version") as seasons_mock:
+        leagues_mock.return_value = "2.3.0"
+        seasons_mock.return_value = "1.1.0"
+        yield leagues_mock, seasons_mock
 
 
 @pytest.mark.asyncio
@@ -68,7 +89,7 @@ async def test_get_all_leagues(mock_service_get_all, service_return):
         response = await client.get("/leagues/")
 
     assert response.json() == [m.model_dump() for m in service_return]
-    mock_service_get_all.assert_called_once()
+    mock_service_get_all.assert_called_once_with("2.3.0")
 
 
 @pytest.mark.asyncio
@@ -134,7 +155,7 @@ async def test_get_seasons(mock_service_get_seasons, service_return):
         response = await client.get("/leagues/1/seasons")
 
     assert response.json() == [m.model_dump() for m in service_return]
-    mock_service_get_seasons.assert_called_once_with(1)
+    mock_service_get_seasons.assert_called_once_with(1, "1.1.0")
 
 
 @pytest.mark.asyncio
@@ -147,7 +168,7 @@ async def test_get_seasons_missing(mock_service_get_season):
 
     assert response.status_code == 404
     assert response.json() == {"detail": "Seasons not found"}
-    mock_service_get_season.assert_called_once_with(999)
+    mock_service_get_season.assert_called_once_with(999, "1.1.0")
 
 
 @pytest.mark.asyncio
@@ -190,7 +211,109 @@ async def test_get_season(mock_service_get_season):
         response = await client.get("/leagues/1/seasons/1")
 
     assert response.json() == service_get_season_return_value.model_dump()
-    mock_service_get_season.assert_called_once_with(1, 1)
+    assert response.headers["ETag"] == _season_etag(1, 1, "season")
+    assert response.headers["Cache-Control"] == "no-cache"
+    mock_service_get_season.assert_called_once_with(1, 1, 1)
+
+
+SEASON_ETAGS = {
+    "/leagues/1/seasons/3": _season_etag(3, 7, "season"),
+    "/leagues/1/seasons/3/scores": _season_etag(3, 7, "scores", limit=None, offset=0),
+    "/leagues/1/seasons/3/leaders?stat=goal": _season_etag(3, 7, "leaders", stat={"goal": 1}, limit=None, offset=0),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("endpoint", list(SEASON_ETAGS))
+@pytest.mark.parametrize(
+    "if_none_match, status_code",
+    [
+        ('{etag}', 304),
+        ('W/{etag}', 304),
+        ('{old}, {etag}', 304),
+        ('*', 304),
+        ('{old}', 200),
+        (None, 200),
+    ]
+)
+@patch("api.leagues.service.get_leaders_in_season")
+@patch("api.leagues.service.get_scores_in_season")
+@patch("api.leagues.service.get_season")
+async def test_season_etag(mock_service_get_season, mock_service_get_scores, mock_service_get_leaders,
+                           mock_service_get_season_version, endpoint, if_none_match, status_code):
+    mock_service_get_season_version.return_value = 7
+    season = SeasonWithTopPlayersSchema(id=3, name='2024/2025', players=[])
+    mock_service_get_scores.return_value = mock_service_get_leaders.return_value = season
+    mock_service_get_season.return_value = SeasonRelSchema(
+        id=3,
+        name='2024/2025',
+        league=LeagueCountrySchema(id=1, name='APL', country=CountrySchema(id=1, name='country1')),
+        teams=[]
+    )
+    etag = SEASON_ETAGS[endpoint]
+    old = etag.replace("-v7-", "-v6-")
+    headers = {"If-None-Match": if_none_match.format(etag=etag, old=old)} if if_none_match is not None else {}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(endpoint, headers=headers)
+
+    assert response.status_code == status_code
+    assert response.headers["ETag"] == etag
+    mock_service_get_season_version.assert_called_once_with(1, 3)
+    data_calls = (mock_service_get_season.call_count + mock_service_get_scores.call_count
+                  + mock_service_get_leaders.call_count)
+    if status_code == 304:
+        assert response.content == b""
+        assert data_calls == 0
+    else:
+        assert data_calls == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "first, second, same",
+    [
+        ("/leagues/1/seasons/3/scores", "/leagues/1/seasons/3/scores?offset=0", True),
+        ("/leagues/1/seasons/3/leaders?stat=goal&stat=assist:2",
+         "/leagues/1/seasons/3/leaders?stat=assist&stat=goal&stat=assist", True),
+        ("/leagues/1/seasons/3", "/leagues/1/seasons/3/scores", False),
+        ("/leagues/1/seasons/3/scores", "/leagues/1/seasons/3/leaders?stat=goal", False),
+        ("/leagues/1/seasons/3/scores?limit=10", "/leagues/1/seasons/3/scores?limit=10&offset=10", False),
+        ("/leagues/1/seasons/3/leaders?stat=goal", "/leagues/1/seasons/3/leaders?stat=goal:2", False),
+    ]
+)
+@patch("api.leagues.service.get_leaders_in_season")
+@patch("api.leagues.service.get_scores_in_season")
+@patch("api.leagues.service.get_season")
+async def test_season_etag_per_representation(mock_service_get_season, mock_service_get_scores,
+                                              mock_service_get_leaders, first, second, same):
+    season = SeasonWithTopPlayersSchema(id=3, name='2024/2025', players=[])
+    mock_service_get_scores.return_value = mock_service_get_leaders.return_value = season
+    mock_service_get_season.return_value = SeasonRelSchema(
+        id=3,
+        name='2024/2025',
+        league=LeagueCountrySchema(id=1, name='APL', country=CountrySchema(id=1, name='country1')),
+        teams=[]
+    )
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        first_etag = (await client.get(first)).headers["ETag"]
+        second_etag = (await client.get(second)).headers["ETag"]
+
+    assert (first_etag == second_etag) is same
+
+
+@pytest.mark.asyncio
+@patch("api.leagues.service.get_season")
+async def test_season_etag_missing(mock_service_get_season, mock_service_get_season_version):
+    mock_service_get_season_version.side_effect = Missing("Season not found")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/leagues/1/seasons/999", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Season not found"}
+    mock_service_get_season.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -210,7 +333,7 @@ async def test_get_season_missing(mock_service_get_season, endpoint, service_arg
 
     assert response.status_code == 404
     assert response.json() == {"detail": "Season not found"}
-    mock_service_get_season.assert_called_once_with(*service_args)
+    mock_service_get_season.assert_called_once_with(*service_args, 1)
 
 
 @pytest.mark.asyncio
@@ -271,7 +394,7 @@ async def test_get_players_in_season(mock_service_get_players):
         response = await client.get("/leagues/1/seasons/1/players")
 
     assert response.json() == expected_response
-    mock_service_get_players.assert_called_once_with(1, 1)
+    mock_service_get_players.assert_called_once_with(1, 1, 1)
 
 
 @pytest.mark.asyncio
@@ -291,7 +414,7 @@ async def test_get_players_in_season_missing(mock_service_get_players, endpoint,
 
     assert response.status_code == 404
     assert response.json() == {"detail": "Season not found"}
-    mock_service_get_players.assert_called_once_with(*service_args)
+    mock_service_get_players.assert_called_once_with(*service_args, 1)
 
 
 @pytest.mark.asyncio
@@ -348,15 +471,66 @@ async def test_get_games_in_season(mock_service_get_games):
         response = await client.get("/leagues/1/seasons/1/games")
 
     assert response.json() == expected_response
-    mock_service_get_games.assert_called_once_with(1, 1)
+    assert "X-Next-Cursor" not in response.headers
+    assert "X-Total-Count" not in response.headers
+    mock_service_get_games.assert_called_once_with(1, 1, 1, 100, None)
+
+
+@pytest.mark.asyncio
+@patch("api.leagues.service.count_games_for_season")
+@patch("api.leagues.service.get_games_for_season")
+async def test_get_games_in_season_page(mock_service_get_games, mock_service_count):
+    mock_service_get_games.return_value = SeasonWithGamesSchema(
+        id=1,
+        name='2024/2025',
+        games=[
+            BaseGameSchema(
+                id=7,
+                game_date=datetime(2025, 3, 1),
+                home_team=BaseTeamSchema(id=1, name='team1'),
+                guest_team=BaseTeamSchema(id=2, name='team2'),
+                home_scored=0,
+                guest_scored=0
+            )
+        ]
+    )
+    mock_service_count.return_value = 12
+    cursor = encode_cursor(datetime(2025, 2, 1), 2)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(f"/leagues/1/seasons/1/games?limit=1&with_total=true&cursor={cursor}")
+
+    assert response.status_code == 200
+    assert decode_cursor(response.headers["X-Next-Cursor"], datetime, int) == (datetime(2025, 3, 1), 7)
+    assert response.headers["X-Total-Count"] == "12"
+    mock_service_get_games.assert_called_once_with(1, 1, 1, 1, (datetime(2025, 2, 1), 2))
+    mock_service_count.assert_called_once_with(1, 1, 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query, status_code",
+    [
+        ("?cursor=broken", 400),
+        ("?limit=0", 422),
+        ("?limit=501", 422),
+    ]
+)
+@patch("api.leagues.service.get_games_for_season")
+async def test_get_games_in_season_invalid_page(mock_service_get_games, query, status_code):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(f"/leagues/1/seasons/1/games{query}")
+
+    assert response.status_code == status_code
+    mock_service_get_games.assert_not_called()
 
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "endpoint, service_args",
     [
-        ("/leagues/1/seasons/999/games", (1, 999)),
-        ("/leagues/999/seasons/1/games", (999, 1)),
+        ("/leagues/1/seasons/999/games", (1, 999, 1, 100, None)),
+        ("/leagues/999/seasons/1/games", (999, 1, 1, 100, None)),
     ]
 )
 @patch("api.leagues.service.get_games_for_season")
@@ -402,7 +576,30 @@ async def test_get_scores_in_season(mock_service_get_scores):
         response = await client.get("/leagues/1/seasons/1/scores")
 
     assert response.json() == service_get_scores_return_value.model_dump()
-    mock_service_get_scores.assert_called_once_with(1, 1)
+    mock_service_get_scores.assert_called_once_with(1, 1, 1, None, 0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query, expected_status, service_args",
+    [
+        ("?limit=10&offset=20", 200, (1, 1, 1, 10, 20)),
+        ("?limit=0", 422, None),
+        ("?offset=-1", 422, None),
+    ]
+)
+@patch("api.leagues.service.get_scores_in_season")
+async def test_get_scores_in_season_paginated(mock_service_get_scores, query, expected_status, service_args):
+    mock_service_get_scores.return_value = SeasonWithTopPlayersSchema(id=1, name='2024/2025', players=[])
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(f"/leagues/1/seasons/1/scores{query}")
+
+    assert response.status_code == expected_status
+    if service_args is not None:
+        mock_service_get_scores.assert_called_once_with(*service_args)
+    else:
+        mock_service_get_scores.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -422,4 +619,64 @@ async def test_get_scores_in_season_missing(mock_service_get_scores, endpoint, s
 
     assert response.status_code == 404
     assert response.json() == {"detail": "Season not found"}
-    mock_service_get_scores.assert_called_once_with(*service_args)
+    mock_service_get_scores.assert_called_once_with(*service_args, 1, None, 0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query, service_args",
+    [
+        ("?stat=assist", (1, 1, 1, {EventType.assist: 1}, None, 0)),
+        ("?stat=goal&stat=assist:2&limit=10&offset=5",
+         (1, 1, 1, {EventType.goal: 1, EventType.assist: 2}, 10, 5)),
+        ("?stat=yellow_card:-1", (1, 1, 1, {EventType.yellow_card: -1}, None, 0)),
+    ]
+)
+@patch("api.leagues.service.get_leaders_in_season")
+async def test_get_leaders_in_season(mock_service_get_leaders, query, service_args):
+    service_return_value = SeasonWithTopPlayersSchema(
+        id=1,
+        name='2024/2025',
+        players=[
+            PlayerStatsSummarySchema(
+                id=1,
+                name='player1',
+                team=BaseTeamSchema(id=1, name='team1'),
+                games=10,
+                effective_actions=7
+            )
+        ]
+    )
+    mock_service_get_leaders.return_value = service_return_value
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(f"/leagues/1/seasons/1/leaders{query}")
+
+    assert response.json() == service_return_value.model_dump()
+    mock_service_get_leaders.assert_called_once_with(*service_args)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query",
+    ["", "?stat=dribble", "?stat=goal:x", "?stat=goal:0"]
+)
+@patch("api.leagues.service.get_leaders_in_season")
+async def test_get_leaders_in_season_invalid_stat(mock_service_get_leaders, query):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(f"/leagues/1/seasons/1/leaders{query}")
+
+    assert response.status_code == 422
+    mock_service_get_leaders.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("api.leagues.service.get_leaders_in_season")
+async def test_get_leaders_in_season_missing(mock_service_get_leaders):
+    mock_service_get_leaders.side_effect = Missing("Season not found")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/leagues/1/seasons/999/leaders?stat=goal")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Season not found"}
@@ -6,6 +6,7 @@ from httpx import AsyncClient, ASGITransport
 
 from errors import Missing
 from main import app
+from models.pydantic.batches import BatchErrorSchema, BatchSchema
 from models.pydantic.leagues import CountrySchema
 from models.pydantic.persons import PlayerDetailsSchema, PersonDetailsSchema
 from models.pydantic.teams import BaseTeamSchema
@@ -95,3 +96,39 @@ async def test_get_manager_missing(mock_service_get_manager):
     assert response.status_code == 404
     assert response.json() == {"detail": "Player not found"}
     mock_service_get_manager.assert_called_once_with(999)
+
+
+@pytest.mark.asyncio
+@patch("api.persons.service.get_players")
+async def test_get_players(mock_service_get_players):
+    mock_service_get_players.return_value = BatchSchema[PlayerDetailsSchema](
+        items=[PlayerDetailsSchema(
+            id=1,
+            name='player1',
+            full_name='full_player1',
+            birth_date=datetime(2000, 1, 1),
+            team_number=10,
+            country=CountrySchema(id=1, name='country1'),
+            team=BaseTeamSchema(id=1, name='team1')
+        )],
+        errors=[BatchErrorSchema(id=2, detail='Игрока с id 2 не существует')]
+    )
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/players/batch", params={"ids": "1,2,1"})
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [1]
+    assert response.json()["errors"] == [dict(id=2, detail='Игрока с id 2 не существует')]
+    mock_service_get_players.assert_called_once_with([1, 2])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ids", ["1,a", "", ",".join(str(x) for x in range(1000))])
+@patch("api.persons.service.get_managers")
+async def test_get_managers_invalid_ids(mock_service_get_managers, ids):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/managers/batch", params={"ids": ids})
+
+    assert response.status_code == 422
+    mock_service_get_managers.assert_not_called()
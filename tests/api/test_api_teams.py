@@ -1,5 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 from unittest.mock import patch
+from zoneinfo import ZoneInfo
 
 import pytest
 from httpx import AsyncClient, ASGITransport
@@ -21,6 +22,7 @@ from models.pydantic.teams import (
     TeamWithGamesSchema,
     BaseTeamSchema
 )
+from pagination import decode_cursor, encode_cursor
 
 
 @pytest.mark.asyncio
@@ -52,7 +54,51 @@ async def test_get_all_teams(mock_service_get_all, service_return):
         response = await client.get("/teams/")
 
     assert response.json() == [m.model_dump() for m in service_return]
-    mock_service_get_all.assert_called_once()
+    assert "X-Next-Cursor" not in response.headers
+    mock_service_get_all.assert_called_once_with(100, None)
+
+
+@pytest.mark.asyncio
+@patch("api.teams.service.count_teams")
+@patch("api.teams.service.get_all_teams")
+async def test_get_all_teams_page(mock_service_get_all, mock_service_count):
+    mock_service_get_all.return_value = [
+        TeamDetailsSchema(id=4, name='team4', founded='1910', manager=None),
+        TeamDetailsSchema(id=5, name='team5', founded='1911', manager=None),
+    ]
+    mock_service_count.return_value = 9
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(f"/teams/?limit=2&with_total=true&cursor={encode_cursor(3)}")
+
+    assert response.status_code == 200
+    assert decode_cursor(response.headers["X-Next-Cursor"], int) == (5,)
+    assert response.headers["X-Total-Count"] == "9"
+    mock_service_get_all.assert_called_once_with(2, (3,))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "endpoint, status_code",
+    [
+        ("/teams/?cursor=broken", 400),
+        ("/teams/?cursor=" + encode_cursor("x"), 400),
+        ("/teams/?limit=501", 422),
+        ("/teams/1/games?cursor=" + encode_cursor(1), 400),
+        ("/teams/1/games?limit=0", 422),
+        ("/teams/1/games?from=2025-02-01&to=2025-01-01", 422),
+        ("/teams/1/games?from=2025-01-01&tz=Mars/Olympus", 422),
+    ]
+)
+@patch("api.teams.service.get_games_for_team")
+@patch("api.teams.service.get_all_teams")
+async def test_teams_invalid_page(mock_service_get_all, mock_service_get_games, endpoint, status_code):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(endpoint)
+
+    assert response.status_code == status_code
+    mock_service_get_all.assert_not_called()
+    mock_service_get_games.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -148,7 +194,44 @@ async def test_get_games_for_team(mock_service_get_games):
         response = await client.get("/teams/1/games")
 
     assert response.json() == expected_response
-    mock_service_get_games.assert_called_once_with(1)
+    assert "X-Total-Count" not in response.headers
+    mock_service_get_games.assert_called_once_with(1, 100, None, None, None, None, ZoneInfo("UTC"))
+
+
+@pytest.mark.asyncio
+@patch("api.teams.service.count_games_for_team")
+@patch("api.teams.service.get_games_for_team")
+async def test_get_games_for_team_page(mock_service_get_games, mock_service_count):
+    mock_service_get_games.return_value = TeamWithGamesSchema(
+        id=1,
+        name='team1',
+        games=[
+            BaseGameSchema(
+                id=2,
+                game_date=datetime(2025, 2, 1),
+                home_team=BaseTeamSchema(id=3, name='team3'),
+                guest_team=BaseTeamSchema(id=1, name='team1'),
+                home_scored=2,
+                guest_scored=2
+            )
+        ]
+    )
+    mock_service_count.return_value = 40
+    cursor = encode_cursor(datetime(2025, 3, 1), 5)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(
+            f"/teams/1/games?season_id=3&from=2025-01-01&to=2025-03-01&tz=Europe/Moscow"
+            f"&limit=1&with_total=true&cursor={cursor}"
+        )
+
+    assert response.status_code == 200
+    assert decode_cursor(response.headers["X-Next-Cursor"], datetime, int) == (datetime(2025, 2, 1), 2)
+    assert response.headers["X-Total-Count"] == "40"
+    mock_service_get_games.assert_called_once_with(
+        1, 1, (datetime(2025, 3, 1), 5), 3, date(2025, 1, 1), date(2025, 3, 1), ZoneInfo("Europe/Moscow")
+    )
+    mock_service_count.assert_called_once_with(1, 3, date(2025, 1, 1), date(2025, 3, 1), ZoneInfo("Europe/Moscow"))
 
 
 @pytest.mark.asyncio
@@ -161,4 +244,4 @@ async def test_get_games_for_team_missing(mock_service_get_games):
 
     assert response.status_code == 404
     assert response.json() == {"detail": "Team not found"}
-    mock_service_get_games.assert_called_once_with(999)
+    mock_service_get_games.assert_called_once_with(999, 100, None, None, None, None, ZoneInfo("UTC"))
@@ -1,7 +1,10 @@
+from unittest.mock import patch
+
 import pytest
 import pytest_asyncio
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
+from cache import MemoryCache, get_cache, set_cache
 from models.db.base import Base
 
 
@@ -24,3 +27,19 @@ async def setup_database(engine):
         await conn.run_sync(Base.metadata.drop_all)
 
     await engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def live_notifications_session(session_factory):
+    """Уведомления об изменениях матчей отправляются через sqlite, где их нет"""
+    with patch("live.async_session", session_factory):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Каждый тест работает с пустым кэшем сервисов"""
+    previous = get_cache()
+    set_cache(MemoryCache())
+    yield
+    set_cache(previous)
@@ -1,4 +1,5 @@
 from datetime import datetime
+from unittest.mock import patch
 
 import pytest_asyncio
 from sqlalchemy import delete
@@ -14,6 +15,8 @@ from models.mongo_documents.games import (
     EventType,
     GameDocument, TeamEmbeddedObject
 )
+from models.mongo_documents.stats import PlayerSeasonStatsDocument
+from repositories.games import save_game_document
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -129,8 +132,10 @@ async def leagues_data(db_session, games_mongo_data):
 
 
 @pytest_asyncio.fixture(scope="function")
-async def games_mongo_data():
+async def games_mongo_data(db_session):
     await init_mongo_db()
+    versions_session = patch("repositories.versions.async_session", return_value=db_session)
+    versions_session.start()
 
     team1 = TeamEmbeddedObject(id=1, name="team1")
     team2 = TeamEmbeddedObject(id=2, name="team2")
@@ -173,11 +178,13 @@ async def games_mongo_data():
         guest_manager=manager1,
     )
 
-    await game1.insert()
-    await game2.insert()
+    await save_game_document(game1)
+    await save_game_document(game2)
 
     yield
 
     # Очистка после теста
     await GameDocument.find({"game_id": game1.game_id}).delete()
     await GameDocument.find({"game_id": game2.game_id}).delete()
+    await PlayerSeasonStatsDocument.find({"season_id": {"$in": [game1.season_id, game2.season_id]}}).delete()
+    versions_session.stop()
@@ -0,0 +1,89 @@
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+
+from models.db.games import Game
+from models.mongo_documents.games import (
+    EventEmbeddedObject,
+    EventType,
+    GameDocument,
+    PersonEmbeddedObject,
+    TeamEmbeddedObject
+)
+from models.pydantic.internal import ConsistencyIssueType
+from repositories.consistency import check_games_consistency
+
+
+@pytest_asyncio.fixture(scope="function")
+async def inconsistent_data(db_session, leagues_data):
+    db_session.add(Game(id=3, season_id=1, home_team_id=2, guest_team_id=1))
+    db_session.add(Game(id=5, season_id=1, home_team_id=2, guest_team_id=1))
+    await db_session.commit()
+    await GameDocument(game_id=4, season_id=1, league_id=1).insert()
+    scorer = PersonEmbeddedObject(id=3, name="person3", team=TeamEmbeddedObject(id=2, name="team2"))
+    await GameDocument(game_id=5, season_id=1, league_id=1, home_start_composition=[scorer],
+                       events=[EventEmbeddedObject(event_type=EventType.goal, minute="10", person=scorer)]).insert()
+    game = await GameDocument.find_one({"game_id": 2})
+    game.league_id = 3
+    await game.save()
+
+    with patch("repositories.consistency.async_session", return_value=db_session), \
+            patch("repositories.standings.async_session", return_value=db_session):
+        yield
+
+    await GameDocument.find({"game_id": {"$in": [4, 5]}}).delete()
+
+
+async def collect_issues(**kwargs) -> list[tuple]:
+    return [
+        (issue.game_id, issue.issue, issue.repaired)
+        async for issue in check_games_consistency(**kwargs)
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batch_size", [1, 2, 1000])
+async def test_check_games_consistency(batch_size, inconsistent_data):
+    assert await collect_issues(batch_size=batch_size) == [
+        (1, ConsistencyIssueType.score_mismatch, False),
+        (2, ConsistencyIssueType.season_mismatch, False),
+        (2, ConsistencyIssueType.score_mismatch, False),
+        (3, ConsistencyIssueType.missing_document, False),
+        (4, ConsistencyIssueType.orphan_document, False),
+        (5, ConsistencyIssueType.score_mismatch, False),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_check_games_consistency_repair(db_session, inconsistent_data):
+    assert await collect_issues(batch_size=2, repair=True) == [
+        (1, ConsistencyIssueType.score_mismatch, False),
+        (2, ConsistencyIssueType.season_mismatch, True),
+        (2, ConsistencyIssueType.score_mismatch, False),
+        (3, ConsistencyIssueType.missing_document, False),
+        (4, ConsistencyIssueType.orphan_document, True),
+        (5, ConsistencyIssueType.score_mismatch, True),
+    ]
+
+    game = await db_session.get(Game, 1)
+    assert (game.home_scored, game.guest_scored) == (2, 1)
+    game = await db_session.get(Game, 5)
+    assert (game.home_scored, game.guest_scored) == (1, 0)
+    assert (await GameDocument.find_one({"game_id": 2})).league_id == 2
+    assert await GameDocument.find_one({"game_id": 4}) is None
+
+    assert await collect_issues() == [
+        (1, ConsistencyIssueType.score_mismatch, False),
+        (2, ConsistencyIssueType.score_mismatch, False),
+        (3, ConsistencyIssueType.missing_document, False),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_check_games_consistency_repair_scores(db_session, inconsistent_data):
+    issues = await collect_issues(repair=True, repair_scores=True)
+
+    assert (1, ConsistencyIssueType.score_mismatch, True) in issues
+    game = await db_session.get(Game, 1)
+    assert (game.home_scored, game.guest_scored) == (2, 2)
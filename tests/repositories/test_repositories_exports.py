@@ -0,0 +1,70 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+
+from models.pydantic.internal import ExportDataset
+from repositories.exports import EXPORT_COLUMNS, iter_export_rows
+
+
+@pytest_asyncio.fixture(scope="function")
+async def export_session(db_session, leagues_data):
+    with patch("repositories.exports.async_session", return_value=db_session):
+        yield
+
+
+async def collect_rows(dataset: ExportDataset, **kwargs) -> list[dict]:
+    return [dict(zip(EXPORT_COLUMNS[dataset], row)) async for row in iter_export_rows(dataset, **kwargs)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batch_size", [1, 1000])
+async def test_export_games(batch_size, export_session):
+    rows = await collect_rows(ExportDataset.games, batch_size=batch_size)
+
+    assert rows == [
+        dict(game_id=1, season_id=1, league_id=1, game_date=datetime(2025, 1, 1),
+             home_team_id=1, home_team="team1", guest_team_id=2, guest_team="team2",
+             home_scored=2, guest_scored=1),
+        dict(game_id=2, season_id=3, league_id=2, game_date=datetime(2025, 2, 1),
+             home_team_id=3, home_team="team3", guest_team_id=1, guest_team="team1",
+             home_scored=2, guest_scored=2),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_games_for_season(export_session):
+    assert [row["game_id"] for row in await collect_rows(ExportDataset.games, season_id=3)] == [2]
+    assert await collect_rows(ExportDataset.games, season_id=100) == []
+
+
+@pytest.mark.asyncio
+async def test_export_standings(export_session):
+    rows = await collect_rows(ExportDataset.standings)
+
+    assert [(row["season_id"], row["position"], row["team_id"]) for row in rows] == [
+        (1, 1, 1), (1, 2, 2), (3, 1, 3), (3, 5, 1)
+    ]
+    assert rows[0] == dict(season_id=1, league_id=1, position=1, team_id=1, team="team1", games=1, wins=1,
+                           draws=0, loses=0, scored_goals=2, conceded_goals=1, points=3)
+
+
+@pytest.mark.asyncio
+async def test_export_player_stats(export_session):
+    rows = await collect_rows(ExportDataset.player_stats, season_id=1, batch_size=1)
+
+    assert [(row["player_id"], row["team"], row["appearances"], row["goals"]) for row in rows] == [
+        (1, "team1", 1, 1), (2, "team1", 1, 1), (3, "team2", 1, 2)
+    ]
+    assert rows[0]["yellow_cards"] == rows[0]["red_cards"] == 1
+
+
+@pytest.mark.asyncio
+async def test_export_events(export_session):
+    rows = await collect_rows(ExportDataset.events)
+
+    assert len(rows) == 8
+    assert rows[0] == dict(game_id=1, season_id=1, league_id=1, minute="23", event_type="goal",
+                           person_id=1, person="person1", team_id=1, team="team1")
+    assert await collect_rows(ExportDataset.events, season_id=3) == []
@@ -1,13 +1,26 @@
+import json
 from contextlib import nullcontext as not_raise
 from datetime import datetime
 from unittest.mock import patch
 
 import pytest
+import pytest_asyncio
+from sqlalchemy import select
 
 from errors import Missing
+from models.db.games import Game
+from models.db.leagues import Season
+from models.db.teams import SeasonTeam
+from models.mongo_documents.games import EventEmbeddedObject, EventType, GameDocument
+from models.mongo_documents.stats import PlayerSeasonStatsDocument
+from models.pydantic.games import GameIngestSchema
 from repositories.games import (
     get_game,
-    get_games_for_date
+    get_games,
+    get_game_score,
+    get_games_for_period,
+    save_game_document,
+    save_games
 )
 
 
@@ -92,11 +105,28 @@ async def test_get_game(mock_session, game_id, expected_game, expectation, db_se
             (x['event_type'], x['minute']) for x in expected_game["game_events"]]
 
 
+@pytest.mark.asyncio
+@patch("repositories.games.async_session")
+async def test_get_game_without_document(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+    await GameDocument.find({"game_id": 2}).delete()
+
+    result = await get_game(2)
+
+    assert (result.id, result.home_scored, result.guest_scored) == (2, 2, 2)
+    assert dict(result.season) == dict(id=3, name='season3')
+    assert result.home_team_composition == []
+    assert result.guest_team_composition == []
+    assert result.home_manager is None
+    assert result.guest_manager is None
+    assert result.game_events == []
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    "date, expected_games",
+    "start, end, expected_games",
     [
-        (datetime(2025, 1, 1),
+        (datetime(2025, 1, 1), datetime(2025, 1, 2),
          [
              dict(
                  id=1,
@@ -110,15 +140,16 @@ async def test_get_game(mock_session, game_id, expected_game, expectation, db_se
              )
          ]),
 
-        (datetime(2020, 1, 1), []),
+        (datetime(2020, 1, 1), datetime(2020, 1, 2), []),
     ]
 )
 @patch("repositories.games.async_session")
-async def test_get_games_for_date(mock_session, date, expected_games, db_session, leagues_data):
+async def test_get_games_for_period(mock_session, start, end, expected_games, db_session, leagues_data):
     mock_session.return_value = db_session
 
-    result = await get_games_for_date(date)
+    result = await get_games_for_period(start, end, 100)
 
+    assert len(result) == len(expected_games)
     for idx in range(len(result)):
         assert result[idx].id == expected_games[idx]['id']
         assert dict(result[idx].season) == dict(expected_games[idx]['season'])
@@ -128,3 +159,200 @@ async def test_get_games_for_date(mock_session, date, expected_games, db_session
         assert dict(result[idx].guest_team) == dict(expected_games[idx]['guest_team'])
         assert result[idx].home_scored == expected_games[idx]['home_scored']
         assert result[idx].guest_scored == expected_games[idx]['guest_scored']
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "start, end, limit, after, expected_ids",
+    [
+        (datetime(2024, 12, 31, 22), datetime(2025, 1, 1), 100, None, []),
+        (datetime(2024, 12, 31, 22), datetime(2025, 1, 1, 0, 1), 100, None, [1]),
+        (datetime(2025, 1, 1), datetime(2025, 3, 1), 100, None, [1, 2]),
+        (datetime(2025, 1, 1), datetime(2025, 3, 1), 1, None, [1]),
+        (datetime(2025, 1, 1), datetime(2025, 3, 1), 1, (datetime(2025, 1, 1), 1), [2]),
+        (datetime(2025, 1, 1), datetime(2025, 3, 1), 1, (datetime(2025, 2, 1), 2), []),
+    ]
+)
+@patch("repositories.games.async_session")
+async def test_get_games_for_period_range_and_keyset(mock_session, start, end, limit, after, expected_ids,
+                                                     db_session, leagues_data):
+    mock_session.return_value = db_session
+
+    result = await get_games_for_period(start, end, limit, after)
+
+    assert [x.id for x in result] == expected_ids
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "game_id, delete_document, expected_score, expectation",
+    [
+        (1, False, (2, 2), not_raise()),
+        (2, False, (0, 0), not_raise()),
+        (2, True, (2, 2), not_raise()),
+        (10, False, None, pytest.raises(Missing)),
+    ]
+)
+@patch("repositories.games.async_session")
+async def test_get_game_score(mock_session, game_id, delete_document, expected_score, expectation,
+                              db_session, leagues_data):
+    mock_session.return_value = db_session
+    if delete_document:
+        await GameDocument.find({"game_id": game_id}).delete()
+
+    with expectation:
+        result = await get_game_score(game_id)
+
+        assert (result.home_scored, result.guest_scored) == expected_score
+
+
+@pytest.mark.asyncio
+async def test_save_game_document_notifies_changes(games_mongo_data):
+    game = await GameDocument.find_one({"game_id": 2})
+    game.events.append(EventEmbeddedObject(event_type=EventType.goal, minute="12",
+                                           person=game.home_start_composition[0]))
+
+    with patch("repositories.games.send_game_notifications") as mock_send:
+        await save_game_document(game)
+        await save_game_document(game)
+
+    mock_send.assert_awaited_once()
+    [payload] = mock_send.await_args.args[0]
+    assert json.loads(payload) == dict(game_id=2, refresh_score=False, messages=[
+        ["game_event", dict(event_type="goal", minute="12", person=dict(id=4, name="person4"))],
+        ["score", dict(home_scored=1, guest_scored=0)],
+    ])
+
+
+@pytest_asyncio.fixture(scope="function")
+async def ingest_sessions(db_session, leagues_data):
+    with patch("repositories.games.async_session", return_value=db_session), \
+            patch("repositories.standings.async_session", return_value=db_session):
+        yield
+    await GameDocument.find({"game_id": 3}).delete()
+
+
+def make_ingest_games() -> list[GameIngestSchema]:
+    team1 = dict(id=1, name="team1")
+    team2 = dict(id=2, name="team2")
+    player1 = dict(id=1, name="person1", team=team1)
+    player3 = dict(id=3, name="person3", team=team2)
+    return [
+        GameIngestSchema(
+            id=1, season_id=1, game_date=datetime(2025, 1, 1), home_team_id=1, guest_team_id=2,
+            home_scored=1, guest_scored=1,
+            home_start_composition=[player1], guest_start_composition=[player3],
+            events=[dict(event_type="goal", minute="10", person=player1),
+                    dict(event_type="goal", minute="80", person=player3)]
+        ),
+        GameIngestSchema(
+            id=3, season_id=1, game_date=datetime(2025, 3, 1), home_team_id=2, guest_team_id=1,
+            home_scored=0, guest_scored=2,
+            home_start_composition=[player3], guest_start_composition=[player1],
+            events=[dict(event_type="goal", minute="5", person=player1),
+                     dict(event_type="own_goal", minute="50", person=player3)]
+        ),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_save_games(db_session, ingest_sessions):
+    result = await save_games(make_ingest_games())
+
+    assert (result.created, result.updated, result.season_ids) == ([3], [1], [1])
+
+    rows = await db_session.execute(
+        select(Game.id, Game.home_team_id, Game.home_scored, Game.guest_scored).filter(Game.season_id == 1)
+    )
+    assert sorted(rows.all()) == [(1, 1, 1, 1), (3, 2, 0, 2)]
+
+    document = await GameDocument.find_one({"game_id": 3})
+    assert (document.league_id, [x.id for x in document.home_start_composition]) == (1, [3])
+    assert [(x.event_type, x.person.id) for x in document.events] == [
+        (EventType.goal, 1), (EventType.own_goal, 3)]
+    assert await GameDocument.find({"game_id": 1}).count() == 1
+
+    stats = await PlayerSeasonStatsDocument.find_one({"season_id": 1, "player_id": 1})
+    assert (stats.appearances, stats.goals) == (2, 2)
+
+    standings = await db_session.execute(
+        select(SeasonTeam.team_id, SeasonTeam.position, SeasonTeam.points).filter(SeasonTeam.season_id == 1)
+    )
+    assert sorted(standings.all()) == [(1, 1, 4), (2, 2, 1)]
+
+
+@pytest.mark.asyncio
+async def test_save_games_is_idempotent(db_session, ingest_sessions):
+    await save_games(make_ingest_games())
+    stats = await PlayerSeasonStatsDocument.find({"season_id": 1}).to_list()
+
+    result = await save_games(make_ingest_games())
+
+    assert (result.created, result.updated) == ([], [1, 3])
+    assert await GameDocument.find({"game_id": {"$in": [1, 3]}}).count() == 2
+    assert await PlayerSeasonStatsDocument.find({"season_id": 1}).to_list() == stats
+
+
+@pytest.mark.asyncio
+async def test_save_games_retry_after_failure(db_session, ingest_sessions):
+    """Сбой после записи матчей и документов, но до пересчета статистики - повтор ее исправляет"""
+    version_query = select(Season.version).filter(Season.id == 1)
+    version = (await db_session.execute(version_query)).scalar_one()
+    with patch("repositories.games.write_player_season_stats", side_effect=RuntimeError):
+        with pytest.raises(RuntimeError):
+            await save_games(make_ingest_games())
+    assert (await db_session.execute(version_query)).scalar_one() == version + 1
+
+    with patch("repositories.games.invalidate_seasons") as mock_invalidate_seasons:
+        await save_games(make_ingest_games())
+
+    stats = await PlayerSeasonStatsDocument.find_one({"season_id": 1, "player_id": 1})
+    assert (stats.appearances, stats.goals) == (2, 2)
+    mock_invalidate_seasons.assert_called_once_with([1])
+
+
+@pytest.mark.asyncio
+async def test_save_games_moves_game_between_seasons(db_session, ingest_sessions):
+    game = GameIngestSchema(id=2, season_id=1, home_team_id=3, guest_team_id=1, home_scored=2, guest_scored=2)
+
+    result = await save_games([game])
+
+    assert result.season_ids == [1, 3]
+    standings = await db_session.execute(
+        select(SeasonTeam.season_id, SeasonTeam.team_id, SeasonTeam.games).filter(SeasonTeam.season_id.in_([1, 3]))
+    )
+    assert sorted(standings.all()) == [(1, 1, 2), (1, 2, 1), (1, 3, 1), (3, 1, 0), (3, 3, 0)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "changes",
+    [
+        dict(season_id=10),
+        dict(guest_team_id=10),
+    ]
+)
+async def test_save_games_missing(changes, db_session, ingest_sessions):
+    games = make_ingest_games()
+    games[1] = games[1].model_copy(update=changes)
+
+    with pytest.raises(Missing):
+        await save_games(games)
+
+    assert await db_session.get(Game, 3) is None
+    assert await GameDocument.find_one({"game_id": 3}) is None
+
+
+@pytest.mark.asyncio
+@patch("repositories.games.async_session")
+async def test_get_games(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+    db_session.add(Game(id=3, game_date=datetime(2025, 3, 1), season_id=1, home_team_id=2, guest_team_id=1,
+                        home_scored=0, guest_scored=0))
+    await db_session.commit()
+
+    result = await get_games([2, 5, 3, 1])
+
+    assert result.items == [await get_game(2), await get_game(3), await get_game(1)]
+    assert result.items[1].game_events == []
+    assert [(x.id, x.detail) for x in result.errors] == [(5, "матча с id - 5 не найдено")]
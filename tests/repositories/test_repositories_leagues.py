@@ -5,14 +5,21 @@ from contextlib import nullcontext as not_raise
 import pytest
 
 from errors import Missing
+from models.db.games import Game
+from models.db.persons import Person
+from models.mongo_documents.games import EventType, TeamEmbeddedObject
+from models.mongo_documents.stats import PlayerSeasonStatsDocument
 from repositories.leagues import (
     get_all_leagues,
     get_one_league,
     get_seasons,
     get_season,
+    get_base_season,
     get_players_in_season,
     get_scores_in_season,
-    get_games_for_season
+    get_leaders_in_season,
+    get_games_for_season,
+    count_games_for_season
 )
 
 
@@ -134,6 +141,27 @@ async def test_get_season(mock_session, league_id, season_id, expected_season, e
         assert country.name == expected_country[1]
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "league_id, season_id, expected_season, expectation",
+    [
+        (1, 1, (1, 'season1', 1, True), not_raise()),
+        (2, 4, (4, 'season4', 2, False), not_raise()),
+        (6, 6, None, pytest.raises(Missing)),
+        (2, 1, None, pytest.raises(Missing)),
+    ]
+)
+@patch("repositories.leagues.async_session")
+async def test_get_base_season(mock_session, league_id, season_id, expected_season, expectation,
+                               db_session, leagues_data):
+    mock_session.return_value = db_session
+
+    with expectation:
+        result = await get_base_season(league_id, season_id)
+
+        assert (result.id, result.name, result.league_id, result.is_current_season) == expected_season
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "league_id, season_id, expected_players, expectation",
@@ -163,6 +191,19 @@ async def test_get_players_in_season(mock_session, league_id, season_id, expecte
                 for p in players] == expected_players
 
 
+@pytest.mark.asyncio
+@patch("repositories.leagues.async_session")
+async def test_get_players_in_season_without_country(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+    person = await db_session.get(Person, 2)
+    person.country_id = None
+    await db_session.commit()
+
+    result = await get_players_in_season(1, 1)
+
+    assert [(p.id, p.country and p.country.id) for p in result.players] == [(1, 1), (2, None), (3, 2)]
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "league_id, season_id, expected_result, expectation",
@@ -203,6 +244,33 @@ async def test_get_games_for_season(mock_session, league_id, season_id, expected
             assert result.games[idx].guest_scored == expected_result['games'][idx]['guest_scored']
 
 
+@pytest.mark.asyncio
+@patch("repositories.leagues.async_session")
+async def test_get_games_for_season_keyset(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+    db_session.add_all([
+        Game(id=10, game_date=datetime(2025, 1, 1), season_id=1, home_team_id=2, guest_team_id=1,
+             home_scored=1, guest_scored=1),
+        Game(id=11, game_date=None, season_id=1, home_team_id=1, guest_team_id=2,
+             home_scored=0, guest_scored=0),
+        Game(id=12, game_date=datetime(2024, 12, 1), season_id=1, home_team_id=1, guest_team_id=2,
+             home_scored=0, guest_scored=0),
+    ])
+    await db_session.commit()
+
+    pages, after = [], None
+    while True:
+        result = await get_games_for_season(1, 1, 2, after)
+        pages.append([x.id for x in result.games])
+        if len(result.games) < 2:
+            break
+        after = (result.games[-1].game_date, result.games[-1].id)
+
+    assert pages == [[12, 1], [10, 11], []]
+    assert await count_games_for_season(1, 1) == 4
+    assert await count_games_for_season(2, 1) == 0
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "league_id, season_id, expected_result, expectation",
@@ -255,3 +323,73 @@ async def test_get_scores_in_season(mock_session, league_id, season_id, expected
         for idx in range(len(result.players)):
             assert result.players[idx].id == expected_result['players'][idx]['id']
             assert result.players[idx].name == expected_result['players'][idx]['name']
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "limit, offset, expected_players",
+    [
+        (None, 0, [(3, 1, 2), (1, 1, 1), (2, 1, 1)]),
+        (1, 0, [(3, 1, 2)]),
+        (2, 1, [(1, 1, 1), (2, 1, 1)]),
+        (None, 3, []),
+    ]
+)
+@patch("repositories.leagues.async_session")
+async def test_get_scores_in_season_paginated(mock_session, limit, offset, expected_players,
+                                              db_session, leagues_data):
+    mock_session.return_value = db_session
+
+    result = await get_scores_in_season(1, 1, limit, offset)
+
+    assert [(p.id, p.games, p.effective_actions) for p in result.players] == expected_players
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "league_id, season_id, weights, limit, expected_players, expectation",
+    [
+        (1, 1, {EventType.assist: 1}, None, [(1, 1), (2, 0), (3, 0)], not_raise()),
+
+        (1, 1, {EventType.goal: 1, EventType.assist: 2}, None, [(1, 3), (3, 2), (2, 1)], not_raise()),
+
+        (1, 1, {EventType.yellow_card: -1}, 2, [(2, 0), (3, 0)], not_raise()),
+
+        (1, 1, {EventType.unrealized_penalty_goal: 1}, 1, [(3, 1)], not_raise()),
+
+        (1, 2, {EventType.red_card: 1}, None, [], not_raise()),
+
+        (1, 15, {EventType.goal: 1}, None, None, pytest.raises(Missing)),
+    ]
+)
+@patch("repositories.leagues.async_session")
+async def test_get_leaders_in_season(mock_session, league_id, season_id, weights, limit, expected_players,
+                                     expectation, db_session, leagues_data):
+    mock_session.return_value = db_session
+
+    with expectation:
+        result = await get_leaders_in_season(league_id, season_id, weights, limit)
+
+        assert [(p.id, p.effective_actions) for p in result.players] == expected_players
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "weights, expected_players",
+    [
+        ({EventType.yellow_card: -1}, [(2, 0), (3, 0), (1, -1)]),
+        ({EventType.goal: 1}, [(3, 2), (1, 1), (2, 1)]),
+    ]
+)
+@patch("repositories.leagues.async_session")
+async def test_get_leaders_in_season_skips_players_without_appearances(mock_session, weights, expected_players,
+                                                                       db_session, leagues_data):
+    """Статистика игрока, убранного из состава исправлением матча, остается с нулем матчей"""
+    mock_session.return_value = db_session
+    await PlayerSeasonStatsDocument(
+        season_id=1, league_id=1, player_id=99, name='removed', team=TeamEmbeddedObject(id=1, name='team1')
+    ).insert()
+
+    result = await get_leaders_in_season(1, 1, weights)
+
+    assert [(p.id, p.effective_actions) for p in result.players] == expected_players
@@ -5,7 +5,7 @@ from contextlib import nullcontext as not_raise
 import pytest
 
 from errors import Missing
-from repositories.persons import get_player, get_manager
+from repositories.persons import get_player, get_players, get_manager, get_managers
 
 
 @pytest.mark.asyncio
@@ -71,3 +71,27 @@ async def test_get_manager(mock_session, db_session, manager_id, expected_manage
             assert (team.id, team.name) == expected_team
         else:
             assert team is None
+
+
+@pytest.mark.asyncio
+@patch("repositories.persons.async_session")
+async def test_get_players(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+
+    result = await get_players([3, 10, 1, 5])
+
+    assert result.items == [await get_player(3), await get_player(1), await get_player(5)]
+    assert [(x.id, x.detail) for x in result.errors] == [(10, "игрок с id - 10 не найден")]
+
+
+@pytest.mark.asyncio
+@patch("repositories.persons.async_session")
+async def test_get_managers(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+
+    result = await get_managers([11, 3, 1, 12])
+
+    assert result.items == [await get_manager(3), await get_manager(1)]
+    assert [(x.id, x.detail) for x in result.errors] == [
+        (11, "тренер с id - 11 не найден"), (12, "тренер с id - 12 не найден")
+    ]
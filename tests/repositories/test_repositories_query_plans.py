@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, insert, text
+
+from models.db.games import Game
+from models.db.leagues import Season
+from models.db.persons import Manager, Person, Player
+from models.db.teams import SeasonTeam, Team
+from repositories import consistency, exports, games, leagues, persons, standings, teams, versions
+
+
+LARGE_TABLES = {"games", "seasons", "seasons_teams", "persons", "players", "managers"}
+# частичные индексы содержат только малую часть строк таблицы, их полный обход допустим
+PARTIAL_INDEXES = {"ix_seasons_league_id_current"}
+
+REPOSITORY_QUERIES = [
+    (leagues.get_all_leagues, ()),
+    (leagues.get_one_league, (1,)),
+    (leagues.get_seasons, (1,)),
+    (leagues.get_season, (1, 1)),
+    (leagues.get_players_in_season, (1, 1)),
+    (leagues.get_games_for_season, (1, 1)),
+    (leagues.get_games_for_season, (1, 1, 100, (datetime(2000, 3, 1), 500))),
+    (leagues.get_games_for_season, (1, 1, 100, (None, 500))),
+    (leagues.count_games_for_season, (1, 1)),
+    (leagues.get_base_season, (1, 1)),
+    (teams.get_all_teams, ()),
+    (teams.get_one_team, (1,)),
+    (teams.get_all_teams, (100, (50,))),
+    (teams.get_games_for_team, (1,)),
+    (teams.get_games_for_team, (1, 100, (datetime(2000, 3, 1), 500))),
+    (teams.get_games_for_team, (1, 100, None, 110, datetime(2000, 1, 1), datetime(2000, 6, 1))),
+    (teams.count_games_for_team, (1,)),
+    (teams.count_games_for_team, (1, 110)),
+    (persons.get_player, (1,)),
+    (persons.get_manager, (1,)),
+    (persons.get_players, ([1, 2, 3],)),
+    (persons.get_managers, ([1, 2, 3],)),
+    (teams.get_teams, ([1, 2, 3],)),
+    (games._get_games_from_postgresql, ([1, 2, 3],)),
+    (games._get_game_from_postgresql, (1,)),
+    (versions.get_season_version, (1, 1)),
+    (versions.get_current_seasons_version, ()),
+    (versions.get_league_seasons_version, (1,)),
+    (standings.record_game_result, (1, 2, 1)),
+    (standings.rebuild_season_standings, (1,)),
+    (consistency._get_games_batch, (1000, 100)),
+    (exports.get_games_batch, (1000, 100)),
+    (exports.get_season_games_batch, (100, 1000, 2000, 100)),
+    (games.get_games_for_period, (datetime(2025, 1, 1), datetime(2025, 1, 8), 100)),
+    (games.get_games_for_period, (datetime(2025, 1, 1), datetime(2025, 1, 8), 100, (datetime(2025, 1, 2), 5))),
+]
+
+
+@pytest_asyncio.fixture(scope="function")
+async def large_leagues_data(db_session, leagues_data):
+    """Дополняет тестовые данные большим архивом сезонов, команд, игроков и матчей"""
+    seasons_count, teams_count, players_per_team = 40, 60, 5
+
+    await db_session.execute(insert(Season), [
+        dict(id=100 + s, name=f'archive{s}', league_id=1 + s % 3, is_current_season=False)
+        for s in range(seasons_count)
+    ])
+    await db_session.execute(insert(Team), [
+        dict(id=100 + t, name=f'archive{t}', country_id=1, founded="1950")
+        for t in range(teams_count)
+    ])
+    await db_session.execute(insert(SeasonTeam), [
+        dict(season_id=100 + s, team_id=100 + t, position=t + 1)
+        for s in range(seasons_count) for t in range(20)
+    ])
+    await db_session.execute(insert(Person), [
+        dict(id=100 + p, name=f'archive{p}', full_name=f'archive{p}',
+             birth_date=datetime(1990, 1, 1), country_id=1)
+        for p in range(teams_count * players_per_team)
+    ])
+    await db_session.execute(insert(Player), [
+        dict(id=100 + p, person_id=100 + p, team_id=100 + p // players_per_team)
+        for p in range(teams_count * players_per_team)
+    ])
+    await db_session.execute(insert(Person), [
+        dict(id=1000 + t, name=f'manager{t}', full_name=f'manager{t}',
+             birth_date=datetime(1970, 1, 1), country_id=1)
+        for t in range(teams_count)
+    ])
+    await db_session.execute(insert(Manager), [
+        dict(id=100 + t, person_id=1000 + t, team_id=100 + t)
+        for t in range(teams_count)
+    ])
+    await db_session.execute(insert(Game), [
+        dict(id=100 + g, game_date=datetime(2000, 1, 1) + timedelta(days=g // 10),
+             season_id=100 + g % seasons_count, home_team_id=100 + g % teams_count,
+             guest_team_id=100 + (g + 1) % teams_count, home_scored=1, guest_scored=0)
+        for g in range(4000)
+    ])
+    await db_session.commit()
+    await db_session.execute(text("ANALYZE"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "repository_function, args",
+    REPOSITORY_QUERIES,
+    ids=[f"{f.__module__}.{f.__name__}{args}" for f, args in REPOSITORY_QUERIES]
+)
+async def test_repository_queries_do_not_scan_large_tables(repository_function, args, db_session,
+                                                           large_leagues_data):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        with patch(f"{repository_function.__module__}.async_session") as mock_session:
+            mock_session.return_value = db_session
+            await repository_function(*args)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    assert statements
+
+    connection = await db_session.connection()
+    for statement, parameters in statements:
+        plan = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        details = [row[3] for row in plan]
+
+        sequential_scans = [
+            detail for detail in details
+            if detail.startswith("SCAN ") and detail.split()[1] in LARGE_TABLES
+            and not any(detail.endswith(f"USING INDEX {index}") for index in PARTIAL_INDEXES)
+        ]
+        assert sequential_scans == [], f"{statement}\n{details}"
@@ -0,0 +1,132 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pyarrow.dataset as ds
+import pytest
+import pytest_asyncio
+
+from models.db.games import Game
+from models.mongo_documents.games import GameDocument
+from models.pydantic.internal import SnapshotFormat
+from repositories.snapshots import flatten_events, write_snapshot
+from repositories.versions import touch_seasons
+
+
+@pytest_asyncio.fixture(scope="function")
+async def snapshot_session(db_session, leagues_data):
+    with patch("repositories.exports.async_session", return_value=db_session):
+        yield
+
+
+def read_dataset(path, file_format: SnapshotFormat = SnapshotFormat.parquet) -> list[dict]:
+    dataset = ds.dataset(path, format="ipc" if file_format == SnapshotFormat.arrow else "parquet",
+                         partitioning="hive")
+    return sorted(dataset.to_table().to_pylist(), key=lambda x: tuple(x.values()))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("file_format", list(SnapshotFormat))
+@pytest.mark.parametrize("batch_size", [1, 1000])
+async def test_write_snapshot(tmp_path, snapshot_session, file_format, batch_size):
+    result = await write_snapshot(tmp_path, file_format, batch_size)
+
+    assert result.model_dump() == dict(games=2, events=8, standings=4, last_game_id=2, rewritten_seasons=0)
+    assert (tmp_path / "games" / "league_id=2" / "season_id=3").is_dir()
+
+    games = read_dataset(tmp_path / "games", file_format)
+    assert games[0] == dict(game_id=1, game_date=datetime(2025, 1, 1), home_team_id=1, home_team="team1",
+                            guest_team_id=2, guest_team="team2", home_scored=2, guest_scored=1,
+                            league_id=1, season_id=1)
+    assert [x["game_id"] for x in games] == [1, 2]
+
+    events = read_dataset(tmp_path / "events", file_format)
+    assert len(events) == 8
+    assert {x["game_id"] for x in events} == {1}
+
+    standings = read_dataset(tmp_path / "standings", file_format)
+    assert sorted((x["season_id"], x["position"], x["team_id"], x["points"]) for x in standings) == [
+        (1, 1, 1, 3), (1, 2, 2, 0), (3, 1, 3, 1), (3, 5, 1, 1)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_write_snapshot_incremental(tmp_path, db_session, snapshot_session):
+    await write_snapshot(tmp_path)
+
+    db_session.add(Game(id=3, game_date=datetime(2025, 3, 1), season_id=1, home_team_id=2,
+                        guest_team_id=1, home_scored=0, guest_scored=0))
+    await db_session.commit()
+
+    result = await write_snapshot(tmp_path)
+    assert result.model_dump() == dict(games=1, events=0, standings=4, last_game_id=3, rewritten_seasons=0)
+    assert [x["game_id"] for x in read_dataset(tmp_path / "games")] == [1, 2, 3]
+    assert len(read_dataset(tmp_path / "standings")) == 4
+
+    result = await write_snapshot(tmp_path)
+    assert result.games == 0
+    assert [x["game_id"] for x in read_dataset(tmp_path / "games")] == [1, 2, 3]
+
+    result = await write_snapshot(tmp_path, full=True)
+    assert result.games == 3
+    assert [x["game_id"] for x in read_dataset(tmp_path / "games")] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_write_snapshot_rewrites_changed_seasons(tmp_path, db_session, snapshot_session):
+    db_session.add(Game(id=5, game_date=datetime(2025, 3, 1), season_id=3, home_team_id=3,
+                        guest_team_id=1, home_scored=None, guest_scored=None))
+    await db_session.commit()
+    await write_snapshot(tmp_path)
+
+    game = await db_session.get(Game, 5)
+    game.home_scored, game.guest_scored = 1, 0
+    db_session.add(Game(id=4, game_date=datetime(2025, 3, 2), season_id=3, home_team_id=1,
+                        guest_team_id=3, home_scored=2, guest_scored=2))
+    await db_session.commit()
+    document = await GameDocument.find_one(GameDocument.game_id == 1)
+    document.events = document.events[:1]
+    await document.save()
+    await touch_seasons([1, 3])
+
+    result = await write_snapshot(tmp_path)
+
+    assert result.model_dump() == dict(games=4, events=1, standings=4, last_game_id=5, rewritten_seasons=2)
+    games = read_dataset(tmp_path / "games")
+    assert [(x["game_id"], x["home_scored"], x["guest_scored"]) for x in games] == [
+        (1, 2, 1), (2, 2, 2), (4, 2, 2), (5, 1, 0)
+    ]
+    assert len(read_dataset(tmp_path / "events")) == 1
+
+    result = await write_snapshot(tmp_path)
+    assert (result.games, result.rewritten_seasons) == (0, 0)
+    assert len(read_dataset(tmp_path / "games")) == 4
+
+
+@pytest.mark.asyncio
+async def test_write_snapshot_format_mismatch(tmp_path, snapshot_session):
+    await write_snapshot(tmp_path, SnapshotFormat.parquet)
+
+    with pytest.raises(ValueError):
+        await write_snapshot(tmp_path, SnapshotFormat.arrow)
+
+
+def test_flatten_events():
+    person = {"id": 1, "name": "person1", "team": {"id": 2, "name": "team2"}}
+    documents = [
+        {"game_id": 1, "season_id": 1, "league_id": 1,
+         "events": [{"event_type": "goal", "minute": "10", "person": person},
+                    {"event_type": "assist", "minute": "10", "person": person}]},
+        {"game_id": 2, "season_id": 1, "league_id": 1, "events": []},
+        {"game_id": 3, "season_id": 2, "league_id": 1},
+        {"game_id": 4, "season_id": 2, "league_id": 1,
+         "events": [{"event_type": "red_card", "minute": "90+2", "person": person}]},
+    ]
+
+    table = flatten_events(documents)
+
+    assert table.column("game_id").to_pylist() == [1, 1, 4]
+    assert table.column("season_id").to_pylist() == [1, 1, 2]
+    assert table.column("event_type").to_pylist() == ["goal", "assist", "red_card"]
+    assert table.to_pylist()[2] == dict(game_id=4, season_id=2, league_id=1, minute="90+2", event_type="red_card",
+                                        person_id=1, person="person1", team_id=2, team="team2")
+    assert flatten_events([]).num_rows == 0
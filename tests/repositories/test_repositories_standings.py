@@ -0,0 +1,230 @@
+from contextlib import nullcontext as not_raise
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from sqlalchemy import select, update
+
+from config import Config
+from errors import Missing
+from live import game_notification
+from models.db.games import Game
+from models.db.leagues import Season
+from models.db.teams import SeasonTeam
+from repositories.standings import (
+    compute_standings,
+    rank_standings,
+    rebuild_season_standings,
+    record_game_result,
+    result_deltas
+)
+
+
+async def get_standings(db_session, season_id: int) -> list[tuple]:
+    result = await db_session.execute(
+        select(
+            SeasonTeam.position, SeasonTeam.team_id, SeasonTeam.games, SeasonTeam.wins,
+            SeasonTeam.draws, SeasonTeam.loses, SeasonTeam.scored_goals,
+            SeasonTeam.conceded_goals, SeasonTeam.points
+        ).filter(
+            SeasonTeam.season_id == season_id
+        ).order_by(
+            SeasonTeam.position
+        )
+    )
+    return [tuple(row) for row in result]
+
+
+async def get_version(db_session, season_id: int) -> int:
+    result = await db_session.execute(select(Season.version).filter(Season.id == season_id))
+    return result.scalar_one()
+
+
+@pytest.mark.parametrize(
+    "home_scored, guest_scored, expected_home, expected_guest",
+    [
+        (2, 1, dict(games=1, wins=1, scored_goals=2, conceded_goals=1, points=3),
+         dict(games=1, loses=1, scored_goals=1, conceded_goals=2)),
+        (0, 3, dict(games=1, loses=1, conceded_goals=3),
+         dict(games=1, wins=1, scored_goals=3, points=3)),
+        (1, 1, dict(games=1, draws=1, scored_goals=1, conceded_goals=1, points=1),
+         dict(games=1, draws=1, scored_goals=1, conceded_goals=1, points=1)),
+    ]
+)
+def test_result_deltas(home_scored, guest_scored, expected_home, expected_guest):
+    home, guest = result_deltas(home_scored, guest_scored)
+
+    assert +home == expected_home
+    assert +guest == expected_guest
+
+
+HEAD_TO_HEAD_RESULTS = [
+    # season_id, home_team_id, guest_team_id, home_scored, guest_scored
+    (1, 1, 2, 0, 1),
+    (1, 1, 3, 5, 0),
+    (1, 2, 4, 0, 1),
+    (1, 3, 4, 0, 0),
+    (2, 6, 7, 2, 0),
+]
+
+
+@pytest.mark.parametrize(
+    "tiebreakers, expected_order",
+    [
+        (("goal_difference", "scored"), [4, 1, 2, 3, 6, 5, 7]),
+        ((), [4, 1, 2, 3, 6, 5, 7]),
+        (("head_to_head",), [4, 2, 1, 3, 6, 5, 7]),
+        (("head_to_head", "goal_difference"), [4, 2, 1, 3, 6, 5, 7]),
+        (("scored", "head_to_head"), [4, 1, 2, 3, 6, 5, 7]),
+    ]
+)
+def test_compute_standings(tiebreakers, expected_order):
+    standings = compute_standings([(2, 5), (1, 1)], HEAD_TO_HEAD_RESULTS, tiebreakers)
+
+    rows = sorted(zip(*(standings[x].tolist() for x in ("season_id", "position", "team_id"))))
+    assert [team_id for _, _, team_id in rows] == expected_order
+    assert [position for _, position, _ in rows] == [1, 2, 3, 4, 1, 2, 3]
+
+    totals = {
+        team_id: tuple(standings[field][i] for field in ("games", "wins", "draws", "loses",
+                                                        "scored_goals", "conceded_goals", "points"))
+        for i, team_id in enumerate(standings["team_id"].tolist())
+    }
+    assert totals[1] == (2, 1, 0, 1, 5, 1, 3)
+    assert totals[4] == (2, 1, 1, 0, 1, 0, 4)
+    assert totals[5] == (0, 0, 0, 0, 0, 0, 0)
+
+
+def test_compute_standings_unknown_tiebreaker():
+    with pytest.raises(ValueError):
+        compute_standings([(1, 1)], [], ("points_per_game",))
+
+
+def test_rank_standings_head_to_head_requires_games():
+    values = np.zeros(2, dtype=np.int64)
+
+    with pytest.raises(ValueError):
+        rank_standings(values, values, values, values, values, ("head_to_head",))
+
+
+@pytest.mark.asyncio
+@patch("repositories.standings.async_session")
+async def test_record_game_result_replaces_previous_result(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+    version = await get_version(db_session, 1)
+
+    await record_game_result(1, 0, 3)
+
+    game = await db_session.get(Game, 1)
+    assert (game.home_scored, game.guest_scored) == (0, 3)
+    assert await get_standings(db_session, 1) == [
+        (1, 2, 1, 1, 0, 0, 3, 0, 3),
+        (2, 1, 1, 0, 0, 1, 0, 3, 0),
+    ]
+    assert await get_version(db_session, 1) == version + 1
+
+
+@pytest.mark.asyncio
+@patch("repositories.standings.notify_game_changes")
+@patch("repositories.standings.async_session")
+async def test_record_game_result_notifies_score_change(mock_session, mock_notify, db_session, leagues_data):
+    mock_session.return_value = db_session
+
+    await record_game_result(1, 0, 3)
+
+    mock_notify.assert_awaited_once_with(db_session, [game_notification(1, refresh_score=True)])
+
+
+@pytest.mark.asyncio
+@patch("repositories.standings.invalidate_seasons", side_effect=RuntimeError)
+@patch("repositories.standings.async_session")
+async def test_season_version_is_committed_with_standings(mock_session, mock_invalidate,
+                                                          db_session, leagues_data):
+    """Сбой после фиксации, до очистки кэша - версия уже изменена вместе с данными"""
+    mock_session.return_value = db_session
+    version = await get_version(db_session, 1)
+
+    with pytest.raises(RuntimeError):
+        await record_game_result(1, 0, 3)
+    with pytest.raises(RuntimeError):
+        await rebuild_season_standings(1)
+
+    game = await db_session.get(Game, 1)
+    assert (game.home_scored, game.guest_scored) == (0, 3)
+    assert await get_version(db_session, 1) == version + 2
+
+@pytest.mark.asyncio
+@patch("repositories.standings.async_session")
+async def test_record_game_result_for_new_game(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+    db_session.add(Game(id=3, season_id=1, home_team_id=2, guest_team_id=3))
+    await db_session.commit()
+
+    await record_game_result(3, 1, 1)
+
+    assert await get_standings(db_session, 1) == [
+        (1, 1, 1, 1, 0, 0, 2, 1, 3),
+        (2, 3, 1, 0, 1, 0, 1, 1, 1),
+        (3, 2, 2, 0, 1, 1, 2, 3, 1),
+    ]
+
+
+@pytest.mark.asyncio
+@patch("repositories.standings.async_session")
+async def test_record_game_result_head_to_head(mock_session, db_session, leagues_data, monkeypatch):
+    mock_session.return_value = db_session
+    monkeypatch.setattr(Config, "STANDINGS_TIEBREAKERS", ("head_to_head",))
+    db_session.add(Game(id=3, season_id=1, home_team_id=1, guest_team_id=3))
+    await db_session.commit()
+
+    await record_game_result(3, 5, 0)
+    await record_game_result(1, 0, 1)
+
+    assert [row[:2] for row in await get_standings(db_session, 1)] == [(1, 2), (2, 1), (3, 3)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "game_id, home_scored, guest_scored, expectation",
+    [
+        (10, 1, 0, pytest.raises(Missing)),
+        (1, -1, 0, pytest.raises(ValueError)),
+        (1, 2, 1, not_raise()),
+    ]
+)
+@patch("repositories.standings.async_session")
+async def test_record_game_result_errors(mock_session, game_id, home_scored, guest_scored, expectation,
+                                         db_session, leagues_data):
+    mock_session.return_value = db_session
+    standings = await get_standings(db_session, 1)
+
+    with expectation:
+        await record_game_result(game_id, home_scored, guest_scored)
+
+    assert await get_standings(db_session, 1) == standings
+
+
+@pytest.mark.asyncio
+@patch("repositories.standings.async_session")
+async def test_rebuild_season_standings(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+    expected = {
+        1: await get_standings(db_session, 1),
+        3: [
+            (1, 1, 1, 0, 1, 0, 2, 2, 1),
+            (2, 3, 1, 0, 1, 0, 2, 2, 1),
+        ],
+    }
+    await db_session.execute(update(SeasonTeam).values(position=0, games=5, wins=5, points=15))
+    db_session.add(SeasonTeam(season_id=1, team_id=3, position=0, games=1, points=3))
+    await db_session.commit()
+
+    assert await rebuild_season_standings(1) == [1]
+    assert await get_standings(db_session, 1) == [
+        expected[1][0],
+        (2, 3, 0, 0, 0, 0, 0, 0, 0),
+        (3,) + expected[1][1][1:],
+    ]
+
+    assert await rebuild_season_standings() == [1, 3]
+    assert await get_standings(db_session, 3) == expected[3]
@@ -0,0 +1,120 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from cache import get_cache
+
+from models.mongo_documents.games import (
+    EventEmbeddedObject,
+    EventType,
+    GameDocument
+)
+from models.mongo_documents.stats import PlayerSeasonStatsDocument
+from repositories import games
+from repositories.games import save_game_document
+from repositories.stats import (
+    count_player_stats,
+    rebuild_player_season_stats
+)
+
+
+async def _season_stats(season_id: int) -> dict[int, tuple]:
+    stats = await PlayerSeasonStatsDocument.find({"season_id": season_id}).to_list()
+    return {
+        s.player_id: (s.team.id, s.appearances, s.goals, s.assists, s.yellow_cards, s.red_cards)
+        for s in stats
+    }
+
+
+@pytest.mark.asyncio
+async def test_count_player_stats(games_mongo_data):
+    game = await GameDocument.find_one({"game_id": 1})
+
+    result = count_player_stats(game)
+
+    assert {player_id: dict(counter) for player_id, (_, counter) in result.items()} == {
+        1: dict(appearances=1, goals=1, assists=1, yellow_cards=1, red_cards=1),
+        2: dict(appearances=1, goals=1),
+        3: dict(appearances=1, goals=2, unrealized_penalty_goals=1),
+    }
+
+
+@pytest.mark.asyncio
+async def test_save_game_document_updates_stats(games_mongo_data):
+    assert await _season_stats(1) == {
+        1: (1, 1, 1, 1, 1, 1),
+        2: (1, 1, 1, 0, 0, 0),
+        3: (2, 1, 2, 0, 0, 0),
+    }
+
+    game = await GameDocument.find_one({"game_id": 1})
+    game.events = [e for e in game.events if e.person.id != 3]
+    game.events.append(EventEmbeddedObject(
+        event_type=EventType.assist, minute="88", person=game.home_start_composition[1]
+    ))
+    await save_game_document(game)
+
+    assert await GameDocument.find({"game_id": 1}).count() == 1
+    assert await _season_stats(1) == {
+        1: (1, 1, 1, 1, 1, 1),
+        2: (1, 1, 1, 1, 0, 0),
+        3: (2, 1, 0, 0, 0, 0),
+    }
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_of_one_game_count_stats_once(games_mongo_data):
+    """Оба сохранения читают одну и ту же старую версию, проигравшее перечитывает документ"""
+    read_document = games._get_raw_game_document
+
+    async def read_and_yield(game_id):
+        document = await read_document(game_id)
+        await asyncio.sleep(0)
+        return document
+
+    first = await GameDocument.find_one({"game_id": 1})
+    first.events = first.events[:2]
+    second = await GameDocument.find_one({"game_id": 1})
+    second.events.append(EventEmbeddedObject(
+        event_type=EventType.goal, minute="89", person=second.home_start_composition[1]
+    ))
+
+    # в тестах обе задачи получили бы одну сессию postgresql
+    with patch("repositories.games._get_raw_game_document", side_effect=read_and_yield) as mock_read, \
+            patch("repositories.stats.touch_seasons"):
+        await asyncio.gather(save_game_document(first), save_game_document(second))
+
+    assert mock_read.call_count == 3
+    expected = await _season_stats(1)
+    await rebuild_player_season_stats(1)
+    assert await _season_stats(1) == expected
+
+
+@pytest.mark.asyncio
+async def test_rebuild_player_season_stats(games_mongo_data):
+    incremental = {season_id: await _season_stats(season_id) for season_id in (1, 3)}
+    await PlayerSeasonStatsDocument.find({"season_id": 1}).update({"$inc": {"goals": 10}})
+
+    assert await rebuild_player_season_stats(1) == [1]
+    assert await _season_stats(1) == incremental[1]
+
+    assert await rebuild_player_season_stats() == [1, 3]
+    assert {season_id: await _season_stats(season_id) for season_id in (1, 3)} == incremental
+
+
+@pytest.mark.asyncio
+async def test_stats_changes_invalidate_season_cache(games_mongo_data):
+    cache = get_cache()
+    await cache.set("seasons:1:league:1:scores:None:0", "stale")
+    await cache.set("seasons:3:league:2:scores:None:0", "stale")
+
+    game = await GameDocument.find_one({"game_id": 1})
+    await save_game_document(game)
+
+    assert await cache.get("seasons:1:league:1:scores:None:0") == (False, None)
+    assert await cache.get("seasons:3:league:2:scores:None:0") == (True, "stale")
+
+    await rebuild_player_season_stats(3)
+
+    assert await cache.get("seasons:3:league:2:scores:None:0") == (False, None)
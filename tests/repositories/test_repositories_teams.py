@@ -5,10 +5,14 @@ from contextlib import nullcontext as not_raise
 import pytest
 
 from errors import Missing
+from models.db.games import Game
 from repositories.teams import (
     get_all_teams,
+    count_teams,
     get_one_team,
-    get_games_for_team
+    get_teams,
+    get_games_for_team,
+    count_games_for_team
 )
 
 
@@ -31,6 +35,25 @@ async def test_get_all_teams(mock_session, db_session, leagues_data):
     assert result[2].manager is None
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "limit, after, expected_ids",
+    [
+        (2, None, [1, 2]),
+        (2, (2,), [3]),
+        (2, (3,), []),
+    ]
+)
+@patch("repositories.teams.async_session")
+async def test_get_all_teams_keyset(mock_session, limit, after, expected_ids, db_session, leagues_data):
+    mock_session.return_value = db_session
+
+    result = await get_all_teams(limit, after)
+
+    assert [x.id for x in result] == expected_ids
+    assert await count_teams() == 3
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "team_id, expected_team, expected_manager, expected_country, expected_seasons, expected_players, expectation",
@@ -119,3 +142,64 @@ async def test_get_games_for_team(mock_session, team_id, expected_result,
             assert result.games[idx].home_scored == expected_result['games'][idx]['home_scored']
             assert result.games[idx].guest_scored == expected_result['games'][idx]['guest_scored']
 
+
+
+@pytest.mark.asyncio
+@patch("repositories.teams.async_session")
+async def test_get_games_for_team_keyset(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+    db_session.add_all([
+        Game(id=10, game_date=datetime(2025, 2, 1), season_id=1, home_team_id=1, guest_team_id=3,
+             home_scored=0, guest_scored=0),
+        Game(id=11, game_date=None, season_id=1, home_team_id=2, guest_team_id=1,
+             home_scored=0, guest_scored=0),
+        Game(id=12, game_date=None, season_id=1, home_team_id=1, guest_team_id=2,
+             home_scored=0, guest_scored=0),
+    ])
+    await db_session.commit()
+
+    pages, after = [], None
+    while True:
+        result = await get_games_for_team(1, 2, after)
+        pages.append([x.id for x in result.games])
+        if len(result.games) < 2:
+            break
+        after = (result.games[-1].game_date, result.games[-1].id)
+
+    assert pages == [[10, 2], [1, 12], [11]]
+    assert await count_games_for_team(1) == 5
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "season_id, start, end, expected_ids",
+    [
+        (None, None, None, [2, 1]),
+        (1, None, None, [1]),
+        (3, None, None, [2]),
+        (None, datetime(2025, 1, 2), None, [2]),
+        (None, None, datetime(2025, 2, 1), [1]),
+        (1, datetime(2025, 1, 2), None, []),
+    ]
+)
+@patch("repositories.teams.async_session")
+async def test_get_games_for_team_filters(mock_session, season_id, start, end, expected_ids,
+                                          db_session, leagues_data):
+    mock_session.return_value = db_session
+
+    result = await get_games_for_team(1, 100, None, season_id, start, end)
+
+    assert [x.id for x in result.games] == expected_ids
+    assert await count_games_for_team(1, season_id, start, end) == len(expected_ids)
+
+
+@pytest.mark.asyncio
+@patch("repositories.teams.async_session")
+async def test_get_teams(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+
+    result = await get_teams([3, 10, 1, 2])
+
+    assert result.items == [await get_one_team(3), await get_one_team(1), await get_one_team(2)]
+    assert [len(x.players) for x in result.items] == [1, 2, 1]
+    assert [(x.id, x.detail) for x in result.errors] == [(10, "команда с id - 10 не найдена")]
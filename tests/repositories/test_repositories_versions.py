@@ -0,0 +1,65 @@
+from unittest.mock import patch
+from contextlib import nullcontext as not_raise
+
+import pytest
+
+from cache import get_cache
+from errors import Missing
+from repositories.versions import (
+    get_current_seasons_version,
+    get_league_seasons_version,
+    get_season_version,
+    touch_seasons
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "league_id, season_id, expectation",
+    [
+        (1, 1, not_raise()),
+        (2, 3, not_raise()),
+        (2, 1, pytest.raises(Missing)),
+        (1, 15, pytest.raises(Missing)),
+    ]
+)
+@patch("repositories.versions.async_session")
+async def test_get_season_version(mock_session, league_id, season_id, expectation, db_session, leagues_data):
+    mock_session.return_value = db_session
+
+    with expectation:
+        assert await get_season_version(league_id, season_id) == 0
+
+
+@pytest.mark.asyncio
+@patch("repositories.versions.async_session")
+async def test_touch_seasons(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+    cache = get_cache()
+    await cache.set("seasons:1:league:1:season", "stale")
+    await cache.set("seasons:2:league:1:season", "fresh")
+
+    await touch_seasons([1, 3, 1])
+    await touch_seasons(iter([3]))
+    await touch_seasons([])
+
+    assert [await get_season_version(1, s) for s in (1, 2)] == [1, 0]
+    assert await get_season_version(2, 3) == 2
+    assert await cache.get("seasons:1:league:1:season") == (False, None)
+    assert await cache.get("seasons:2:league:1:season") == (True, "fresh")
+
+
+@pytest.mark.asyncio
+@patch("repositories.versions.async_session")
+async def test_seasons_versions_follow_season_changes(mock_session, db_session, leagues_data):
+    mock_session.return_value = db_session
+
+    assert await get_current_seasons_version() == "3.9.0"
+    assert await get_league_seasons_version(1) == "2.3.0"
+    assert await get_league_seasons_version(15) == "0.0.0"
+
+    await touch_seasons([1])
+
+    assert await get_current_seasons_version() == "3.9.1"
+    assert await get_league_seasons_version(1) == "2.3.1"
+    assert await get_league_seasons_version(2) == "2.7.0"
@@ -0,0 +1,26 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from models.pydantic.internal import ExportDataset, ExportFormat
+from services.exports import export_dataset
+
+
+async def rows():
+    yield 1, 1, 1, datetime(2025, 1, 1), 1, "team1", 2, "team2", 2, 1
+
+
+@pytest.mark.asyncio
+@patch("services.exports.data.iter_export_rows")
+async def test_export_dataset(mock_repo_iter_export_rows):
+    mock_repo_iter_export_rows.return_value = rows()
+
+    result = [chunk async for chunk in export_dataset(ExportDataset.games, ExportFormat.csv, 1)]
+
+    assert result == [
+        "game_id,season_id,league_id,game_date,home_team_id,home_team,guest_team_id,guest_team,"
+        "home_scored,guest_scored\n",
+        "1,1,1,2025-01-01T00:00:00,1,team1,2,team2,2,1\n",
+    ]
+    mock_repo_iter_export_rows.assert_called_once_with(ExportDataset.games, 1)
@@ -1,12 +1,16 @@
-from datetime import datetime
+from datetime import date, datetime
 from unittest.mock import patch, Mock
+from zoneinfo import ZoneInfo
 
 import pytest
 
 from services.games import (
     get_game,
-    get_games_for_date
+    get_games_for_period,
+    save_games,
+    watch_game_notifications
 )
+from repositories.games import get_game_score
 
 
 @pytest.mark.asyncio
@@ -22,12 +26,47 @@ async def test_get_game(mock_repo_get_game):
 
 
 @pytest.mark.asyncio
-@patch("services.games.data.get_games_for_date")
-async def test_get_games_for_date(mock_repo_get_games):
+@patch("services.games.data.save_games")
+async def test_save_games(mock_repo_save_games):
+    repo_return = Mock()
+    mock_repo_save_games.return_value = repo_return
+    games = [Mock()]
+
+    result = await save_games(games)
+
+    assert result == repo_return
+    mock_repo_save_games.assert_called_once_with(games)
+
+
+@pytest.mark.asyncio
+@patch("services.games.live.watch_game_notifications")
+async def test_watch_game_notifications(mock_live_watch):
+    await watch_game_notifications()
+
+    mock_live_watch.assert_awaited_once_with(get_game_score)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "date_from, date_to, tz, after, expected_start, expected_end",
+    [
+        (date(2025, 1, 1), date(2025, 1, 1), "UTC", None,
+         datetime(2025, 1, 1), datetime(2025, 1, 2)),
+
+        (date(2025, 1, 1), date(2025, 1, 7), "Europe/Moscow", (datetime(2025, 1, 3), 7),
+         datetime(2024, 12, 31, 21), datetime(2025, 1, 7, 21)),
+
+        (date(2025, 3, 29), date(2025, 3, 30), "Europe/London", None,
+         datetime(2025, 3, 29), datetime(2025, 3, 30, 23)),
+    ]
+)
+@patch("services.games.data.get_games_for_period")
+async def test_get_games_for_period(mock_repo_get_games, date_from, date_to, tz, after,
+                                    expected_start, expected_end):
     repo_return = [Mock(), Mock()]
     mock_repo_get_games.return_value = repo_return
 
-    result = await get_games_for_date(datetime(2025, 1, 1))
+    result = await get_games_for_period(date_from, date_to, ZoneInfo(tz), 50, after)
 
     assert result == repo_return
-    mock_repo_get_games.assert_called_once_with(datetime(2025, 1, 1))
+    mock_repo_get_games.assert_called_once_with(expected_start, expected_end, 50, after)
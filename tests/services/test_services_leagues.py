@@ -2,13 +2,20 @@ from unittest.mock import patch, Mock
 
 import pytest
 
+from cache import invalidate_season
 from services.leagues import (
     get_all_leagues,
     get_one_league,
     get_seasons,
     get_season,
-    get_players_in_season, get_scores_in_season, get_games_for_season
+    get_players_in_season, get_scores_in_season, get_games_for_season,
+    count_games_for_season,
+    get_season_version,
+    get_leagues_version,
+    get_league_seasons_version,
+    get_leaders_in_season
 )
+from models.mongo_documents.games import EventType
 
 
 @pytest.mark.asyncio
@@ -17,7 +24,7 @@ async def test_get_all_leagues(mock_repo_get_all):
     repo_return = [Mock(), Mock()]
     mock_repo_get_all.return_value = repo_return
 
-    result = await get_all_leagues()
+    result = await get_all_leagues("2.3.0")
 
     assert result == repo_return
     mock_repo_get_all.assert_called_once()
@@ -41,7 +48,7 @@ async def test_get_seasons(mock_repo_get_seasons):
     repo_return = [Mock(), Mock()]
     mock_repo_get_seasons.return_value = repo_return
 
-    result = await get_seasons(1)
+    result = await get_seasons(1, "1.1.0")
 
     assert result == repo_return
     mock_repo_get_seasons.assert_called_once_with(1)
@@ -53,7 +60,7 @@ async def test_get_season(mock_repo_get_season):
     repo_return = Mock()
     mock_repo_get_season.return_value = repo_return
 
-    result = await get_season(1, 2)
+    result = await get_season(1, 2, 0)
 
     assert result == repo_return
     mock_repo_get_season.assert_called_once_with(1, 2)
@@ -65,7 +72,7 @@ async def test_get_players_in_season(mock_repo_get_players):
     repo_return = Mock()
     mock_repo_get_players.return_value = repo_return
 
-    result = await get_players_in_season(1, 2)
+    result = await get_players_in_season(1, 2, 0)
 
     assert result == repo_return
     mock_repo_get_players.assert_called_once_with(1, 2)
@@ -77,10 +84,21 @@ async def test_get_games_for_season(mock_repo_get_games):
     repo_return = Mock()
     mock_repo_get_games.return_value = repo_return
 
-    result = await get_games_for_season(1, 2)
+    result = await get_games_for_season(1, 2, 0, 50, (None, 3))
 
     assert result == repo_return
-    mock_repo_get_games.assert_called_once_with(1, 2)
+    mock_repo_get_games.assert_called_once_with(1, 2, 50, (None, 3))
+
+
+@pytest.mark.asyncio
+@patch("services.leagues.data.count_games_for_season")
+async def test_count_games_for_season(mock_repo_count):
+    mock_repo_count.return_value = 5
+
+    result = await count_games_for_season(1, 2, 0)
+
+    assert result == 5
+    mock_repo_count.assert_called_once_with(1, 2)
 
 
 @pytest.mark.asyncio
@@ -89,7 +107,107 @@ async def test_get_scores_in_season(mock_repo_get_scores):
     repo_return = Mock()
     mock_repo_get_scores.return_value = repo_return
 
-    result = await get_scores_in_season(1, 2)
+    result = await get_scores_in_season(1, 2, 0)
+
+    assert result == repo_return
+    mock_repo_get_scores.assert_called_once_with(1, 2, None, 0)
+
+
+@pytest.mark.asyncio
+@patch("services.leagues.data.get_scores_in_season")
+async def test_get_scores_in_season_paginated(mock_repo_get_scores):
+    repo_return = Mock()
+    mock_repo_get_scores.return_value = repo_return
+
+    result = await get_scores_in_season(1, 2, 0, 10, 20)
 
     assert result == repo_return
-    mock_repo_get_scores.assert_called_once_with(1, 2)
+    mock_repo_get_scores.assert_called_once_with(1, 2, 10, 20)
+
+
+@pytest.mark.asyncio
+@patch("services.leagues.data.get_leaders_in_season")
+async def test_get_leaders_in_season(mock_repo_get_leaders):
+    repo_return = Mock()
+    mock_repo_get_leaders.return_value = repo_return
+
+    result = await get_leaders_in_season(1, 2, 0, {EventType.assist: 1}, 10, 0)
+
+    assert result == repo_return
+    mock_repo_get_leaders.assert_called_once_with(1, 2, {EventType.assist: 1}, 10, 0)
+
+
+@pytest.mark.asyncio
+@patch("services.leagues.data.get_season")
+async def test_get_season_is_cached_until_season_changes(mock_repo_get_season):
+    mock_repo_get_season.side_effect = [Mock(), Mock()]
+
+    first = await get_season(1, 2, 0)
+    assert await get_season(1, 2, 0) is first
+    mock_repo_get_season.assert_called_once_with(1, 2)
+
+    await invalidate_season(2)
+
+    assert await get_season(1, 2, 0) is not first
+    assert mock_repo_get_season.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("services.leagues.data.get_scores_in_season")
+@patch("services.leagues.data.get_season")
+async def test_new_season_version_is_not_served_from_cache(mock_repo_get_season, mock_repo_get_scores):
+    """Сезон изменился, а кэш другого процесса не очищен - новая версия все равно выгружается заново"""
+    mock_repo_get_season.side_effect = [Mock(), Mock()]
+    mock_repo_get_scores.side_effect = [Mock(), Mock()]
+
+    season = await get_season(1, 2, 0)
+    scores = await get_scores_in_season(1, 2, 0)
+
+    assert await get_season(1, 2, 1) is not season
+    assert await get_scores_in_season(1, 2, 1) is not scores
+    assert mock_repo_get_season.call_count == mock_repo_get_scores.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("services.leagues.data.get_games_for_season")
+@patch("services.leagues.data.get_seasons")
+@patch("services.leagues.data.get_all_leagues")
+async def test_season_lists_are_cached_by_version(mock_repo_get_all, mock_repo_get_seasons, mock_repo_get_games):
+    """Списки лиг, сезонов и матчей сезона выгружаются заново при новой версии без очистки кэша"""
+    mock_repo_get_all.side_effect = [Mock(), Mock()]
+    mock_repo_get_seasons.side_effect = [Mock(), Mock()]
+    mock_repo_get_games.side_effect = [Mock(), Mock()]
+
+    leagues = await get_all_leagues("2.3.0")
+    seasons = await get_seasons(1, "1.1.0")
+    games = await get_games_for_season(1, 2, 0)
+
+    assert await get_all_leagues("2.3.0") is leagues
+    assert await get_all_leagues("2.3.1") is not leagues
+    assert await get_seasons(1, "1.1.0") is seasons
+    assert await get_seasons(1, "1.1.1") is not seasons
+    assert await get_games_for_season(1, 2, 0) is games
+    assert await get_games_for_season(1, 2, 1) is not games
+
+
+@pytest.mark.asyncio
+@patch("services.leagues.versions.get_season_version")
+async def test_get_season_version(mock_repo_get_version):
+    mock_repo_get_version.return_value = 4
+
+    result = await get_season_version(1, 2)
+
+    assert result == 4
+    mock_repo_get_version.assert_called_once_with(1, 2)
+
+
+@pytest.mark.asyncio
+@patch("services.leagues.versions.get_league_seasons_version")
+@patch("services.leagues.versions.get_current_seasons_version")
+async def test_get_seasons_versions(mock_repo_get_current_version, mock_repo_get_league_version):
+    mock_repo_get_current_version.return_value = "2.3.0"
+    mock_repo_get_league_version.return_value = "1.1.0"
+
+    assert await get_leagues_version() == "2.3.0"
+    assert await get_league_seasons_version(1) == "1.1.0"
+    mock_repo_get_league_version.assert_called_once_with(1)
@@ -2,7 +2,7 @@ from unittest.mock import patch, Mock
 
 import pytest
 
-from services.persons import get_manager, get_player
+from services.persons import get_manager, get_managers, get_player, get_players
 
 
 @pytest.mark.asyncio
@@ -27,3 +27,27 @@ async def test_get_manager(mock_repo_get_manager):
 
     assert result == repo_return
     mock_repo_get_manager.assert_called_once_with(1)
+
+
+@pytest.mark.asyncio
+@patch("services.persons.data.get_players")
+async def test_get_players(mock_repo_get_players):
+    repo_return = Mock()
+    mock_repo_get_players.return_value = repo_return
+
+    result = await get_players([1, 2])
+
+    assert result == repo_return
+    mock_repo_get_players.assert_called_once_with([1, 2])
+
+
+@pytest.mark.asyncio
+@patch("services.persons.data.get_managers")
+async def test_get_managers(mock_repo_get_managers):
+    repo_return = Mock()
+    mock_repo_get_managers.return_value = repo_return
+
+    result = await get_managers([1, 2])
+
+    assert result == repo_return
+    mock_repo_get_managers.assert_called_once_with([1, 2])
@@ -1,11 +1,15 @@
+from datetime import date, datetime
 from unittest.mock import patch, Mock
+from zoneinfo import ZoneInfo
 
 import pytest
 
 from services.teams import (
     get_all_teams,
     get_one_team,
-    get_games_for_team
+    get_games_for_team,
+    count_teams,
+    count_games_for_team
 )
 
 
@@ -15,10 +19,21 @@ async def test_get_all_teams(mock_repo_get_all):
     repo_return = [Mock(), Mock()]
     mock_repo_get_all.return_value = repo_return
 
-    result = await get_all_teams()
+    result = await get_all_teams(10, (3,))
 
     assert result == repo_return
-    mock_repo_get_all.assert_called_once()
+    mock_repo_get_all.assert_called_once_with(10, (3,))
+
+
+@pytest.mark.asyncio
+@patch("services.teams.data.count_teams")
+async def test_count_teams(mock_repo_count):
+    mock_repo_count.return_value = 3
+
+    result = await count_teams()
+
+    assert result == 3
+    mock_repo_count.assert_called_once_with()
 
 
 @pytest.mark.asyncio
@@ -42,4 +57,40 @@ async def test_get_games_for_team(mock_repo_get_one):
     result = await get_games_for_team(1)
 
     assert result == repo_return
-    mock_repo_get_one.assert_called_once_with(1)
+    mock_repo_get_one.assert_called_once_with(1, 100, None, None, None, None)
+
+
+@pytest.mark.asyncio
+@patch("services.teams.data.get_games_for_team")
+async def test_get_games_for_team_filters(mock_repo_get_games):
+    repo_return = Mock()
+    mock_repo_get_games.return_value = repo_return
+
+    result = await get_games_for_team(1, 20, (datetime(2025, 2, 1), 2), 3, date(2025, 1, 1), date(2025, 1, 31))
+
+    assert result == repo_return
+    mock_repo_get_games.assert_called_once_with(
+        1, 20, (datetime(2025, 2, 1), 2), 3, datetime(2025, 1, 1), datetime(2025, 2, 1)
+    )
+
+
+@pytest.mark.asyncio
+@patch("services.teams.data.count_games_for_team")
+async def test_count_games_for_team(mock_repo_count):
+    mock_repo_count.return_value = 4
+
+    result = await count_games_for_team(1, date_from=date(2025, 1, 1))
+
+    assert result == 4
+    mock_repo_count.assert_called_once_with(1, None, datetime(2025, 1, 1), None)
+
+
+@pytest.mark.asyncio
+@patch("services.teams.data.count_games_for_team")
+async def test_count_games_for_team_in_timezone(mock_repo_count):
+    mock_repo_count.return_value = 2
+
+    result = await count_games_for_team(1, 3, date(2025, 1, 1), date(2025, 1, 31), ZoneInfo("Europe/Moscow"))
+
+    assert result == 2
+    mock_repo_count.assert_called_once_with(1, 3, datetime(2024, 12, 31, 21), datetime(2025, 1, 31, 21))
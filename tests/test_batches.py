@@ -0,0 +1,40 @@
+import pytest
+
+from batches import parse_ids, to_batch_schema
+from errors import InvalidBatch
+from models.pydantic.teams import BaseTeamSchema
+
+
+@pytest.mark.parametrize(
+    "ids, expected",
+    [
+        ("1", [1]),
+        ("3,1,2", [3, 1, 2]),
+        (" 3, 1 ,3,1", [3, 1]),
+    ]
+)
+def test_parse_ids(ids, expected):
+    assert parse_ids(ids) == expected
+
+
+@pytest.mark.parametrize("ids", ["", "1,", "1,a", "1;2", "1.5"])
+def test_parse_ids_invalid(ids):
+    with pytest.raises(InvalidBatch):
+        parse_ids(ids)
+
+
+def test_parse_ids_max_size():
+    assert parse_ids("1,2,2,3", max_size=3) == [1, 2, 3]
+    with pytest.raises(InvalidBatch):
+        parse_ids("1,2,3,4", max_size=3)
+
+
+def test_to_batch_schema():
+    found = {x: BaseTeamSchema(id=x, name=f"team{x}") for x in (1, 3)}
+
+    result = to_batch_schema(BaseTeamSchema, [3, 2, 1, 4], found, lambda x: f"нет {x}")
+
+    assert result.model_dump() == {
+        "items": [{"id": 3, "name": "team3"}, {"id": 1, "name": "team1"}],
+        "errors": [{"id": 2, "detail": "нет 2"}, {"id": 4, "detail": "нет 4"}],
+    }
@@ -0,0 +1,160 @@
+import fnmatch
+from unittest.mock import patch
+
+import pytest
+
+from cache import MemoryCache, RedisCache, cached, create_cache, get_cache, invalidate_season, set_cache
+from config import Config
+
+
+class FakeRedis:
+    """Минимальная замена клиента redis.asyncio для тестов"""
+
+    def __init__(self):
+        self.data = {}
+        self.expirations = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expirations[key] = ex
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+
+@pytest.mark.parametrize(
+    "backend, workers, expected",
+    [
+        ("memory", 1, MemoryCache),
+        ("none", 4, type(None)),
+        ("memory", 4, None),
+    ]
+)
+def test_create_cache(monkeypatch, backend, workers, expected):
+    monkeypatch.setattr(Config, "CACHE_BACKEND", backend)
+    monkeypatch.setattr(Config, "WEB_CONCURRENCY", workers)
+
+    if expected is None:
+        with pytest.raises(ValueError):
+            create_cache()
+    else:
+        assert isinstance(create_cache(), expected)
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.get("a")
+    await cache.set("c", 3)
+
+    assert await cache.get("a") == (True, 1)
+    assert await cache.get("b") == (False, None)
+    assert await cache.get("c") == (True, 3)
+
+
+@pytest.mark.asyncio
+@patch("cache.time.monotonic")
+async def test_memory_cache_expires_entries(mock_monotonic):
+    cache = MemoryCache(ttl=10)
+    mock_monotonic.return_value = 100
+    await cache.set("a", None)
+
+    mock_monotonic.return_value = 109
+    assert await cache.get("a") == (True, None)
+
+    mock_monotonic.return_value = 110
+    assert await cache.get("a") == (False, None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cache_factory", [MemoryCache, lambda: RedisCache(client=FakeRedis(), ttl=60)])
+async def test_cache_delete_prefix(cache_factory):
+    cache = cache_factory()
+    for key in ("seasons:1:a", "seasons:1:b", "seasons:10:a", "leagues:all"):
+        await cache.set(key, {"key": key})
+
+    await cache.delete_prefix("seasons:1:")
+
+    assert await cache.get("seasons:1:a") == (False, None)
+    assert await cache.get("seasons:1:b") == (False, None)
+    assert await cache.get("seasons:10:a") == (True, {"key": "seasons:10:a"})
+    assert await cache.get("leagues:all") == (True, {"key": "leagues:all"})
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_uses_namespace_and_ttl():
+    client = FakeRedis()
+    cache = RedisCache(client=client, ttl=60, namespace="test:")
+
+    await cache.set("leagues:all", [1, 2])
+
+    assert list(client.data) == ["test:leagues:all"]
+    assert client.expirations["test:leagues:all"] == 60
+    assert await cache.get("leagues:all") == (True, [1, 2])
+
+    await cache.clear()
+    assert client.data == {}
+
+
+@pytest.mark.asyncio
+async def test_cached_builds_key_from_arguments_and_skips_errors():
+    calls = []
+
+    @cached("items:{item_id}:{limit}")
+    async def get_item(item_id: int, limit: int = 10):
+        calls.append((item_id, limit))
+        if item_id < 0:
+            raise ValueError
+        return item_id * limit
+
+    assert await get_item(2) == 20
+    assert await get_item(item_id=2, limit=10) == 20
+    assert await get_item(2, 5) == 10
+    assert await get_cache().get("items:2:10") == (True, 20)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await get_item(-1)
+
+    assert calls == [(2, 10), (2, 5), (-1, 10), (-1, 10)]
+
+
+@pytest.mark.asyncio
+async def test_cached_without_backend_calls_function():
+    calls = []
+
+    @cached("items")
+    async def get_items():
+        calls.append(1)
+        return calls
+
+    set_cache(None)
+    await get_items()
+    await get_items()
+
+    assert calls == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_season():
+    cache = get_cache()
+    for key in ("leagues:all", "leagues:1", "leagues:seasons:1", "seasons:1:league:1:season",
+                "seasons:2:league:1:season"):
+        await cache.set(key, key)
+
+    await invalidate_season(1)
+
+    assert [key for key in ("leagues:all", "leagues:1", "leagues:seasons:1", "seasons:1:league:1:season",
+                            "seasons:2:league:1:season") if (await cache.get(key))[0]] == \
+        ["leagues:1", "seasons:2:league:1:season"]
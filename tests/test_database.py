@@ -0,0 +1,160 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pymongo import ASCENDING, DESCENDING
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config import Config
+from database import (
+    MonitoredQueuePool,
+    close_mongo_db,
+    find_mongo_index_conflicts,
+    get_mongo_client,
+    get_pool_metrics,
+    init_mongo_db,
+    verify_mongo_indexes
+)
+from main import app, lifespan
+from models.mongo_documents.games import GameDocument
+from models.mongo_documents.stats import PlayerSeasonStatsDocument
+
+
+@pytest.mark.asyncio
+async def test_init_mongo_db_creates_declared_indexes():
+    await init_mongo_db()
+
+    indexes = await GameDocument.get_motor_collection().index_information()
+
+    assert indexes["game_id"]["unique"] is True
+    assert {"season_id", "league_id", "events_event_type_person_id"} <= set(indexes)
+    stats_indexes = await PlayerSeasonStatsDocument.get_motor_collection().index_information()
+    assert "season_id_goals" in stats_indexes
+    assert "season_id_appearances" not in stats_indexes
+    assert await verify_mongo_indexes([GameDocument, PlayerSeasonStatsDocument]) == []
+
+
+@pytest.mark.asyncio
+async def test_verify_mongo_indexes_reports_differences():
+    await init_mongo_db()
+    collection = GameDocument.get_motor_collection()
+
+    await collection.drop_index("league_id")
+    await collection.create_index([("home_manager.id", ASCENDING)], name="home_manager_id")
+    try:
+        report = await verify_mongo_indexes([GameDocument])
+    finally:
+        await collection.drop_index("home_manager_id")
+        await collection.create_index([("league_id", ASCENDING)], name="league_id")
+
+    assert report == [
+        "games: индекс league_id отсутствует",
+        "games: индекс home_manager_id не объявлен в модели"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_init_mongo_db_fails_on_conflicting_indexes():
+    await init_mongo_db()
+    collection = get_mongo_client()[Config.MONGO_DBNAME]["games"]
+
+    await collection.drop_index("season_id")
+    await collection.create_index([("season_id", DESCENDING)], name="season_id")
+    await collection.drop_index("league_id")
+    await collection.create_index([("league_id", ASCENDING)], name="league")
+    try:
+        with pytest.raises(RuntimeError) as e:
+            await init_mongo_db()
+        report = await find_mongo_index_conflicts(get_mongo_client()[Config.MONGO_DBNAME], [GameDocument])
+    finally:
+        await collection.drop_index("season_id")
+        await collection.drop_index("league")
+        await init_mongo_db()
+
+    assert len(report) == 2
+    assert report[0].startswith("games: индекс season_id отличается от объявленного")
+    assert report[1] == "games: индекс league_id уже есть в базе под именем league"
+    assert all(line in str(e.value) for line in report)
+
+@pytest.mark.asyncio
+async def test_monitored_pool_counts_overflow_waits_and_timeouts():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        poolclass=MonitoredQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.2
+    )
+    try:
+        first = await engine.connect()
+        second = await engine.connect()
+        metrics = get_pool_metrics(engine.pool)
+        assert (metrics["checked_out"], metrics["overflow"], metrics["overflow_checkouts"]) == (2, 1, 1)
+
+        with pytest.raises(TimeoutError):
+            await engine.connect()
+
+        async def release_later():
+            await asyncio.sleep(0.05)
+            await second.close()
+
+        release = asyncio.create_task(release_later())
+        third = await engine.connect()
+        await release
+        await third.close()
+        await first.close()
+
+        metrics = get_pool_metrics(engine.pool)
+        assert (metrics["checked_out"], metrics["waits"], metrics["timeouts"]) == (0, 2, 1)
+        assert metrics["wait_seconds"] > 0.2
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_mongo_client_is_shared_until_closed():
+    client = get_mongo_client()
+
+    await init_mongo_db()
+    assert get_mongo_client() is client
+
+    await close_mongo_db()
+    assert get_mongo_client() is not client
+    await close_mongo_db()
+
+
+def test_mongo_client_is_recreated_for_another_event_loop():
+    first = asyncio.run(_get_client())
+    second = asyncio.run(_get_client())
+
+    assert first is not second
+    asyncio.run(close_mongo_db())
+
+
+async def _get_client():
+    return get_mongo_client()
+
+
+@pytest.mark.asyncio
+@patch("main.watch_game_notifications")
+@patch("main.engine")
+@patch("main.close_mongo_db")
+@patch("main.init_mongo_db")
+async def test_lifespan_opens_and_closes_connections(mock_init, mock_close, mock_engine, mock_watch):
+    mock_engine.dispose = AsyncMock()
+    watching = asyncio.Event()
+
+    async def watch():
+        watching.set()
+        await asyncio.Event().wait()
+
+    mock_watch.side_effect = watch
+
+    async with lifespan(app):
+        mock_init.assert_awaited_once()
+        mock_close.assert_not_awaited()
+        await asyncio.wait_for(watching.wait(), 1)
+
+    mock_close.assert_awaited_once()
+    mock_engine.dispose.assert_awaited_once()
@@ -0,0 +1,54 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from export_formats import encode_rows
+from models.pydantic.internal import ExportFormat
+
+COLUMNS = ("game_id", "game_date", "team", "home_scored")
+ROWS = [
+    (1, datetime(2025, 1, 1, 18, 30), "команда, 1", 2),
+    (2, None, 'team "2"', None),
+    (3, datetime(2025, 2, 1), "team3", 0),
+]
+
+
+async def rows():
+    for row in ROWS:
+        yield row
+
+
+async def encode(export_format: ExportFormat, chunk_rows: int = 500) -> list[str]:
+    return [chunk async for chunk in encode_rows(export_format, COLUMNS, rows(), chunk_rows)]
+
+
+@pytest.mark.asyncio
+async def test_encode_ndjson():
+    chunks = await encode(ExportFormat.ndjson)
+
+    assert len(chunks) == 1
+    assert [json.loads(line) for line in chunks[0].splitlines()] == [
+        {"game_id": 1, "game_date": "2025-01-01T18:30:00", "team": "команда, 1", "home_scored": 2},
+        {"game_id": 2, "game_date": None, "team": 'team "2"', "home_scored": None},
+        {"game_id": 3, "game_date": "2025-02-01T00:00:00", "team": "team3", "home_scored": 0},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_encode_csv():
+    assert "".join(await encode(ExportFormat.csv)) == (
+        "game_id,game_date,team,home_scored\n"
+        '1,2025-01-01T18:30:00,"команда, 1",2\n'
+        '2,,"team ""2""",\n'
+        "3,2025-02-01T00:00:00,team3,0\n"
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("export_format, header_chunks", [(ExportFormat.ndjson, 0), (ExportFormat.csv, 1)])
+async def test_encode_chunks(export_format, header_chunks):
+    chunks = await encode(export_format, chunk_rows=2)
+
+    assert len(chunks) == header_chunks + 2
+    assert "".join(chunks) == "".join(await encode(export_format))
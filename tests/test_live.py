@@ -0,0 +1,278 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from live import (
+    LIVE_CHANNEL,
+    LiveGameBroker,
+    deliver_notification,
+    format_sse,
+    game_change_messages,
+    game_notification,
+    game_score,
+    new_events,
+    notify_game_changes,
+    open_game_stream,
+    stream_game,
+    watch_game_notifications
+)
+import live
+from models.mongo_documents.games import (
+    EventEmbeddedObject,
+    EventType,
+    GameDocument,
+    PersonEmbeddedObject,
+    TeamEmbeddedObject
+)
+from errors import Missing
+from models.pydantic.games import GameScoreSchema
+
+
+HOME_PLAYER = PersonEmbeddedObject(id=1, name="person1", team=TeamEmbeddedObject(id=1, name="team1"))
+GUEST_PLAYER = PersonEmbeddedObject(id=3, name="person3", team=TeamEmbeddedObject(id=2, name="team2"))
+
+
+def make_game(*events: tuple[EventType, str, PersonEmbeddedObject]) -> GameDocument:
+    return GameDocument.model_construct(
+        game_id=1,
+        season_id=1,
+        league_id=1,
+        home_start_composition=[HOME_PLAYER],
+        guest_start_composition=[],
+        home_substitution=[],
+        guest_substitution=[GUEST_PLAYER],
+        events=[EventEmbeddedObject(event_type=t, minute=m, person=p) for t, m, p in events]
+    )
+
+
+def score_reader(score: GameScoreSchema):
+    async def get_score(game_id: int) -> GameScoreSchema:
+        return score
+    return get_score
+
+
+@pytest.fixture
+def live_broker(monkeypatch):
+    broker = LiveGameBroker(queue_size=2)
+    monkeypatch.setattr(live, "broker", broker)
+    return broker
+
+
+@pytest.mark.parametrize(
+    "events, expected_score",
+    [
+        ((), (0, 0)),
+        (((EventType.goal, "10", HOME_PLAYER),
+          (EventType.penalty_goal, "20", GUEST_PLAYER),
+          (EventType.assist, "20", GUEST_PLAYER),
+          (EventType.unrealized_penalty_goal, "30", HOME_PLAYER)), (1, 1)),
+        (((EventType.own_goal, "10", HOME_PLAYER),
+          (EventType.own_goal, "50", GUEST_PLAYER),
+          (EventType.own_goal, "60", GUEST_PLAYER)), (2, 1)),
+    ]
+)
+def test_game_score(events, expected_score):
+    assert game_score(make_game(*events)) == GameScoreSchema(
+        home_scored=expected_score[0], guest_scored=expected_score[1])
+
+
+def test_new_events():
+    goal = (EventType.goal, "10", HOME_PLAYER)
+    card = (EventType.yellow_card, "15", GUEST_PLAYER)
+    previous = make_game(goal, card)
+    game = make_game(goal, card, goal, (EventType.goal, "20", HOME_PLAYER))
+
+    assert [(x.event_type, x.minute) for x in new_events(previous, game)] == [
+        (EventType.goal, "10"), (EventType.goal, "20")]
+    assert len(new_events(None, previous)) == 2
+    assert new_events(game, previous) == []
+
+
+@pytest.mark.asyncio
+async def test_broker_drops_oldest_messages(live_broker):
+    async with live_broker.subscribe(1) as queue, live_broker.subscribe(2) as other:
+        for i in range(3):
+            live_broker.publish(1, "score", {"n": i})
+
+        assert [queue.get_nowait()[1]["n"] for _ in range(queue.qsize())] == [1, 2]
+        assert other.empty()
+        assert live_broker.subscribers_count(1) == 1
+
+    assert live_broker.subscribers_count(1) == 0
+
+
+def test_game_change_messages():
+    previous = make_game((EventType.goal, "10", HOME_PLAYER))
+    card = make_game((EventType.goal, "10", HOME_PLAYER), (EventType.yellow_card, "15", GUEST_PLAYER))
+    goal = make_game((EventType.goal, "10", HOME_PLAYER), (EventType.yellow_card, "15", GUEST_PLAYER),
+                     (EventType.own_goal, "20", HOME_PLAYER))
+
+    assert game_change_messages(previous, card) == [("game_event", dict(
+        event_type="yellow_card", minute="15", person=dict(id=3, name="person3")))]
+    assert [event for event, _ in game_change_messages(card, goal)] == ["game_event", "score"]
+    assert game_change_messages(card, goal)[-1] == ("score", dict(home_scored=1, guest_scored=1))
+    assert game_change_messages(None, previous)[-1] == ("score", dict(home_scored=1, guest_scored=0))
+    assert game_change_messages(goal, goal) == []
+
+
+def test_game_notification_falls_back_to_score_refresh():
+    messages = [("game_event", dict(minute="1", person=dict(id=1, name="x" * 10000)))]
+
+    assert json.loads(game_notification(1, messages)) == dict(game_id=1, messages=[], refresh_score=True)
+    assert json.loads(game_notification(1, messages[:0])) == dict(game_id=1, messages=[], refresh_score=False)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "dialect, payloads, executed",
+    [
+        ("postgresql", ["a", "b"], True),
+        ("postgresql", [], False),
+        ("sqlite", ["a"], False),
+    ]
+)
+async def test_notify_game_changes(dialect, payloads, executed):
+    session = Mock(execute=AsyncMock())
+    session.get_bind.return_value.dialect.name = dialect
+
+    await notify_game_changes(session, payloads)
+
+    assert session.execute.await_count == int(executed)
+    if executed:
+        assert session.execute.await_args.args[1] == [
+            {"channel": LIVE_CHANNEL, "payload": payload} for payload in payloads
+        ]
+
+
+@pytest.mark.asyncio
+async def test_deliver_notification(live_broker):
+    get_score = score_reader(GameScoreSchema(home_scored=2, guest_scored=0))
+    messages = [("game_event", dict(minute="1")), ("score", dict(home_scored=1, guest_scored=0))]
+
+    async with live_broker.subscribe(1) as queue:
+        await deliver_notification(game_notification(1, messages), get_score)
+        await deliver_notification(game_notification(1, refresh_score=True), get_score)
+        await deliver_notification(game_notification(2, messages), get_score)
+        await deliver_notification("broken", get_score)
+
+        assert [queue.get_nowait() for _ in range(queue.qsize())] == [
+            ("score", dict(home_scored=1, guest_scored=0)),
+            ("score", dict(home_scored=2, guest_scored=0)),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_stream_game(live_broker):
+    stream = stream_game(1, score_reader(GameScoreSchema(home_scored=1, guest_scored=0)), heartbeat=0.01)
+
+    assert await anext(stream) == format_sse("score", dict(home_scored=1, guest_scored=0))
+    assert live_broker.subscribers_count(1) == 1
+    assert await anext(stream) == ": keep-alive\n\n"
+
+    live_broker.publish(1, "score", dict(home_scored=1, guest_scored=1))
+    message = await anext(stream)
+    assert message.startswith("event: score\ndata: ")
+    assert json.loads(message.split("data: ")[1]) == dict(home_scored=1, guest_scored=1)
+
+    await stream.aclose()
+    assert live_broker.subscribers_count(1) == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_game_waits_for_events(live_broker):
+    stream = stream_game(1, score_reader(GameScoreSchema(home_scored=0, guest_scored=0)), heartbeat=10)
+    await anext(stream)
+
+    waiting = asyncio.create_task(anext(stream))
+    await asyncio.sleep(0)
+    assert not waiting.done()
+
+    live_broker.publish(1, "game_event", dict(minute="1"))
+    assert await waiting == format_sse("game_event", dict(minute="1"))
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_game_keeps_changes_published_while_reading_score(live_broker):
+    async def get_score(game_id: int) -> GameScoreSchema:
+        live_broker.publish(game_id, "score", dict(home_scored=1, guest_scored=0))
+        return GameScoreSchema(home_scored=0, guest_scored=0)
+
+    stream = await open_game_stream(1, get_score, heartbeat=10)
+
+    assert await anext(stream) == format_sse("score", dict(home_scored=0, guest_scored=0))
+    assert await anext(stream) == format_sse("score", dict(home_scored=1, guest_scored=0))
+    await stream.aclose()
+    assert live_broker.subscribers_count(1) == 0
+
+
+@pytest.mark.asyncio
+async def test_open_game_stream_missing(live_broker):
+    async def get_score(game_id: int) -> GameScoreSchema:
+        raise Missing("матча с id - 1 не найдено")
+
+    with pytest.raises(Missing):
+        await open_game_stream(1, get_score)
+    assert live_broker.subscribers_count(1) == 0
+
+
+class FakeListenerConnection:
+    """Соединение asyncpg, которое рвется после заданного числа проверок"""
+
+    def __init__(self, pings_before_error: int | None):
+        self.pings_before_error = pings_before_error
+        self.listeners = {}
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    async def remove_listener(self, channel, callback):
+        del self.listeners[channel]
+
+    async def execute(self, query):
+        if self.pings_before_error is not None:
+            if self.pings_before_error == 0:
+                raise ConnectionResetError("connection lost")
+            self.pings_before_error -= 1
+
+
+class FakeEngine:
+    def __init__(self, *connections):
+        self.connections = list(connections)
+        self.opened = []
+
+    @asynccontextmanager
+    async def connect(self):
+        connection = self.connections.pop(0)
+        if isinstance(connection, Exception):
+            raise connection
+        self.opened.append(connection)
+        yield Mock(get_raw_connection=AsyncMock(return_value=Mock(driver_connection=connection)))
+
+
+@pytest.mark.asyncio
+async def test_watch_game_notifications_reconnects(live_broker, monkeypatch):
+    broken, working = FakeListenerConnection(0), FakeListenerConnection(None)
+    fake_engine = FakeEngine(OSError("connection refused"), broken, working)
+    monkeypatch.setattr(live, "engine", fake_engine)
+    get_score = score_reader(GameScoreSchema(home_scored=0, guest_scored=0))
+
+    async with live_broker.subscribe(1) as queue:
+        watcher = asyncio.create_task(
+            watch_game_notifications(get_score, retry_delay=0, ping_interval=0.01)
+        )
+        while working not in fake_engine.opened or LIVE_CHANNEL not in working.listeners:
+            await asyncio.sleep(0.01)
+
+        working.listeners[LIVE_CHANNEL](None, 1, LIVE_CHANNEL, game_notification(1, [("score", {"n": 1})]))
+        message = await asyncio.wait_for(queue.get(), 1)
+
+        watcher.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await watcher
+
+    assert message == ("score", {"n": 1})
+    assert broken.listeners == working.listeners == {}
@@ -0,0 +1,55 @@
+from contextlib import nullcontext as not_raise
+from datetime import datetime
+
+import pytest
+
+from errors import InvalidCursor
+from pagination import decode_cursor, encode_cursor, next_cursor
+
+
+@pytest.mark.parametrize(
+    "values, types",
+    [
+        ((15,), (int,)),
+        ((datetime(2025, 1, 1, 19, 30), 7), (datetime, int)),
+        (("team1", 3), (str, int)),
+        ((None, 3), (datetime, int)),
+    ]
+)
+def test_cursor_roundtrip(values, types):
+    cursor = encode_cursor(*values)
+
+    assert decode_cursor(cursor, *types) == values
+
+
+@pytest.mark.parametrize(
+    "cursor, types, expectation",
+    [
+        ("broken", (int,), pytest.raises(InvalidCursor)),
+        (encode_cursor(1, 2), (int,), pytest.raises(InvalidCursor)),
+        (encode_cursor("x"), (int,), pytest.raises(InvalidCursor)),
+        (encode_cursor("x"), (datetime,), pytest.raises(InvalidCursor)),
+        (encode_cursor(None), (int,), pytest.raises(InvalidCursor)),
+        (encode_cursor(1), (int,), not_raise()),
+    ]
+)
+def test_decode_cursor_invalid(cursor, types, expectation):
+    with expectation:
+        decode_cursor(cursor, *types)
+
+
+@pytest.mark.parametrize(
+    "items, limit, expected",
+    [
+        ([1, 2, 3], 3, (3,)),
+        ([1, 2], 3, None),
+        ([], 3, None),
+    ]
+)
+def test_next_cursor(items, limit, expected):
+    result = next_cursor(items, limit, lambda x: (x,))
+
+    if expected is None:
+        assert result is None
+    else:
+        assert decode_cursor(result, int) == expected
@@ -0,0 +1,38 @@
+from contextlib import nullcontext as not_raise
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from errors import InvalidTimezone
+from periods import UTC, parse_timezone, to_utc_period
+
+
+@pytest.mark.parametrize(
+    "tz, expectation",
+    [
+        ("UTC", not_raise()),
+        ("Europe/Moscow", not_raise()),
+        ("Mars/Olympus", pytest.raises(InvalidTimezone)),
+        ("../etc/passwd", pytest.raises(InvalidTimezone)),
+    ]
+)
+def test_parse_timezone(tz, expectation):
+    with expectation:
+        assert parse_timezone(tz) == ZoneInfo(tz)
+
+
+@pytest.mark.parametrize(
+    "date_from, date_to, tz, expected_period",
+    [
+        (None, None, UTC, (None, None)),
+        (date(2025, 1, 1), None, UTC, (datetime(2025, 1, 1), None)),
+        (None, date(2025, 1, 31), UTC, (None, datetime(2025, 2, 1))),
+        (date(2025, 1, 1), date(2025, 1, 1), ZoneInfo("Europe/Moscow"),
+         (datetime(2024, 12, 31, 21), datetime(2025, 1, 1, 21))),
+        (date(2025, 3, 30), date(2025, 3, 30), ZoneInfo("Europe/Berlin"),
+         (datetime(2025, 3, 29, 23), datetime(2025, 3, 30, 22))),
+    ]
+)
+def test_to_utc_period(date_from, date_to, tz, expected_period):
+    assert to_utc_period(date_from, date_to, tz) == expected_period
@@ -0,0 +1,51 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from models.pydantic.games import BaseGameSchema
+from models.pydantic.leagues import SeasonWithGamesSchema, SeasonWithLeaderSchema
+from models.pydantic.teams import BaseTeamSchema
+from responses import SchemaJSONResponse
+
+
+def make_season(game_date: datetime | None) -> SeasonWithGamesSchema:
+    team1, team2 = BaseTeamSchema(id=1, name="команда1"), BaseTeamSchema(id=2, name="team2")
+    return SeasonWithGamesSchema(id=1, name="season1", games=[
+        BaseGameSchema(id=1, game_date=game_date, home_team=team1, guest_team=team2,
+                       home_scored=2, guest_scored=1)
+    ])
+
+
+@pytest.mark.parametrize("game_date", [
+    datetime(2025, 3, 1, 18, 30),
+    datetime(2025, 3, 1, 18, 30, 0, 500, tzinfo=timezone.utc),
+    None
+])
+def test_schema_response_matches_model_dump_json(game_date):
+    season = make_season(game_date)
+
+    response = SchemaJSONResponse(season)
+
+    assert response.body == season.model_dump_json().encode()
+    assert response.media_type == "application/json"
+
+
+def test_schema_response_list_and_aliases():
+    seasons = [SeasonWithLeaderSchema(id=1, name="season1", teams=BaseTeamSchema(id=1, name="team1"))]
+
+    response = SchemaJSONResponse(seasons)
+
+    assert json.loads(response.body) == [{"id": 1, "name": "season1", "leader": {"id": 1, "name": "team1"}}]
+
+
+def test_schema_response_headers():
+    response = SchemaJSONResponse([], headers={"X-Next-Cursor": "abc"})
+
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert response.body == b"[]"
+
+
+def test_schema_response_unsupported_type():
+    with pytest.raises(TypeError):
+        SchemaJSONResponse({"value": object()})